@@ -1,3 +0,0 @@
-from .main import create_app
-
-app = create_app()
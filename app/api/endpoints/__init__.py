@@ -1,3 +1,6 @@
 # app/api/endpoints/__init__.py
 
+from .database_routes import DatabaseRoutes
 from .document_routes import DocumentRoutes
+from .metrics_routes import MetricsRoutes
+from .parse_job_routes import ParseJobRoutes
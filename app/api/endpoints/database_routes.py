@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from app.core.profiling import ProfiledRoute
+
+from app.dependencies import Dependency
+
+
+class DatabaseRoutes:
+    def __init__(self, dependency: Dependency):
+        self.router = APIRouter(route_class=ProfiledRoute)
+        self.dependency = dependency
+
+        @self.router.get("/api/db/pool/stats")
+        def pool_stats():
+            """
+            Report how many pooled database connections are in use and idle.
+            """
+            return self.dependency.db.pool_stats()
@@ -1,113 +1,287 @@
+import asyncio
+import json
 import os
 from datetime import datetime
-from transformers import pipeline, AutoTokenizer
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from starlette.responses import JSONResponse
+from typing import List, Optional
+
+import anyio
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request
+from starlette.datastructures import UploadFile as FormFile
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.responses import JSONResponse, StreamingResponse
 
 from app.api.schemas.parsed_document_schema import ParsedDocument
-from app.api.schemas.document_schemas import DocumentCreate, Document
+from app.api.schemas.document_schemas import (
+    DocumentChunk, DocumentChunkPage, DocumentCreate, Document, DocumentMetadata, DocumentPage, DocumentStats,
+    DocumentText, DocumentTokens, SearchHit, SearchPage, SimilarChunk, SimilarChunks, SimilarityQuery,
+)
+from app.core.blob_store import BlobStore, blob_store_instance
+from app.core.document_parser import DocumentParser, document_stats
+from app.core.executors import Executors, executors_instance
+from app.core.file_storage import StoredFile, UploadTooLargeError
+from app.core.metrics import BYTES_PROCESSED, span
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.parse_cache import ParseCache, parse_cache_instance
+from app.core.profiling import ProfiledRoute
+from app.core.search import search_index_instance
+from app.core.sidecar import SidecarStore, sidecar_store_instance
+from app.core.vector_index import VectorIndex, vector_index_instance
+from app.crud.document_chunk_crud import DocumentChunkCRUD
 from app.crud.document_crud import DocumentCRUD
 from app.dependencies import Dependency
 
+DOCUMENT_PAGE_DEFAULT_LIMIT = 50
+DOCUMENT_PAGE_MAX_LIMIT = 200
+CHUNK_PAGE_DEFAULT_LIMIT = 100
+CHUNK_PAGE_MAX_LIMIT = 1000
+SEARCH_PAGE_DEFAULT_LIMIT = 20
+SEARCH_PAGE_MAX_LIMIT = 100
+SEARCH_MAX_OFFSET = 1000  # Deeper pages rank every match again for little value; refine the query instead
+TEXT_SLICE_MAX_CHARS = 100_000
+TOKEN_SLICE_MAX_LENGTH = 10_000
+BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "1000"))
+BULK_UPLOAD_CONCURRENCY = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "8"))
+BULK_UPLOAD_MAX_BYTES = int(os.getenv("BULK_UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))
+DOCUMENT_SORT_PATTERN = "^-?(upload_timestamp|byte_size|page_count|char_count|token_count|chunk_count)$"
+DEFAULT_DOCUMENT_SORT = "-upload_timestamp"
+
+
+def _document_content(document) -> dict:
+    return {
+        "id": document.id,
+        "file_name": document.file_name,
+        "file_type": document.file_type,
+        "upload_timestamp": document.upload_timestamp.isoformat(),
+        "parsed_text": document.parsed_text,
+        "content_hash": document.content_hash,
+        "byte_size": document.byte_size,
+        "page_count": document.page_count,
+        "char_count": document.char_count,
+        "token_count": document.token_count,
+        "chunk_count": document.chunk_count,
+    }
+
+
+def _advance(generator) -> tuple:
+    """
+    Step a generator, returning ``(False, item)`` or ``(True, return value)``: StopIteration cannot
+    be raised through an executor future.
+    """
+    try:
+        return False, next(generator)
+    except StopIteration as done:
+        return True, done.value
+
+
 class DocumentRoutes:
-    def __init__(self, dependency: Dependency, document_crud=DocumentCRUD):
-        self.router = APIRouter()
+    def __init__(self, dependency: Dependency, document_crud=DocumentCRUD, parse_cache: Optional[ParseCache] = None,
+                 parser: Optional[DocumentParser] = None, blob_store: Optional[BlobStore] = None,
+                 search_index=None, vector_index: Optional[VectorIndex] = None,
+                 executors: Optional[Executors] = None, sidecar_store: Optional[SidecarStore] = None):
+        self.router = APIRouter(route_class=ProfiledRoute)
+        self.dependency = dependency
         self.db = dependency.get_db()
         self.document_crud = DocumentCRUD(db=self.db)
-        self.tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-        self.summarizer = pipeline("summarization")
+        self.chunk_crud = DocumentChunkCRUD(db=self.db)
+        self.parse_cache = parse_cache or parse_cache_instance
+        self.parser = parser or DocumentParser()
+        self.blob_store = blob_store or blob_store_instance
+        self.search_index = search_index or search_index_instance
+        self.vector_index = vector_index if vector_index is not None else vector_index_instance
+        self.executors = executors or executors_instance
+        self.sidecar_store = sidecar_store or sidecar_store_instance
 
         @self.router.post("/api/upload/", response_model=Document)
-        def upload_file(file: UploadFile = File(...)):
+        async def upload_file(file: UploadFile = File(...)):
             """
             Upload a file and save its details in the database.
+
+            The file is streamed into the content-addressed blob store; uploading content that is
+            already stored only adds a database row and reuses the text extracted from it.
             """
             try:
                 file_name = file.filename
                 file_type = file.content_type
                 upload_timestamp = datetime.now()
-                file_location = f"uploads/{file_name}"
-
-                if os.path.exists(file_location):
-                    print(f"File {file_name} already exists. Overwriting...")
 
-                with open(file_location, "wb") as f:
-                    f.write(file.file.read())
+                with span("upload.store"):
+                    incoming = await self.blob_store.receive(file)
+                    stored_file = await self.executors.db(self._with_connection, self.blob_store.adopt, incoming)
+                BYTES_PROCESSED.observe(stored_file.size, stage="upload")
+                parsed_text, stats = None, {}
+                if stored_file.deduplicated:
+                    parsed_text, stats = await self.executors.db(self._reuse_parse, stored_file.sha256)
 
                 document_create = DocumentCreate(
                     file=file,
                     file_name=file_name,
                     file_type=file_type,
                     upload_timestamp=upload_timestamp,
+                    parsed_text=parsed_text,
+                    content_hash=stored_file.sha256,
+                    byte_size=stored_file.size,
+                    **stats,
                 )
 
-                saved_document = self.document_crud.create_document(document_create)
-
-                return JSONResponse(
-                    content={
-                        "id": saved_document.id,
-                        "file_name": saved_document.file_name,
-                        "file_type": saved_document.file_type,
-                        "upload_timestamp": saved_document.upload_timestamp.isoformat(),
-                        "parsed_text": saved_document.parsed_text,
-                    },
-                    status_code=200,
-                )
+                try:
+                    with span("upload.db"):
+                        saved_document = await self.executors.db(
+                            self._with_connection, self.document_crud.create_document, document_create
+                        )
+                except Exception:
+                    await self.executors.db(self._with_connection, self.blob_store.release, stored_file.sha256)
+                    raise
 
+                return JSONResponse(content=_document_content(saved_document), status_code=200)
+
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
             except Exception as e:
                 print(f"Failed to upload file: {e}")
                 raise HTTPException(
                     status_code=500, detail="An error occurred while uploading the file."
                 )
 
-        def __split_with_overlap(text, tokenizer_name="bert-base-uncased", max_length=256, overlap=50):
+        @self.router.post("/api/upload/bulk")
+        async def bulk_upload(request: Request):
+            """
+            Upload many files, sent as the ``files`` parts of a multipart form, in one request.
+
+            The files are streamed into the blob store concurrently, then all their rows are inserted
+            in a single transaction. The response holds one result per file, in request order; a file
+            that cannot be stored is reported without failing the others.
+            """
+            try:
+                # Parsed here rather than through a File parameter, which applies Starlette's own limit of
+                # 1000 files whatever BULK_UPLOAD_MAX_FILES is; parsing stops at the first file over it
+                form = await request.form(max_files=BULK_UPLOAD_MAX_FILES)
+            except StarletteHTTPException as e:
+                if e.status_code == 400 and str(e.detail).startswith("Too many files"):
+                    raise HTTPException(
+                        status_code=413, detail=f"At most {BULK_UPLOAD_MAX_FILES} files can be uploaded at once."
+                    )
+                raise
+            try:
+                files = [value for value in form.getlist("files") if isinstance(value, FormFile)]
+                if not files:
+                    raise HTTPException(status_code=422, detail="No files were uploaded.")
+                return await self._bulk_upload(files)
+            finally:
+                await form.close()
+
+        @self.router.get("/api/documents", response_model=DocumentPage)
+        async def list_documents(
+            limit: int = Query(DOCUMENT_PAGE_DEFAULT_LIMIT, ge=1, le=DOCUMENT_PAGE_MAX_LIMIT),
+            cursor: Optional[str] = None,
+            file_type: Optional[str] = None,
+            uploaded_from: Optional[datetime] = None,
+            uploaded_to: Optional[datetime] = None,
+            sort: str = Query(DEFAULT_DOCUMENT_SORT, pattern=DOCUMENT_SORT_PATTERN),
+            min_bytes: Optional[int] = Query(None, ge=0),
+            max_bytes: Optional[int] = Query(None, ge=0),
+            min_pages: Optional[int] = Query(None, ge=0),
+            max_pages: Optional[int] = Query(None, ge=0),
+            min_chars: Optional[int] = Query(None, ge=0),
+            max_chars: Optional[int] = Query(None, ge=0),
+            min_tokens: Optional[int] = Query(None, ge=0),
+            max_tokens: Optional[int] = Query(None, ge=0),
+            min_chunks: Optional[int] = Query(None, ge=0),
+            max_chunks: Optional[int] = Query(None, ge=0),
+        ):
+            """
+            List document metadata, newest first, one page at a time.
+
+            ``sort`` orders the listing by a statistic instead, descending when prefixed with ``-``;
+            the ``min_*``/``max_*`` bounds filter on them. Both run in the database on the indexed
+            statistics columns, and leave out documents that were not parsed yet.
+            """
+            cursor_sort = None if sort == DEFAULT_DOCUMENT_SORT else sort
+            try:
+                after = decode_cursor(cursor, sort=cursor_sort) if cursor else None
+            except InvalidCursorError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            ranges = {
+                name: bounds for name, bounds in (
+                    ("byte_size", (min_bytes, max_bytes)), ("page_count", (min_pages, max_pages)),
+                    ("char_count", (min_chars, max_chars)), ("token_count", (min_tokens, max_tokens)),
+                    ("chunk_count", (min_chunks, max_chunks)),
+                ) if bounds != (None, None)
+            }
+
+            try:
+                # One extra row tells whether another page follows
+                documents = await self.executors.db(
+                    self._with_connection, self.document_crud.list_documents, limit + 1, after=after,
+                    file_type=file_type, uploaded_from=uploaded_from, uploaded_to=uploaded_to, sort=sort,
+                    ranges=ranges,
+                )
+            except Exception as e:
+                print(f"Failed to list documents: {e}")
+                raise HTTPException(status_code=500, detail="An error occurred while listing documents.")
+
+            items = [DocumentMetadata.model_validate(document) for document in documents[:limit]]
+            next_cursor = None
+            if len(documents) > limit:
+                last = items[-1]
+                next_cursor = encode_cursor(getattr(last, sort.lstrip("-")), last.id, sort=cursor_sort)
+            return DocumentPage(items=items, next_cursor=next_cursor)
+
+        @self.router.get("/api/documents/search", response_model=SearchPage)
+        async def search_documents(
+            q: str = Query(..., min_length=1),
+            limit: int = Query(SEARCH_PAGE_DEFAULT_LIMIT, ge=1, le=SEARCH_PAGE_MAX_LIMIT),
+            offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
+        ):
             """
-            Split text into overlapping chunks using the tokenizer.
+            Search the parsed text of documents, best matches first, with a snippet around the matches.
             """
-            tokens = self.tokenizer.encode(text, add_special_tokens=False)
-            chunks = [
-                self.tokenizer.decode(tokens[i:i + max_length], skip_special_tokens=True)
-                for i in range(0, len(tokens), max_length - overlap)
-            ]
-            return chunks
+            try:
+                hits = await self.executors.db(self._with_connection, self.search_index.search, q, limit + 1, offset)
+            except Exception as e:
+                print(f"Failed to search documents: {e}")
+                raise HTTPException(status_code=500, detail="An error occurred while searching documents.")
+
+            items = [SearchHit(**hit) for hit in hits[:limit]]
+            next_offset = offset + limit if len(hits) > limit else None
+            return SearchPage(items=items, next_offset=next_offset)
+
+        @self.router.get("/api/documents/{document_id}/stats", response_model=DocumentStats)
+        async def get_document_stats(document_id: int):
+            """
+            Statistics of a document: byte size and content hash from its upload, and page, character,
+            token and chunk counts from its first parse, read from their columns without parsing.
+            """
+            try:
+                document = await self.executors.db(
+                    self._with_connection, self.document_crud.get_document_stats, document_id
+                )
+            except Exception as e:
+                print(f"Failed to get document stats: {e}")
+                raise HTTPException(status_code=500, detail="An error occurred while getting the document stats.")
+            if document is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+            return DocumentStats.model_validate(document)
 
         @self.router.get("/api/documents/{document_id}/parse", response_model=ParsedDocument)
-        def parse_document(document_id: int):
+        async def parse_document(document_id: int):
             """
             Parse the content of a document and summarize it.
             """
             try:
-                document = self.document_crud.get_document(document_id=document_id)
-                if document is None:
-                    raise HTTPException(status_code=404, detail="Document not found")
-
-                file_location = f"uploads/{document.file_name}"
-                text = ""
-
-                if document.file_type == "PDF":
-                    from pypdf import PdfReader
-                    with open(file_location, "rb") as f:
-                        pdf_reader = PdfReader(f)
-                        text = "".join(page.extract_text() for page in pdf_reader.pages)
-
-                elif document.file_type == "DOCX":
-                    from docx import Document as DocxDocument
-                    docx = DocxDocument(file_location)
-                    text = "\n".join(para.text for para in docx.paragraphs)
-
-                elif document.file_type == "PPTX":
-                    from pptx import Presentation
-                    pptx = Presentation(file_location)
-                    text = "\n".join(
-                        shape.text for slide in pptx.slides for shape in slide.shapes if hasattr(shape, "text")
+                # The connection goes back to the pool while the document is parsed
+                with span("parse.lookup"):
+                    document, file_location, content_hash, cache_key, cached, segments = await self.executors.db(
+                        self._prepare_parse, document_id
                     )
-                else:
-                    raise HTTPException(status_code=415, detail="Unsupported file format")
+                if cached is not None:
+                    return ParsedDocument(**cached)
 
-                chunks = __split_with_overlap(text, max_length=128, overlap=25)
-                summary = __summarize_text(text)
-
-                return ParsedDocument(chunks=chunks, summary=summary)
+                result = await self.executors.cpu(
+                    self.parser.parse, file_location, document.file_type, segments=segments
+                )
+                with span("parse.store"):
+                    await self.executors.db(self._store_parse, document, content_hash, cache_key, result)
+                return ParsedDocument(chunks=result["chunks"], summary=result["summary"])
 
             except Exception as e:
                 if isinstance(e, HTTPException):
@@ -118,15 +292,348 @@ class DocumentRoutes:
                     detail="An error occurred while parsing the document."
                 )
 
-        def __summarize_text(text, max_length=512, summary_max_length=150, summary_min_length=25):
+        @self.router.get("/api/documents/{document_id}/parse/stream")
+        async def stream_parse_document(
+            document_id: int, stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$")
+        ):
+            """
+            Parse a document, streaming the result as it is produced: its metadata first, then every
+            chunk as soon as it is cut, then the summary. ``format`` selects newline-delimited JSON or
+            Server-Sent Events.
+            """
+            try:
+                prepared = await self.executors.db(self._prepare_parse, document_id)
+            except HTTPException:
+                raise
+            except Exception as e:
+                print(f"Failed to parse document: {e}")
+                raise HTTPException(status_code=500, detail="An error occurred while parsing the document.")
+
+            sse = stream_format == "sse"
+            return StreamingResponse(
+                self._stream_parse(*prepared, sse=sse),
+                media_type="text/event-stream" if sse else "application/x-ndjson",
+                headers={"Cache-Control": "no-cache"},
+            )
+
+        @self.router.get("/api/documents/{document_id}/chunks", response_model=DocumentChunkPage)
+        async def get_document_chunks(
+            document_id: int,
+            start: int = Query(0, ge=0),
+            end: Optional[int] = Query(None, ge=0),
+            token_start: Optional[int] = Query(None, ge=0),
+            token_end: Optional[int] = Query(None, ge=0),
+            limit: int = Query(CHUNK_PAGE_DEFAULT_LIMIT, ge=1, le=CHUNK_PAGE_MAX_LIMIT),
+        ):
             """
-            Summarize text using a pre-trained model.
+            Chunks stored by the last parse of a document, in order. ``start``/``end`` select a range
+            of ordinals and ``token_start``/``token_end`` the chunks overlapping a range of tokens.
             """
-            tokens = self.tokenizer(text, return_tensors="pt", truncation=False)
-            if len(tokens["input_ids"][0]) >= max_length:
-                summary = self.summarizer(
-                    text, max_length=summary_max_length, min_length=summary_min_length, do_sample=False
+            def fetch_chunks():
+                with self.dependency.connection():
+                    if self.document_crud.get_document(document_id=document_id) is None:
+                        raise HTTPException(status_code=404, detail="Document not found")
+                    return self.chunk_crud.get_chunks(
+                        document_id, limit + 1, start=start, end=end, token_start=token_start, token_end=token_end
+                    )
+
+            try:
+                chunks = await self.executors.db(fetch_chunks)
+            except HTTPException:
+                raise
+            except Exception as e:
+                print(f"Failed to get document chunks: {e}")
+                raise HTTPException(status_code=500, detail="An error occurred while getting the document chunks.")
+
+            items = [DocumentChunk.model_validate(chunk) for chunk in chunks[:limit]]
+            next_start = items[-1].ordinal + 1 if len(chunks) > limit else None
+            return DocumentChunkPage(document_id=document_id, items=items, next_start=next_start)
+
+        @self.router.get("/api/documents/{document_id}/text", response_model=DocumentText)
+        async def get_document_text(
+            document_id: int,
+            start: int = Query(0, ge=0),
+            end: Optional[int] = Query(None, ge=0),
+            page: Optional[int] = Query(None, ge=0),
+            chunk: Optional[int] = Query(None, ge=0),
+        ):
+            """
+            A slice of the text extracted by the last parse of a document, read from its text sidecar.
+            ``start``/``end`` select a range of characters, at most ``TEXT_SLICE_MAX_CHARS`` long;
+            ``page`` or ``chunk`` select the text of one extracted page (slide, paragraph) or chunk.
+            """
+            def read_text(sidecar):
+                if page is not None:
+                    if page >= sidecar.page_count:
+                        raise HTTPException(status_code=404, detail="Page not found")
+                    text_start, text_end = int(sidecar.page_offsets[page]), int(sidecar.page_offsets[page + 1])
+                elif chunk is not None:
+                    if chunk >= sidecar.chunk_count:
+                        raise HTTPException(status_code=404, detail="Chunk not found")
+                    text_start, text_end = (int(offset) for offset in sidecar.chunks[chunk, :2])
+                else:
+                    text_start = min(start, sidecar.char_count)
+                    text_end = min(sidecar.char_count if end is None else max(end, text_start),
+                                   text_start + TEXT_SLICE_MAX_CHARS)
+                return DocumentText(
+                    document_id=document_id, start=text_start, end=text_end,
+                    text=sidecar.text(text_start, text_end), char_count=sidecar.char_count,
+                    page_count=sidecar.page_count, chunk_count=sidecar.chunk_count, token_count=sidecar.token_count,
                 )
-                return summary[0]["summary_text"]
-            return ""
 
+            return await self._read_sidecar(document_id, read_text, "getting the document text")
+
+        @self.router.get("/api/documents/{document_id}/tokens", response_model=DocumentTokens)
+        async def get_document_tokens(
+            document_id: int,
+            start: int = Query(0, ge=0),
+            end: Optional[int] = Query(None, ge=0),
+        ):
+            """
+            Token ids ``[start, end)`` of the text extracted by the last parse of a document, read from
+            its text sidecar, at most ``TOKEN_SLICE_MAX_LENGTH`` at a time.
+            """
+            def read_tokens(sidecar):
+                if sidecar.token_ids is None:
+                    raise HTTPException(status_code=404, detail="Token ids are not available for this document")
+                token_start = min(start, sidecar.token_count)
+                token_end = min(sidecar.token_count if end is None else max(end, token_start),
+                                token_start + TOKEN_SLICE_MAX_LENGTH)
+                return DocumentTokens(
+                    document_id=document_id, start=token_start, end=token_end,
+                    ids=sidecar.tokens(token_start, token_end).tolist(), token_count=sidecar.token_count,
+                )
+
+            return await self._read_sidecar(document_id, read_tokens, "getting the document tokens")
+
+        @self.router.post("/api/documents/similar", response_model=SimilarChunks)
+        async def similar_chunks(query: SimilarityQuery):
+            """
+            Find the document chunks semantically closest to a text, most similar first.
+            """
+            try:
+                embeddings = await self.executors.cpu(self.parser.embed, [query.text])
+                if embeddings is None:
+                    raise HTTPException(status_code=503, detail="Embeddings are disabled")
+                matches = await self.executors.cpu(self.vector_index.search, embeddings[0], query.top_k)
+                chunks = await self.executors.db(
+                    self._with_connection, self.chunk_crud.get_chunks_by_keys,
+                    [(document_id, ordinal) for document_id, ordinal, _ in matches],
+                )
+            except HTTPException:
+                raise
+            except Exception as e:
+                print(f"Failed to find similar chunks: {e}")
+                raise HTTPException(status_code=500, detail="An error occurred while finding similar chunks.")
+
+            return SimilarChunks(items=[
+                SimilarChunk(**chunks[(document_id, ordinal)], score=score)
+                for document_id, ordinal, score in matches
+                if (document_id, ordinal) in chunks  # Deleted since it was indexed
+            ])
+
+        @self.router.get("/api/parse-cache/stats")
+        async def parse_cache_stats():
+            """
+            Report hit/miss counters and the size of the parse-result cache.
+            """
+            return self.parse_cache.stats()
+
+    async def _bulk_upload(self, files: List[UploadFile]) -> JSONResponse:
+        """
+        Store the files of a bulk upload and insert their rows, reporting the outcome of each file.
+        """
+        semaphore = anyio.Semaphore(BULK_UPLOAD_CONCURRENCY)
+
+        async def receive(file: UploadFile):
+            async with semaphore:
+                return await self.blob_store.receive(file)
+
+        received = await asyncio.gather(*(receive(file) for file in files), return_exceptions=True)
+
+        results = [None] * len(files)
+        accepted = []
+        for index, (file, incoming) in enumerate(zip(files, received)):
+            if isinstance(incoming, UploadTooLargeError):
+                results[index] = {"file_name": file.filename, "status": "failed", "error": str(incoming)}
+            elif isinstance(incoming, Exception):
+                print(f"Failed to upload file {file.filename}: {incoming}")
+                results[index] = {
+                    "file_name": file.filename, "status": "failed",
+                    "error": "An error occurred while uploading the file.",
+                }
+            else:
+                accepted.append((index, file, incoming))
+
+        if accepted:
+            try:
+                documents = await self.executors.db(
+                    self._with_connection, self._create_documents,
+                    [file for _, file, _ in accepted], [incoming for _, _, incoming in accepted],
+                )
+            except Exception as e:
+                print(f"Failed to upload files: {e}")
+                raise HTTPException(status_code=500, detail="An error occurred while uploading the files.")
+            for (index, file, _), document in zip(accepted, documents):
+                results[index] = {
+                    "file_name": file.filename, "status": "created", "document": _document_content(document)
+                }
+
+        return JSONResponse(
+            content={"created": len(accepted), "failed": len(files) - len(accepted), "results": results},
+            status_code=200,
+        )
+
+    def _prepare_parse(self, document_id: int) -> tuple:
+        """
+        Look up a document to parse and its cached parse result, if any, or else the cached segments
+        of the previous version of the file for an incremental parse, with a pooled connection.
+        """
+        with self.dependency.connection():
+            document = self.document_crud.get_document(document_id=document_id)
+            if document is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+
+            if document.file_type not in self.parser.extractors:
+                raise HTTPException(status_code=415, detail="Unsupported file format")
+
+            file_location = self.blob_store.location(document)
+            content_hash = self.blob_store.content_hash(document)
+            cache_key = self.parse_cache.make_key(content_hash, **self.parser.parse_params)
+            cached = self.parse_cache.get(cache_key)
+            segments = {}
+            if cached is not None:
+                self.chunk_crud.copy_chunks(document.id, content_hash)
+                self.document_crud.copy_parsed_text(document.id, content_hash)
+            elif self.parser.incremental:
+                segments = self.parser.segment_cache.get_many(
+                    self.document_crud.get_previous_segment_keys(document.file_name)
+                )
+        return document, file_location, content_hash, cache_key, cached, segments
+
+    def _store_parse(self, document, content_hash: str, cache_key: str, result: dict):
+        with self.dependency.connection():
+            if not result.get("summary_partial"):  # A summary cut short by the time budget is redone next time
+                self.parse_cache.set(
+                    cache_key, content_hash, {"chunks": result["chunks"], "summary": result["summary"]}
+                )
+            # Indexes the text for search and lets later uploads of the same content reuse it
+            self.document_crud.update_parsed_text(document.id, result["text"], content_hash)
+            self.chunk_crud.replace_chunks(document.id, result["chunks"], result["token_spans"], result["embeddings"])
+            self.parser.segment_cache.set_many(result.get("segments") or {})
+            self.document_crud.update_stats(document.id, content_hash, document_stats(result))
+            if result.get("segment_keys") is not None:
+                self.document_crud.update_segment_keys(document.id, content_hash, result["segment_keys"])
+        self.sidecar_store.write(content_hash, cache_key, result)
+
+    def _reuse_parse(self, content_hash: str) -> tuple:
+        """
+        Text and statistics already extracted from a document with the same content, if any.
+        """
+        with self.dependency.connection():
+            parsed_text = self.document_crud.get_parsed_text_by_hash(content_hash)
+            return parsed_text, self.document_crud.get_stats_by_hash([content_hash]).get(content_hash, {})
+
+    def _sidecar_key(self, document_id: int) -> tuple:
+        """
+        Content hash and parse cache key of a document, which name its text sidecar.
+        """
+        with self.dependency.connection():
+            document = self.document_crud.get_document(document_id=document_id)
+            if document is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+            content_hash = self.blob_store.content_hash(document)
+            return content_hash, self.parse_cache.make_key(content_hash, **self.parser.parse_params)
+
+    async def _read_sidecar(self, document_id: int, read, action: str):
+        """
+        Call ``read`` with the open text sidecar of a document; the sidecar is mapped, not loaded, so
+        a read only touches the part of the file it returns.
+        """
+        def read_sidecar(content_hash: str, cache_key: str):
+            sidecar = self.sidecar_store.open(content_hash, cache_key)
+            if sidecar is None:
+                raise HTTPException(status_code=404, detail="Document has not been parsed")
+            with sidecar:
+                return read(sidecar)
+
+        try:
+            content_hash, cache_key = await self.executors.db(self._sidecar_key, document_id)
+            return await self.executors.cpu(read_sidecar, content_hash, cache_key)
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Failed to read text sidecar: {e}")
+            raise HTTPException(status_code=500, detail=f"An error occurred while {action}.")
+
+    async def _stream_parse(self, document, file_location: str, content_hash: str, cache_key: str,
+                            cached: Optional[dict], segments: dict, sse: bool = False):
+        """
+        Events of a streamed parse. Each step of the parse runs on the CPU executor, so parsing never
+        blocks the event loop, and every chunk is written out as soon as it is cut.
+        """
+        def event(kind: str, payload: dict) -> str:
+            data = json.dumps(payload)
+            return f"event: {kind}\ndata: {data}\n\n" if sse else json.dumps({"event": kind, **payload}) + "\n"
+
+        yield event("metadata", DocumentMetadata.model_validate(document).model_dump(mode="json"))
+        if cached is not None:
+            for ordinal, chunk in enumerate(cached["chunks"]):
+                yield event("chunk", {"ordinal": ordinal, "text": chunk})
+            yield event("summary", {"summary": cached["summary"]})
+            return
+
+        try:
+            parsing = self.parser.iter_parse(file_location, document.file_type, segments=segments)
+            while True:
+                done, step = await self.executors.cpu(_advance, parsing)
+                if done:
+                    result = step
+                    break
+                ordinal, chunk, (token_start, token_end) = step
+                yield event("chunk", {"ordinal": ordinal, "token_start": token_start, "token_end": token_end,
+                                      "text": chunk})
+            await self.executors.db(self._store_parse, document, content_hash, cache_key, result)
+            yield event("summary", {"summary": result["summary"]})
+        except Exception as e:
+            print(f"Failed to parse document: {e}")
+            yield event("error", {"detail": "An error occurred while parsing the document."})
+
+    def _with_connection(self, func, *args, **kwargs):
+        with self.dependency.connection():
+            return func(*args, **kwargs)
+
+    def _create_documents(self, files: List[UploadFile], incoming_files: List[StoredFile]) -> list:
+        """
+        Take references on received files and insert their documents in one transaction.
+        """
+        try:
+            stored_files = self.blob_store.adopt_many(incoming_files)
+        except Exception:
+            for incoming in incoming_files:
+                if os.path.exists(incoming.path):
+                    os.remove(incoming.path)
+            raise
+
+        try:
+            deduplicated = [stored_file.sha256 for stored_file in stored_files if stored_file.deduplicated]
+            parsed_texts = self.document_crud.get_parsed_texts_by_hash(deduplicated)
+            stats = self.document_crud.get_stats_by_hash(deduplicated)
+            upload_timestamp = datetime.now()
+            return self.document_crud.create_documents([
+                DocumentCreate(
+                    file=file,
+                    file_name=file.filename,
+                    file_type=file.content_type,
+                    upload_timestamp=upload_timestamp,
+                    parsed_text=parsed_texts.get(stored_file.sha256) if stored_file.deduplicated else None,
+                    content_hash=stored_file.sha256,
+                    byte_size=stored_file.size,
+                    **stats.get(stored_file.sha256, {}),
+                )
+                for file, stored_file in zip(files, stored_files)
+            ])
+        except Exception:
+            for stored_file in stored_files:
+                self.blob_store.release(stored_file.sha256)
+            raise
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+
+from app.core.metrics import MetricsRegistry, metrics_registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsRoutes:
+    def __init__(self, registry: MetricsRegistry = None):
+        self.router = APIRouter()
+        self.registry = registry or metrics_registry
+
+        @self.router.get("/metrics", include_in_schema=False)
+        def metrics():
+            """
+            Expose request and per-stage latency histograms in the Prometheus text format.
+            """
+            return PlainTextResponse(self.registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,83 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.schemas.parse_job_schemas import ParseJob
+from app.core.executors import Executors, executors_instance
+from app.core.extractors import extractor_registry
+from app.core.parse_jobs import ParseJobQueue, ParseQueueFullError
+from app.core.profiling import ProfiledRoute
+from app.crud.document_crud import DocumentCRUD
+from app.dependencies import Dependency
+
+
+def _to_schema(job) -> ParseJob:
+    return ParseJob(
+        id=job.id,
+        document_id=job.document_id,
+        status=job.status,
+        progress=job.progress,
+        error=job.error,
+        result=json.loads(job.result) if job.result else None,
+        created_timestamp=job.created_timestamp,
+        updated_timestamp=job.updated_timestamp,
+    )
+
+
+class ParseJobRoutes:
+    def __init__(self, dependency: Dependency, parse_job_queue: ParseJobQueue, executors: Optional[Executors] = None):
+        self.router = APIRouter(route_class=ProfiledRoute)
+        self.dependency = dependency
+        self.db = dependency.get_db()
+        self.document_crud = DocumentCRUD(db=self.db)
+        self.parse_job_queue = parse_job_queue
+        self.executors = executors or executors_instance
+
+        @self.router.post("/api/documents/{document_id}/parse-jobs", response_model=ParseJob, status_code=202)
+        async def create_parse_job(document_id: int):
+            """
+            Enqueue a background parse of a document and return the job.
+            """
+            def submit():
+                with self.dependency.connection():
+                    document = self.document_crud.get_document(document_id=document_id)
+                    if document is None:
+                        raise HTTPException(status_code=404, detail="Document not found")
+
+                    if document.file_type not in extractor_registry:
+                        raise HTTPException(status_code=415, detail="Unsupported file format")
+
+                    return self.parse_job_queue.submit(document)
+
+            try:
+                return _to_schema(await self.executors.db(submit))
+
+            except ParseQueueFullError:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many parse jobs in progress. Try again later.",
+                    headers={"Retry-After": "5"},
+                )
+            except Exception as e:
+                if isinstance(e, HTTPException):
+                    raise e
+                print(f"Failed to create parse job: {e}")
+                raise HTTPException(
+                    status_code=500,
+                    detail="An error occurred while creating the parse job."
+                )
+
+        @self.router.get("/api/parse-jobs/{job_id}", response_model=ParseJob)
+        async def get_parse_job(job_id: int):
+            """
+            Return the status, progress and, once finished, the result of a parse job.
+            """
+            job = await self.executors.db(self._get_job, job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Parse job not found")
+            return _to_schema(job)
+
+    def _get_job(self, job_id: int):
+        with self.dependency.connection():
+            return self.parse_job_queue.get(job_id)
@@ -0,0 +1,85 @@
+# app/api/middleware.py
+import time
+from typing import Dict
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+from app.core.metrics import REQUEST_LATENCY
+from app.core.profiling import SlowRequestProfiler, request_profiler
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request, labelled by route template rather
+    than raw path so the number of series stays bounded, and handing sampled requests to the
+    slow-request profiler.
+    """
+
+    def __init__(self, app, profiler: SlowRequestProfiler = None):
+        self.app = app
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = self.profiler.begin()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(duration, method=scope["method"], route=route_path, status=status["code"])
+            self.profiler.end(token, scope["method"], route_path, duration)
+
+
+class RequestSizeLimitMiddleware:
+    """
+    ASGI middleware capping the request body of some routes, given as ``{path: max_bytes}``.
+
+    Starlette reads and spools a whole multipart body to temporary files before the endpoint runs,
+    so a size check in the endpoint cannot stop an oversized upload from being received and
+    written. A request is rejected with ``413`` from its ``Content-Length`` before any of the body
+    is read, or as soon as more than the limit has arrived when the length is not declared.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the limit of {limit} bytes"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_within_limit():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside form parsing, which lets HTTP exceptions through to the app's handler
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, receive_within_limit, send)
@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import File, UploadFile
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DocumentBase(BaseModel):
@@ -10,6 +10,12 @@ class DocumentBase(BaseModel):
     file_type: str
     upload_timestamp: datetime
     parsed_text: Optional[str] = None
+    content_hash: Optional[str] = None
+    byte_size: Optional[int] = None
+    page_count: Optional[int] = None
+    char_count: Optional[int] = None
+    token_count: Optional[int] = None
+    chunk_count: Optional[int] = None
 
     model_config = ConfigDict()
 
@@ -27,3 +33,82 @@ class Document(DocumentBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
 
+class DocumentMetadata(BaseModel):
+    id: int
+    file_name: str
+    file_type: str
+    upload_timestamp: datetime
+    content_hash: Optional[str] = None
+    byte_size: Optional[int] = None
+    page_count: Optional[int] = None
+    char_count: Optional[int] = None
+    token_count: Optional[int] = None
+    chunk_count: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class DocumentStats(BaseModel):
+    id: int
+    content_hash: Optional[str] = None
+    byte_size: Optional[int] = None
+    page_count: Optional[int] = None  # PDF pages or PPTX slides; None for formats without pages
+    char_count: Optional[int] = None  # The text statistics are None until the document is first parsed
+    token_count: Optional[int] = None
+    chunk_count: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class DocumentPage(BaseModel):
+    items: List[DocumentMetadata]
+    next_cursor: Optional[str] = None  # Pass back as ``cursor`` to fetch the next page; None on the last page
+
+class SearchHit(DocumentMetadata):
+    rank: float
+    snippet: str  # Matching words are wrapped in <b></b>
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_offset: Optional[int] = None  # Pass back as ``offset`` to fetch the next page; None on the last page
+
+class DocumentChunk(BaseModel):
+    ordinal: int
+    token_start: int
+    token_end: int
+    text: str
+    model_config = ConfigDict(from_attributes=True)
+
+class DocumentChunkPage(BaseModel):
+    document_id: int
+    items: List[DocumentChunk]
+    next_start: Optional[int] = None  # Pass back as ``start`` to fetch the next page; None on the last page
+
+class DocumentText(BaseModel):
+    document_id: int
+    start: int  # Character offsets of the slice
+    end: int
+    text: str
+    char_count: int
+    page_count: int  # Segments the text was extracted in: PDF pages, slides or paragraphs
+    chunk_count: int
+    token_count: int
+
+class DocumentTokens(BaseModel):
+    document_id: int
+    start: int
+    end: int
+    ids: List[int]
+    token_count: int
+
+class SimilarityQuery(BaseModel):
+    text: str = Field(..., min_length=1)
+    top_k: int = Field(10, ge=1, le=100)
+
+class SimilarChunk(BaseModel):
+    document_id: int
+    file_name: str
+    ordinal: int
+    token_start: int
+    token_end: int
+    text: str
+    score: float  # Cosine similarity to the query, between -1 and 1
+
+class SimilarChunks(BaseModel):
+    items: List[SimilarChunk]
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from app.api.schemas.parsed_document_schema import ParsedDocument
+
+
+class ParseJob(BaseModel):
+    id: int
+    document_id: int
+    status: str
+    progress: float
+    error: Optional[str] = None
+    result: Optional[ParsedDocument] = None
+    created_timestamp: datetime
+    updated_timestamp: datetime
+
+    model_config = ConfigDict()
@@ -0,0 +1,126 @@
+# app/core/blob_store.py
+import os
+import threading
+import uuid
+from collections import Counter
+from typing import List, Optional
+
+from fastapi import UploadFile
+
+from app.core.file_storage import StoredFile, UPLOAD_MAX_BYTES, hash_file, stream_upload
+from app.crud.blob_crud import BlobCRUD
+
+BLOB_STORE_ROOT = os.getenv("BLOB_STORE_ROOT", "uploads/blobs")
+LEGACY_UPLOAD_DIR = "uploads"
+
+
+class BlobStore:
+    """
+    Content-addressed storage for uploaded files.
+
+    Each distinct content is stored once, at ``<root>/<hash[0:2]>/<hash[2:4]>/<hash>``, and the
+    ``blobs`` table counts the documents referencing it. Uploading bytes that are already stored
+    only adds a reference.
+    """
+
+    def __init__(self, root: str = BLOB_STORE_ROOT, blob_crud: Optional[BlobCRUD] = None):
+        self.root = root
+        self.blob_crud = blob_crud or BlobCRUD(db=None)
+        self._lock = threading.Lock()  # Serializes moving blobs into place and removing them in this process
+
+    def path_for(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def location(self, document) -> str:
+        """
+        Path of a document's file; documents uploaded before the blob store live under their file name.
+        """
+        if getattr(document, "content_hash", None):
+            path = self.path_for(document.content_hash)
+            if os.path.exists(path):
+                return path
+        return os.path.join(LEGACY_UPLOAD_DIR, document.file_name)
+
+    def content_hash(self, document) -> str:
+        """
+        Content hash of a document, computing it only for documents that predate the blob store.
+        """
+        location = self.location(document)
+        if getattr(document, "content_hash", None) and location == self.path_for(document.content_hash):
+            return document.content_hash
+        return hash_file(location)
+
+    async def store(self, upload: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> StoredFile:
+        """
+        Stream an upload into the store and take a reference on its content.
+        """
+        return self.adopt(await self.receive(upload, max_bytes=max_bytes))
+
+    async def receive(self, upload: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> StoredFile:
+        """
+        Stream an upload to a temporary file in the store, to be passed to ``adopt`` or ``adopt_many``.
+        """
+        incoming_dir = os.path.join(self.root, "incoming")
+        os.makedirs(incoming_dir, exist_ok=True)
+        return await stream_upload(upload, os.path.join(incoming_dir, uuid.uuid4().hex), max_bytes=max_bytes)
+
+    def adopt(self, incoming: StoredFile) -> StoredFile:
+        """
+        Move a freshly written file to its content address, or drop it if that content is already stored.
+        """
+        with self._lock:
+            self.blob_crud.acquire(incoming.sha256, incoming.size)
+            try:
+                return self._place(incoming)
+            except Exception:
+                self._release(incoming.sha256)
+                raise
+
+    def adopt_many(self, incoming_files: List[StoredFile]) -> List[StoredFile]:
+        """
+        Batch form of ``adopt``: the references on all the files are taken in a single query.
+        """
+        counts = Counter(incoming.sha256 for incoming in incoming_files)
+        sizes = {incoming.sha256: incoming.size for incoming in incoming_files}
+        with self._lock:
+            self.blob_crud.acquire_many({sha256: (sizes[sha256], count) for sha256, count in counts.items()})
+            try:
+                return [self._place(incoming) for incoming in incoming_files]
+            except Exception:
+                # None of the files is handed back, so none of the references is kept
+                for incoming in incoming_files:
+                    self._release(incoming.sha256)
+                raise
+
+    def _place(self, incoming: StoredFile) -> StoredFile:
+        path = self.path_for(incoming.sha256)
+        deduplicated = os.path.exists(path)
+        if deduplicated:
+            os.remove(incoming.path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(incoming.path, path)
+        return StoredFile(path=path, sha256=incoming.sha256, size=incoming.size, deduplicated=deduplicated)
+
+    def release(self, content_hash: str) -> bool:
+        """
+        Drop a reference to some content and delete the file once nothing references it; returns
+        whether it was deleted.
+        """
+        with self._lock:
+            return self._release(content_hash)
+
+    def _release(self, content_hash: str) -> bool:
+        # The file is removed before the transaction ends. Until then the blob's row stays locked, so
+        # an upload of the same content in another worker waits and then stores the file again instead
+        # of counting it as a duplicate of a file about to disappear.
+        with self.blob_crud.atomic():
+            if self.blob_crud.release(content_hash) == 0:
+                path = self.path_for(content_hash)
+                if os.path.exists(path):
+                    os.remove(path)
+                return True
+            return False
+
+
+blob_store_instance = BlobStore()
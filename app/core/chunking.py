@@ -0,0 +1,118 @@
+# app/core/chunking.py
+import zlib
+from typing import Callable, Iterator, List, Optional
+
+
+def coalesce(segments: Iterator[str], min_chars: int) -> Iterator[str]:
+    """
+    Merge consecutive segments until each holds at least ``min_chars`` characters, so that tiny
+    segments (a table row, a short paragraph) are not tokenized one by one.
+    """
+    buffer = []
+    size = 0
+    for segment in segments:
+        buffer.append(segment)
+        size += len(segment)
+        if size >= min_chars:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if size:
+        yield "".join(buffer)
+
+
+def group_segments(segments: Iterator[str], min_chars: int, max_chars: int, divisor: int = 4) -> Iterator[str]:
+    """
+    Merge consecutive segments into groups at content-defined boundaries: a group ends after a
+    segment whose checksum is a multiple of ``divisor`` once it holds ``min_chars`` characters, or
+    as soon as it reaches ``max_chars``. Boundaries depend only on the segments around them, so an
+    edit to one page, slide or paragraph changes the group holding it and leaves the others
+    identical, which is what lets their parse results be reused.
+    """
+    buffer = []
+    size = 0
+    for segment in segments:
+        buffer.append(segment)
+        size += len(segment)
+        if size >= max_chars or (size >= min_chars and zlib.crc32(segment.encode("utf-8")) % divisor == 0):
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+class StreamingChunker:
+    """
+    Incremental counterpart of ``DocumentParser.split_with_overlap``.
+
+    Text is fed one segment at a time together with its tokens, and every chunk is returned as
+    soon as the tokens after it have been seen. Only the tokens and text of the chunk being built
+    are retained, so memory stays proportional to a chunk plus the current segment rather than to
+    the whole document. Tokens with character offsets are sliced out of the text; tokens without
+    them are decoded with ``decode``. ``token_spans`` records the ``[start, end)`` token offsets of
+    every chunk returned so far, and ``char_spans`` its character offsets in the text fed, or is
+    None when the chunks are decoded.
+    """
+
+    def __init__(self, max_length: int, overlap: int, decode: Optional[Callable[[List], str]] = None):
+        self.step = max_length - overlap
+        self.max_length = max_length
+        self.decode = decode
+        self.token_count = 0
+        self.token_spans = []
+        self.char_spans = []
+        self._ids = []
+        self._spans = []  # Absolute character span of each retained token
+        self._text = ""  # Text from the start of the current chunk onwards
+        self._start = 0  # Absolute position where the current chunk starts
+        self._token_start = 0  # Absolute index of the first token of the current chunk
+        self._position = 0  # Absolute length of the text fed so far
+        self._sliced = None
+
+    def feed(self, segment: str, tokens) -> List[str]:
+        ids, offsets = tokens
+        if self._sliced is None:
+            self._sliced = offsets is not None
+            if not self._sliced:
+                self.char_spans = None
+
+        self._ids.extend(ids)
+        if self._sliced:
+            self._spans.extend((self._position + start, self._position + end) for start, end in offsets)
+            self._text += segment
+        self._position += len(segment)
+        self.token_count += len(ids)
+
+        chunks = []
+        while len(self._ids) > self.max_length:  # A later token exists, so the chunk ends at its last token
+            chunks.append(self._chunk(self.max_length))
+            self._advance()
+        return chunks
+
+    def finish(self) -> List[str]:
+        """
+        Return the remaining chunks once the whole text has been fed.
+        """
+        chunks = []
+        while self._ids:
+            chunks.append(self._chunk(min(self.max_length, len(self._ids))))
+            self._advance()
+        return chunks
+
+    def _chunk(self, length: int) -> str:
+        self.token_spans.append((self._token_start, self._token_start + length))
+        if not self._sliced:
+            return self.decode(self._ids[:length])
+        # The chunk holding the final token so far also keeps whatever text follows it
+        end = self._position if length == len(self._ids) else self._spans[length - 1][1]
+        self.char_spans.append((self._start, end))
+        return self._text[:end - self._start]
+
+    def _advance(self):
+        dropped = min(self.step, len(self._ids))
+        if self._sliced:
+            start = self._spans[dropped - 1][1]
+            self._text = self._text[start - self._start:]
+            self._start = start
+            del self._spans[:dropped]
+        del self._ids[:dropped]
+        self._token_start += dropped
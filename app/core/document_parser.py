@@ -0,0 +1,541 @@
+# app/core/document_parser.py
+import hashlib
+import math
+import os
+from concurrent.futures import Future
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.core.chunking import StreamingChunker, coalesce, group_segments
+from app.core.embeddings import EMBEDDING_MODEL, EMBEDDING_MODEL_NAME, EMBEDDINGS_ENABLED
+from app.core.extractors import ExtractorRegistry, extractor_registry
+from app.core.metrics import BYTES_PROCESSED, TOKENS_PROCESSED, StageTimer
+from app.core.model_registry import ModelRegistry, model_registry
+from app.core.segment_cache import SegmentCache, segment_cache_instance
+from app.core.sidecar import locate_chunks
+from app.core.summarizer_backends import SUMMARIZER_BACKEND, load_summarizer
+from app.core.summary_policy import (
+    POLICY_PARAMS, SUMMARY_MAP_NUM_BEAMS, SummaryBudget, SummaryPlan, extractive_summary, plan_summary,
+)
+from app.core.summary_batcher import SummaryBatcher
+
+TOKENIZER_NAME = "facebook/bart-large-cnn"
+SUMMARIZER_NAME = "sshleifer/distilbart-cnn-12-6"  # The default model of pipeline("summarization")
+SEGMENT_MIN_CHARS = 4096  # Extracted segments are tokenized in blocks of at least this many characters
+CHUNK_MAX_LENGTH = 128
+CHUNK_OVERLAP = 25
+SUMMARY_INPUT_MIN_LENGTH = 512
+SUMMARY_MAX_LENGTH = 150
+SUMMARY_MIN_LENGTH = 25
+
+# Hierarchical (map-reduce) summarization of texts longer than the summarizer's context window
+SUMMARY_MODEL_MAX_INPUT = int(os.getenv("SUMMARY_MODEL_MAX_INPUT", "1024"))
+SUMMARY_MAP_CHUNK_LENGTH = int(os.getenv("SUMMARY_MAP_CHUNK_LENGTH", "900"))
+SUMMARY_MAP_CHUNK_OVERLAP = int(os.getenv("SUMMARY_MAP_CHUNK_OVERLAP", "50"))
+SUMMARY_MAP_MAX_LENGTH = int(os.getenv("SUMMARY_MAP_MAX_LENGTH", "120"))
+SUMMARY_MAP_MIN_LENGTH = int(os.getenv("SUMMARY_MAP_MIN_LENGTH", "20"))
+SUMMARY_MAX_LEVELS = int(os.getenv("SUMMARY_MAX_LEVELS", "3"))
+
+# Incremental parsing: documents are processed in content-defined groups of segments whose results
+# are cached by content hash, so only the groups an edit touched are processed again
+INCREMENTAL_PARSE = os.getenv("INCREMENTAL_PARSE", "true").lower() in ("1", "true", "yes")
+SEGMENT_GROUP_MIN_CHARS = int(os.getenv("SEGMENT_GROUP_MIN_CHARS", "4096"))
+SEGMENT_GROUP_MAX_CHARS = int(os.getenv("SEGMENT_GROUP_MAX_CHARS", "16384"))
+
+# Every setting that influences the parse result, used to key the parse cache.
+PARSE_PARAMS = {
+    "tokenizer": TOKENIZER_NAME,
+    "summarizer": SUMMARIZER_NAME,
+    "segment_min_chars": SEGMENT_MIN_CHARS,
+    "chunk_max_length": CHUNK_MAX_LENGTH,
+    "chunk_overlap": CHUNK_OVERLAP,
+    "summary_input_min_length": SUMMARY_INPUT_MIN_LENGTH,
+    "summary_max_length": SUMMARY_MAX_LENGTH,
+    "summary_min_length": SUMMARY_MIN_LENGTH,
+    "summary_model_max_input": SUMMARY_MODEL_MAX_INPUT,
+    "summary_map_chunk_length": SUMMARY_MAP_CHUNK_LENGTH,
+    "summary_map_chunk_overlap": SUMMARY_MAP_CHUNK_OVERLAP,
+    "summary_map_max_length": SUMMARY_MAP_MAX_LENGTH,
+    "summary_map_min_length": SUMMARY_MAP_MIN_LENGTH,
+    "summary_max_levels": SUMMARY_MAX_LEVELS,
+    "summary_map_num_beams": SUMMARY_MAP_NUM_BEAMS,
+    **POLICY_PARAMS,
+}
+if SUMMARIZER_BACKEND != "pytorch":  # Default keys stay valid for results cached before backends existed
+    PARSE_PARAMS["summarizer_backend"] = SUMMARIZER_BACKEND
+if INCREMENTAL_PARSE:  # Chunks then never cross a group boundary
+    PARSE_PARAMS["segment_group_min_chars"] = SEGMENT_GROUP_MIN_CHARS
+    PARSE_PARAMS["segment_group_max_chars"] = SEGMENT_GROUP_MAX_CHARS
+
+# Every setting that influences the cached result of a segment group.
+SEGMENT_PARAMS = {
+    key: value for key, value in PARSE_PARAMS.items()
+    if key in ("tokenizer", "summarizer", "summarizer_backend", "chunk_max_length", "chunk_overlap",
+               "summary_map_chunk_length", "summary_map_chunk_overlap", "summary_map_max_length",
+               "summary_map_min_length", "summary_map_num_beams")
+}
+SEGMENT_PARAMS["embedding_model"] = EMBEDDING_MODEL_NAME
+
+# Formats whose extractor yields one segment per page or slide; the segments of other formats are
+# paragraphs, lines or blocks of text and do not count as pages
+PAGED_FILE_TYPES = ("PDF", "PPTX")
+
+TOKENIZER_MODEL = f"tokenizer:{TOKENIZER_NAME}"
+SUMMARIZER_MODEL = f"summarization:{SUMMARIZER_NAME}"
+
+
+def _pack_ids(ids) -> Optional[np.ndarray]:
+    """
+    Token ids as a packed uint32 array, or None for a tokenizer whose ids are not integers.
+    """
+    try:
+        return np.asarray(ids, dtype=np.uint32)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _concat_ids(arrays: List[Optional[np.ndarray]]) -> Optional[np.ndarray]:
+    if any(array is None for array in arrays):
+        return None
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.uint32)
+
+
+def _measure(segments, lengths: List[int]):
+    """
+    Pass extracted segments through, recording their lengths: the page (slide, paragraph) index
+    of the text sidecar.
+    """
+    for segment in segments:
+        lengths.append(len(segment))
+        yield segment
+
+
+def document_stats(result: dict) -> dict:
+    """
+    The statistics columns of a document, from its parse result.
+    """
+    return {
+        "page_count": result["page_count"],
+        "char_count": len(result["text"]),
+        "token_count": result["token_count"],
+        "chunk_count": len(result["chunks"]),
+    }
+
+
+def _load_tokenizer():
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(TOKENIZER_NAME)
+
+
+def _load_summarizer():
+    return load_summarizer(SUMMARIZER_NAME, SUMMARIZER_BACKEND)
+
+
+model_registry.register(TOKENIZER_MODEL, _load_tokenizer)
+model_registry.register(SUMMARIZER_MODEL, _load_summarizer)
+
+
+class Tokens(NamedTuple):
+    ids: List[int]
+    offsets: Optional[List[Tuple[int, int]]]  # Character span of each token; None for slow tokenizers
+
+
+class DocumentParser:
+    """
+    Extracts the text of an uploaded document, splits it into overlapping chunks, embeds the chunks
+    and summarizes it.
+
+    Text is pulled from the format's extractor one segment at a time and chunked as it arrives;
+    once a document is known to need hierarchical summarization, its map-level chunks are sent to
+    the summarizer while extraction continues. Shared by the parse routes and the parse job
+    workers. Models come from the process-wide model registry and are only loaded when first
+    needed, so the summarizer is never loaded in a process that only parses short documents.
+    Summaries requested by concurrent parses are batched together by a SummaryBatcher.
+
+    When ``incremental``, segments are merged into content-defined groups that are tokenized,
+    chunked, embedded and map-summarized independently, and each group's results are looked up by
+    its content hash first, among the ``segments`` the caller loaded (those of the previous version
+    of the file) and in the in-process tier of the segment cache. Re-parsing an edited document
+    then only processes the groups the edit touched, plus the final reduce step of the summary.
+    The parser never queries the database itself.
+    """
+
+    parse_params = PARSE_PARAMS
+
+    def __init__(self, tokenizer=None, summarizer=None, registry: Optional[ModelRegistry] = None,
+                 extractors: Optional[ExtractorRegistry] = None, embedder=None,
+                 embeddings_enabled: bool = EMBEDDINGS_ENABLED, incremental: bool = INCREMENTAL_PARSE,
+                 segment_cache: Optional[SegmentCache] = None):
+        self._tokenizer = tokenizer
+        self._summarizer = summarizer
+        self._embedder = embedder
+        self.embeddings_enabled = embeddings_enabled
+        self.incremental = incremental
+        self.segment_cache = segment_cache or segment_cache_instance
+        self.registry = registry or model_registry
+        self.extractors = extractors or extractor_registry
+        self.batcher = SummaryBatcher(lambda: self.summarizer)
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer if self._tokenizer is not None else self.registry.get(TOKENIZER_MODEL)
+
+    @property
+    def summarizer(self):
+        return self._summarizer if self._summarizer is not None else self.registry.get(SUMMARIZER_MODEL)
+
+    @property
+    def embedder(self):
+        """The chunk embedding model, or None when embeddings are disabled."""
+        if not self.embeddings_enabled:
+            return None
+        return self._embedder if self._embedder is not None else self.registry.get(EMBEDDING_MODEL)
+
+    def parse(self, file_location: str, file_type: str, progress=None,
+              segments: Optional[Dict[str, dict]] = None) -> dict:
+        """
+        Run the full pipeline and return the extracted text, the chunks with their token offsets and
+        embeddings (None when disabled), the summary, the token count and the page count (None for
+        formats without pages), along with what the text sidecar indexes: the character length of
+        every extracted segment and the token ids (None when the tokenizer's ids are not integers).
+        ``summary_partial`` tells whether the summary was cut short by the time budget, in which case
+        the result should not be cached. Incremental parses also return the ``segments`` they
+        computed or completed, for the caller to store in the segment cache, and the
+        ``segment_keys`` of all the groups, in order (None otherwise).
+
+        ``progress`` is an optional callable receiving a completion fraction between 0 and 1, and
+        ``segments`` cached segments, by key, for an incremental parse to reuse.
+        """
+        parsing = self.iter_parse(file_location, file_type, progress, segments)
+        while True:
+            try:
+                next(parsing)
+            except StopIteration as done:
+                return done.value
+
+    def iter_parse(self, file_location: str, file_type: str, progress=None,
+                   segments: Optional[Dict[str, dict]] = None):
+        """
+        Generator form of ``parse``: yields ``(ordinal, chunk, token_span)`` for every chunk as soon as
+        it is cut, while extraction goes on, and returns the result of ``parse``.
+        """
+        report = progress or (lambda fraction: None)
+        report(0.0)
+        budget = SummaryBudget()
+        if self.incremental:
+            return (yield from self._iter_parse_groups(file_location, file_type, report, budget, segments or {}))
+        timer = StageTimer(prefix="parse.")
+        segment_lengths = []
+        segments = _measure(self.extractors.extract(file_location, file_type), segment_lengths)
+        chunker = StreamingChunker(CHUNK_MAX_LENGTH, CHUNK_OVERLAP, decode=self._decode)
+        map_chunker = StreamingChunker(SUMMARY_MAP_CHUNK_LENGTH, SUMMARY_MAP_CHUNK_OVERLAP, decode=self._decode)
+        text_parts, chunks, map_chunks, partial_summaries, token_ids = [], [], [], [], []
+
+        for segment in timer.iterate("extract", coalesce(segments, SEGMENT_MIN_CHARS)):
+            with timer("tokenize"):
+                tokens = self.tokenize(segment)
+            text_parts.append(segment)
+            token_ids.append(_pack_ids(tokens.ids))
+            with timer("chunk"):
+                new_chunks = chunker.feed(segment, tokens)
+                map_chunks.extend(map_chunker.feed(segment, tokens))
+            yield from self._emit(chunks, new_chunks, chunker)
+            if self._needs_map_reduce(map_chunker.token_count):
+                with timer("summarize"):
+                    partial_summaries.extend(self._submit_map(map_chunks))
+                map_chunks = []
+        with timer("chunk"):
+            new_chunks = chunker.finish()
+        yield from self._emit(chunks, new_chunks, chunker)
+        text = "".join(text_parts)
+        report(0.5)
+        with timer("embed"):
+            embeddings = self.embed(chunks)
+
+        token_count = map_chunker.token_count
+        with timer("summarize"):
+            if self._needs_map_reduce(token_count):
+                partial_summaries.extend(self._submit_map(map_chunks + map_chunker.finish()))
+            summary = self._summarize_document(text, token_count, partial_summaries, budget)
+        timer.record()
+        if os.path.exists(file_location):
+            BYTES_PROCESSED.observe(os.path.getsize(file_location), stage="parse")
+        TOKENS_PROCESSED.observe(token_count, stage="parse")
+        report(1.0)
+        return {
+            "text": text, "chunks": chunks, "token_spans": chunker.token_spans, "char_spans": chunker.char_spans,
+            "embeddings": embeddings,
+            "summary": summary, "summary_partial": budget.exhausted, "token_count": token_count,
+            "page_count": len(segment_lengths) if file_type in PAGED_FILE_TYPES else None,
+            "segment_lengths": segment_lengths, "token_ids": _concat_ids(token_ids), "segment_keys": None,
+        }
+
+    def _iter_parse_groups(self, file_location: str, file_type: str, report, budget: SummaryBudget,
+                           known: Dict[str, dict]):
+        timer = StageTimer(prefix="parse.")
+        segment_lengths = []
+        segments = _measure(self.extractors.extract(file_location, file_type), segment_lengths)
+        text_parts, chunks, token_spans, char_spans, groups, partial_summaries = [], [], [], [], [], []
+        updated = {}  # Segments computed or completed by this parse, by cache key
+        token_count = char_count = 0
+
+        for text in timer.iterate("extract", group_segments(segments, SEGMENT_GROUP_MIN_CHARS,
+                                                              SEGMENT_GROUP_MAX_CHARS)):
+            key = self.segment_cache.make_key(hashlib.sha256(text.encode("utf-8")).hexdigest(), **SEGMENT_PARAMS)
+            segment = known.get(key) or self.segment_cache.get(key)
+            if segment is None:
+                segment = updated[key] = self._process_group(text, timer)
+            text_parts.append(text)
+            # Segments cached before character spans were recorded are searched, within their group only
+            group_char_spans = segment.get("char_spans") or locate_chunks(text, segment["chunks"])
+            for chunk, (start, end), (char_start, char_end) in zip(
+                segment["chunks"], segment["token_spans"], group_char_spans
+            ):
+                ordinal = len(chunks)
+                chunks.append(chunk)
+                token_spans.append((token_count + start, token_count + end))
+                char_spans.append((char_count + char_start, char_count + char_end))
+                yield ordinal, chunk, token_spans[ordinal]
+            token_count += segment["token_count"]
+            char_count += len(text)
+            groups.append([key, segment, None])
+            if self._needs_map_reduce(token_count):
+                with timer("summarize"):
+                    partial_summaries.extend(self._submit_group_maps(groups))
+        text = "".join(text_parts)
+        report(0.5)
+        with timer("embed"):
+            embeddings = self._embed_groups(groups, updated)
+
+        with timer("summarize"):
+            if self._needs_map_reduce(token_count):
+                partial_summaries.extend(self._submit_group_maps(groups))
+            summary = self._summarize_document(text, token_count, partial_summaries, budget)
+            for group in groups:
+                key, segment, futures = group
+                # Groups whose summaries were cut short by the budget are summarized again next time
+                if segment.get("summaries") is None and futures is not None and all(
+                    future.done() and not future.cancelled() for future in futures
+                ):
+                    segment = group[1] = updated[key] = {
+                        **segment, "summaries": [future.result() for future in futures]
+                    }
+        timer.record()
+        if os.path.exists(file_location):
+            BYTES_PROCESSED.observe(os.path.getsize(file_location), stage="parse")
+        TOKENS_PROCESSED.observe(token_count, stage="parse")
+        report(1.0)
+        return {
+            "text": text, "chunks": chunks, "token_spans": token_spans, "char_spans": char_spans,
+            "embeddings": embeddings,
+            "summary": summary, "summary_partial": budget.exhausted, "token_count": token_count,
+            "page_count": len(segment_lengths) if file_type in PAGED_FILE_TYPES else None,
+            "segment_lengths": segment_lengths,
+            "token_ids": _concat_ids([segment.get("token_ids") for _, segment, _ in groups]),
+            "segment_keys": [key for key, _, _ in groups], "segments": updated,
+        }
+
+    def _process_group(self, text: str, timer: StageTimer) -> dict:
+        with timer("tokenize"):
+            tokens = self.tokenize(text)
+        with timer("chunk"):
+            chunker = StreamingChunker(CHUNK_MAX_LENGTH, CHUNK_OVERLAP, decode=self._decode)
+            chunks = chunker.feed(text, tokens) + chunker.finish()
+        return {
+            "text": text, "token_count": len(tokens.ids), "chunks": chunks, "token_spans": chunker.token_spans,
+            "char_spans": chunker.char_spans,
+            "token_ids": _pack_ids(tokens.ids), "embeddings": None, "summaries": None,
+        }
+
+    def _submit_group_maps(self, groups: list) -> List[Future]:
+        """
+        Map-summarize the groups not submitted yet; groups summarized by an earlier parse are not sent
+        to the model again.
+        """
+        submitted = []
+        for group in groups:
+            _, segment, futures = group
+            if futures is not None:
+                continue
+            if segment.get("summaries") is not None:
+                futures = []
+                for summary in segment["summaries"]:
+                    future = Future()
+                    future.set_result(summary)
+                    futures.append(future)
+            elif segment["token_count"] == 0:
+                futures = []
+            elif segment["token_count"] <= SUMMARY_MAP_CHUNK_LENGTH:
+                futures = self._submit_map([segment["text"]])
+            else:
+                futures = self._submit_map(self.split_with_overlap(
+                    segment["text"], max_length=SUMMARY_MAP_CHUNK_LENGTH, overlap=SUMMARY_MAP_CHUNK_OVERLAP
+                ))
+            group[2] = futures
+            submitted.extend(futures)
+        return submitted
+
+    def _embed_groups(self, groups: list, updated: dict):
+        """
+        Embed the chunks of the groups that have no embeddings yet in one call, and return the
+        embeddings of the whole document.
+        """
+        if self.embedder is None:
+            return None
+        missing = [group for group in groups if group[1].get("embeddings") is None]
+        if missing:
+            embedded = self.embed([chunk for _, segment, _ in missing for chunk in segment["chunks"]])
+            start = 0
+            for group in missing:
+                key, segment, _ = group
+                stop = start + len(segment["chunks"])
+                group[1] = updated[key] = {**segment, "embeddings": embedded[start:stop]}
+                start = stop
+        matrices = [segment["embeddings"] for _, segment, _ in groups]
+        return np.concatenate(matrices) if matrices else self.embed([])
+
+    @staticmethod
+    def _emit(chunks: List[str], new_chunks: List[str], chunker: StreamingChunker):
+        for chunk in new_chunks:
+            ordinal = len(chunks)
+            chunks.append(chunk)
+            yield ordinal, chunk, chunker.token_spans[ordinal]
+
+    def embed(self, texts: List[str]):
+        """
+        float32 matrix of the embeddings of ``texts``, one row each, or None when embeddings are disabled.
+        """
+        embedder = self.embedder
+        if embedder is None:
+            return None
+        return embedder.encode(texts)
+
+    def extract_text(self, file_location: str, file_type: str) -> str:
+        """
+        Extract the plain text of a file of any registered type.
+        """
+        return "".join(self.extractors.extract(file_location, file_type))
+
+    def tokenize(self, text) -> Tokens:
+        """
+        Tokenize text once, with character offsets when the tokenizer supports them.
+        """
+        tokenizer = self.tokenizer
+        if getattr(tokenizer, "is_fast", False):
+            encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            return Tokens(ids=encoding["input_ids"], offsets=encoding["offset_mapping"])
+        return Tokens(ids=tokenizer.encode(text, add_special_tokens=False), offsets=None)
+
+    def split_with_overlap(self, text, max_length=256, overlap=50, tokens: Optional[Tokens] = None):
+        """
+        Split text into overlapping chunks using the tokenizer.
+
+        With offsets, each chunk is sliced straight out of ``text``: a chunk runs from the end of the
+        token before its first token to the end of its last token, which is exactly the text that
+        decoding its tokens would rebuild.
+        """
+        tokens = tokens or self.tokenize(text)
+        ids, offsets = tokens
+        starts = range(0, len(ids), max_length - overlap)
+
+        if offsets is None:
+            tokenizer = self.tokenizer
+            return [tokenizer.decode(ids[i:i + max_length], skip_special_tokens=True) for i in starts]
+
+        chunks = []
+        for i in starts:
+            j = min(i + max_length, len(ids))
+            start = 0 if i == 0 else offsets[i - 1][1]
+            end = len(text) if j == len(ids) else offsets[j - 1][1]
+            chunks.append(text[start:end])
+        return chunks
+
+    def summarize_text(self, text, max_length=SUMMARY_INPUT_MIN_LENGTH, summary_max_length=SUMMARY_MAX_LENGTH,
+                       summary_min_length=SUMMARY_MIN_LENGTH, tokens: Optional[Tokens] = None,
+                       budget: Optional[SummaryBudget] = None):
+        """
+        Summarize text using a pre-trained model, for texts of at least ``max_length`` tokens.
+
+        The summary length and decoding follow ``plan_summary``: shorter texts of some length get
+        an extractive summary instead. Texts that do not fit the model's context window are
+        summarized hierarchically instead of being truncated. ``tokens`` lets callers reuse a
+        tokenization they already have; ``budget`` bounds the time spent.
+        """
+        tokens = tokens or self.tokenize(text)
+        plan = plan_summary(len(tokens.ids), max_length, summary_max_length, summary_min_length)
+        if plan.method == "abstractive":
+            return self._summarize_levels(text, tokens, plan, budget or SummaryBudget())
+        if plan.method == "extractive":
+            return extractive_summary(text, plan.max_length)
+        return ""
+
+    def _summarize_document(self, text: str, token_count: int, partial_summaries: List[Future],
+                            budget: SummaryBudget) -> str:
+        """
+        Summary of a parsed document whose map-level summaries, if it needs them, were submitted.
+        """
+        plan = plan_summary(token_count, SUMMARY_INPUT_MIN_LENGTH, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH)
+        if plan.method == "none":
+            return ""
+        if plan.method == "extractive":
+            return extractive_summary(text, plan.max_length)
+        if self._needs_map_reduce(token_count):
+            return self._reduce(partial_summaries, plan, 0, budget, text)
+        return self._summarize_once(text, plan, budget)
+
+    def _summarize_levels(self, text, tokens, plan: SummaryPlan, budget: SummaryBudget, level=0):
+        """
+        Map-reduce summarization: summarize overlapping chunks of the text, then summarize the
+        concatenated partial summaries, until the input fits the model or the level limit is reached.
+        """
+        if len(tokens.ids) <= SUMMARY_MODEL_MAX_INPUT or level >= SUMMARY_MAX_LEVELS:
+            return self._summarize_once(text, plan, budget)
+
+        chunks = self.split_with_overlap(
+            text, max_length=SUMMARY_MAP_CHUNK_LENGTH, overlap=SUMMARY_MAP_CHUNK_OVERLAP, tokens=tokens
+        )
+        return self._reduce(self._submit_map(chunks), plan, level, budget, text)
+
+    def _summarize_once(self, text, plan: SummaryPlan, budget: SummaryBudget):
+        generate_kwargs = {
+            "max_length": plan.max_length, "min_length": plan.min_length, "num_beams": plan.num_beams,
+            "do_sample": False, "truncation": True,
+        }
+        remaining = budget.remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                budget.exhausted = True
+                return extractive_summary(text, plan.max_length)
+            # Generation stops with what it has when the time is up; whole seconds let concurrent
+            # requests share a batch
+            generate_kwargs["max_time"] = math.ceil(remaining)
+        summary = self.batcher.summarize(text, **generate_kwargs)
+        if budget.remaining() == 0:
+            budget.exhausted = True
+        return summary
+
+    def _submit_map(self, chunks) -> List[Future]:
+        # All chunk summaries are queued at once so the batcher runs them as padded batches
+        return [
+            self.batcher.submit(
+                chunk, max_length=SUMMARY_MAP_MAX_LENGTH, min_length=SUMMARY_MAP_MIN_LENGTH,
+                num_beams=SUMMARY_MAP_NUM_BEAMS, do_sample=False, truncation=True
+            )
+            for chunk in chunks
+        ]
+
+    def _reduce(self, partial_summaries: List[Future], plan: SummaryPlan, level, budget: SummaryBudget, text):
+        summaries, complete = budget.collect(partial_summaries)
+        if not complete:  # Out of time: the best sentences of the partial summaries that finished
+            return extractive_summary(" ".join(summaries) or text, plan.max_length)
+        combined = " ".join(summaries)
+        return self._summarize_levels(combined, self.tokenize(combined), plan, budget, level + 1)
+
+    @staticmethod
+    def _needs_map_reduce(token_count: int) -> bool:
+        return (token_count > SUMMARY_MODEL_MAX_INPUT and token_count >= SUMMARY_INPUT_MIN_LENGTH
+                and SUMMARY_MAX_LEVELS > 0)
+
+    def _decode(self, ids) -> str:
+        return self.tokenizer.decode(ids, skip_special_tokens=True)
@@ -0,0 +1,73 @@
+# app/core/embeddings.py
+import os
+from typing import List
+
+import numpy as np
+
+from app.core.metrics import MODEL_BATCH_SIZE
+from app.core.model_registry import model_registry
+
+EMBEDDINGS_ENABLED = os.getenv("EMBEDDINGS_ENABLED", "true").lower() in ("1", "true", "yes")
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_MAX_TOKENS = 256  # Longer texts are truncated; parse chunks are shorter than this
+
+EMBEDDING_MODEL = f"embedding:{EMBEDDING_MODEL_NAME}"
+
+
+class SentenceEmbedder:
+    """
+    Sentence embeddings from a small Hugging Face encoder run on the CPU: the token states are
+    mean-pooled over the attention mask and L2-normalized, so a dot product is a cosine similarity.
+
+    Texts are encoded in batches of ``batch_size``, sorted by length so each padded batch wastes
+    as little work as possible, and returned as one float32 matrix in the order given.
+    """
+
+    def __init__(self, tokenizer, model, batch_size: int = EMBEDDING_BATCH_SIZE,
+                 max_tokens: int = EMBEDDING_MAX_TOKENS):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+
+    @property
+    def dimension(self) -> int:
+        return self.model.config.hidden_size
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        import torch
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                rows = order[start:start + self.batch_size]
+                MODEL_BATCH_SIZE.observe(len(rows), model="embedder")
+                batch = self.tokenizer(
+                    [texts[i] for i in rows], padding=True, truncation=True, max_length=self.max_tokens,
+                    return_tensors="pt",
+                )
+                hidden = self.model(**batch).last_hidden_state
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                embeddings[rows] = torch.nn.functional.normalize(pooled, dim=1).numpy()
+        return embeddings
+
+
+def _load_embedder() -> SentenceEmbedder:
+    from transformers import AutoModel, AutoTokenizer
+    return SentenceEmbedder(
+        AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME), AutoModel.from_pretrained(EMBEDDING_MODEL_NAME).eval()
+    )
+
+
+model_registry.register(EMBEDDING_MODEL, _load_embedder)
+
+
+def to_bytes(embedding: np.ndarray) -> bytes:
+    return np.ascontiguousarray(embedding, dtype=np.float32).tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
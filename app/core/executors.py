@@ -0,0 +1,73 @@
+# app/core/executors.py
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.core.profiling import run_profiled
+from app.db.database import DB_POOL_MAX_CONNECTIONS
+
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(os.cpu_count() or 1)))
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_MAX_CONNECTIONS)))
+
+
+class Executors:
+    """
+    Separately sized thread pools that async route handlers offload blocking work to.
+
+    Extraction, tokenization and inference go to the ``cpu`` pool, sized to the cores, and peewee
+    queries to the ``db`` pool, sized to the connection pool so a query never waits for a
+    connection. Neither shares Starlette's default threadpool, so a burst of heavy parses fills
+    the ``cpu`` pool while metadata reads keep running on ``db``. The model libraries release the
+    GIL during inference, and PDF pages are extracted in worker processes, so threads are enough
+    to keep the cores busy.
+    """
+
+    def __init__(self, cpu_workers: int = CPU_EXECUTOR_WORKERS, db_workers: int = DB_EXECUTOR_WORKERS):
+        self.cpu_workers = cpu_workers
+        self.db_workers = db_workers
+        self._cpu_executor: Optional[ThreadPoolExecutor] = None
+        self._db_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    async def cpu(self, func: Callable, *args, **kwargs):
+        """
+        Run CPU-bound work on the ``cpu`` pool and await its result.
+        """
+        return await self._run(self._get_executor("cpu"), func, *args, **kwargs)
+
+    async def db(self, func: Callable, *args, **kwargs):
+        """
+        Run database work on the ``db`` pool and await its result.
+        """
+        return await self._run(self._get_executor("db"), func, *args, **kwargs)
+
+    @staticmethod
+    async def _run(executor: ThreadPoolExecutor, func: Callable, *args, **kwargs):
+        # The caller's context goes along, so metric spans and request profiling see the request
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, run_profiled, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+    def _get_executor(self, kind: str) -> ThreadPoolExecutor:
+        with self._lock:
+            if kind == "cpu":
+                if self._cpu_executor is None:
+                    self._cpu_executor = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix="cpu")
+                return self._cpu_executor
+            if self._db_executor is None:
+                self._db_executor = ThreadPoolExecutor(max_workers=self.db_workers, thread_name_prefix="db")
+            return self._db_executor
+
+    def shutdown(self):
+        with self._lock:
+            for executor in (self._cpu_executor, self._db_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._cpu_executor = self._db_executor = None
+
+
+executors_instance = Executors()
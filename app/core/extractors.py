@@ -0,0 +1,126 @@
+# app/core/extractors.py
+import os
+from typing import Callable, Dict, Iterator
+
+from app.core.pdf_extraction import pdf_text_extractor
+
+TEXT_SEGMENT_CHARS = int(os.getenv("TEXT_SEGMENT_CHARS", str(64 * 1024)))
+
+Extractor = Callable[[str], Iterator[str]]
+
+
+class UnsupportedFileTypeError(ValueError):
+    """Raised when no extractor is registered for a file type."""
+
+
+class ExtractorRegistry:
+    """
+    Maps the short file type codes of ``DocumentCRUD.map_file_type`` to text extractors.
+
+    An extractor is a callable taking the file location and yielding the document's text as a
+    sequence of segments (a page, a slide, a paragraph, a row) whose concatenation is the full
+    text, so consumers never need more than one segment in memory at a time.
+    """
+
+    def __init__(self):
+        self._extractors: Dict[str, Extractor] = {}
+
+    def register(self, file_type: str, extractor: Extractor = None):
+        """
+        Register an extractor for a file type; usable as a decorator when ``extractor`` is omitted.
+        """
+        if extractor is None:
+            return lambda func: self.register(file_type, func)
+        self._extractors[file_type] = extractor
+        return extractor
+
+    def __contains__(self, file_type: str) -> bool:
+        return file_type in self._extractors
+
+    @property
+    def file_types(self):
+        return tuple(self._extractors)
+
+    def get(self, file_type: str) -> Extractor:
+        extractor = self._extractors.get(file_type)
+        if extractor is None:
+            raise UnsupportedFileTypeError(f"Unsupported file type: {file_type}")
+        return extractor
+
+    def extract(self, file_location: str, file_type: str) -> Iterator[str]:
+        """
+        Stream the text segments of a file; unsupported types are rejected before the file is opened.
+        """
+        return self.get(file_type)(file_location)
+
+
+extractor_registry = ExtractorRegistry()
+
+
+def _joined(texts: Iterator[str], separator: str = "\n") -> Iterator[str]:
+    """
+    Yield texts with the separator that ``separator.join(texts)`` would have put in front of them.
+    """
+    first = True
+    for text in texts:
+        yield text if first else separator + text
+        first = False
+
+
+@extractor_registry.register("PDF")
+def extract_pdf(file_location: str) -> Iterator[str]:
+    yield from pdf_text_extractor.iter_pages(file_location)
+
+
+@extractor_registry.register("DOCX")
+def extract_docx(file_location: str) -> Iterator[str]:
+    from docx import Document as DocxDocument
+    docx = DocxDocument(file_location)
+    yield from _joined(para.text for para in docx.paragraphs)
+
+
+@extractor_registry.register("PPTX")
+def extract_pptx(file_location: str) -> Iterator[str]:
+    from pptx import Presentation
+    pptx = Presentation(file_location)
+    # One segment per slide; slides without text add nothing, as if their shapes were joined directly
+    slides = ([shape.text for shape in slide.shapes if hasattr(shape, "text")] for slide in pptx.slides)
+    yield from _joined("\n".join(texts) for texts in slides if texts)
+
+
+@extractor_registry.register("XLSX")
+def extract_xlsx(file_location: str) -> Iterator[str]:
+    """
+    One line per sheet title and per non-empty row, with cells separated by tabs.
+    """
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_location, read_only=True, data_only=True)  # Read-only mode streams rows
+    try:
+        def lines():
+            for sheet in workbook.worksheets:
+                yield sheet.title
+                for row in sheet.iter_rows(values_only=True):
+                    cells = [str(value) for value in row if value is not None]
+                    if cells:
+                        yield "\t".join(cells)
+        yield from _joined(lines())
+    finally:
+        workbook.close()
+
+
+@extractor_registry.register("TXT")
+def extract_txt(file_location: str, segment_chars: int = TEXT_SEGMENT_CHARS) -> Iterator[str]:
+    """
+    Read a UTF-8 text file in blocks, cutting each block after its last whitespace so no word is split.
+    """
+    with open(file_location, "r", encoding="utf-8", errors="replace", newline="") as f:
+        carry = ""
+        while block := f.read(segment_chars):
+            block = carry + block
+            cut = max(block.rfind(" "), block.rfind("\n"), block.rfind("\t")) + 1
+            if cut == 0:
+                cut = len(block)  # A single word longer than a block
+            carry = block[cut:]
+            yield block[:cut]
+        if carry:
+            yield carry
@@ -0,0 +1,71 @@
+# app/core/file_storage.py
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+
+import anyio
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+MULTIPART_OVERHEAD_BYTES = 64 * 1024  # Room for the boundaries and part headers around an uploaded file
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+
+@dataclass
+class StoredFile:
+    path: str
+    sha256: str
+    size: int
+    deduplicated: bool = False  # True when identical content was already stored
+
+
+def hash_file(file_location: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file without reading it into memory at once.
+    """
+    digest = hashlib.sha256()
+    with open(file_location, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def stream_upload(upload: UploadFile, destination: str, max_bytes: int = UPLOAD_MAX_BYTES,
+                        chunk_size: int = UPLOAD_CHUNK_SIZE) -> StoredFile:
+    """
+    Copy an upload to ``destination`` in fixed-size chunks, hashing and measuring it in the same pass.
+
+    At most one chunk is held in memory. The data is written to a temporary file next to the
+    destination and only moved into place once complete, so a rejected or failed upload never
+    replaces an existing file.
+
+    By the time an endpoint has the ``UploadFile``, Starlette has already spooled the whole
+    multipart body, so ``max_bytes`` only keeps an oversized file out of the store. Receiving it is
+    prevented by ``RequestSizeLimitMiddleware``, which caps the request body before it is parsed.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(f"Upload of {upload.size} bytes exceeds the limit of {max_bytes} bytes")
+
+    temp_location = f"{destination}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(temp_location, "wb") as f:
+            while chunk := await upload.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds the limit of {max_bytes} bytes")
+                digest.update(chunk)
+                await f.write(chunk)
+        os.replace(temp_location, destination)
+    except BaseException:
+        if os.path.exists(temp_location):
+            os.remove(temp_location)
+        raise
+
+    return StoredFile(path=destination, sha256=digest.hexdigest(), size=size)
@@ -1,6 +1,31 @@
 # initialize.py
 from app.db.database import database_instance
+from app.models.blob_models import Blob
+from app.models.document_chunk_models import DocumentChunk
 from app.models.document_models import Document
+from app.models.parse_job_models import ParseJob
+from app.models.parse_result_models import ParseResult
+from app.models.parse_segment_models import ParseSegment
+
+# Columns added after their table was first created; create_tables() leaves existing tables untouched.
+ADDED_COLUMNS = [
+    ("documents", "content_hash", "VARCHAR(64)"),
+    ("documents", "byte_size", "BIGINT"),
+    ("documents", "search_vector", "TSVECTOR"),
+    ("documents", "page_count", "INTEGER"),
+    ("documents", "char_count", "INTEGER"),
+    ("documents", "token_count", "INTEGER"),
+    ("documents", "chunk_count", "INTEGER"),
+    ("documents", "segment_keys", "TEXT"),
+    ("document_chunks", "embedding", "BYTEA"),
+    ("parse_segments", "token_ids", "BYTEA"),
+    ("parse_segments", "char_spans", "TEXT"),
+]
+
+# Indexes peewee cannot declare portably on the models.
+ADDED_INDEXES = [
+    ("document_search_vector", "documents USING GIN (search_vector)"),
+]
 
 
 class AppInitializer:
@@ -10,4 +35,9 @@ class AppInitializer:
 
     def initialize(self):
         self.app.state.db = self.db
-        self.db.create_tables([Document])  # Create your models here
\ No newline at end of file
+        for table, column, definition in ADDED_COLUMNS:
+            self.db.execute_sql(f"ALTER TABLE IF EXISTS {table} ADD COLUMN IF NOT EXISTS {column} {definition}")
+        # Also creates indexes declared on the models, such as the listing indexes, that are still missing
+        self.db.create_tables([Document, Blob, ParseResult, ParseJob, DocumentChunk, ParseSegment])  # Create your models here
+        for name, definition in ADDED_INDEXES:
+            self.db.execute_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
\ No newline at end of file
@@ -0,0 +1,219 @@
+# app/core/metrics.py
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = tuple(4 ** exponent for exponent in range(5, 16))  # 1 KiB to 1 GiB
+TOKEN_BUCKETS = tuple(4 ** exponent for exponent in range(3, 13))  # 64 to 16M tokens
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels, rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], List] = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self, **labels) -> dict:
+        """
+        Count and sum of one labelled series, for tests and the benchmark runner.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return {"count": 0, "sum": 0.0}
+            return {"count": series[2], "sum": series[1]}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def drain(self) -> dict:
+        """
+        Take the series observed so far, leaving the histogram empty.
+        """
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def merge(self, series: dict):
+        """
+        Add series drained from the same histogram in another process.
+        """
+        with self._lock:
+            for key, (counts, total, count) in series.items():
+                own = self._series.get(key)
+                if own is None:
+                    own = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                own[0] = [a + b for a, b in zip(own[0], counts)]
+                own[1] += total
+                own[2] += count
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series:
+            pairs = list(zip(self.label_names, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(pairs + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide collection of metrics served at ``/metrics``.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  label_names: Sequence[str] = ()) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, documentation, buckets, label_names)
+            return self._metrics[name]
+
+    def clear(self):
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def drain(self) -> dict:
+        """
+        Observations made in this process since the last drain, by metric name. Worker processes
+        return them with their results so the API process, which serves ``/metrics``, can ``merge``
+        them.
+        """
+        return {name: series for name, metric in list(self._metrics.items()) if (series := metric.drain())}
+
+    def merge(self, drained: dict):
+        for name, series in drained.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(series)
+
+    def render(self) -> str:
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+REQUEST_LATENCY = metrics_registry.histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests by route template.",
+    label_names=("method", "route", "status"),
+)
+STAGE_LATENCY = metrics_registry.histogram(
+    "stage_duration_seconds", "Time spent in each stage of an upload or a parse.", label_names=("stage",),
+)
+BYTES_PROCESSED = metrics_registry.histogram(
+    "bytes_processed", "Size of the files uploaded or parsed.", buckets=SIZE_BUCKETS, label_names=("stage",),
+)
+TOKENS_PROCESSED = metrics_registry.histogram(
+    "tokens_processed", "Number of tokens in each parsed document.", buckets=TOKEN_BUCKETS, label_names=("stage",),
+)
+MODEL_BATCH_SIZE = metrics_registry.histogram(
+    "model_batch_size", "Number of inputs per model call.", buckets=BATCH_SIZE_BUCKETS, label_names=("model",),
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time a block of work as one stage of an upload or a parse.
+    """
+    with STAGE_LATENCY.time(stage=stage):
+        yield
+
+
+class StageTimer:
+    """
+    Accumulates time per stage for work that interleaves its stages, such as the streaming parse
+    alternating between extracting a segment, tokenizing it and chunking it; ``record`` observes
+    each stage's total once.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self.totals: Dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[stage] = self.totals.get(stage, 0.0) + time.perf_counter() - started
+
+    def iterate(self, stage: str, iterable) -> Iterator:
+        """
+        Yield from ``iterable``, counting the time spent producing each item towards ``stage``.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def record(self):
+        for stage, total in self.totals.items():
+            STAGE_LATENCY.observe(total, stage=f"{self.prefix}{stage}")
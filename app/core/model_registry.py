@@ -0,0 +1,102 @@
+# app/core/model_registry.py
+import gc
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+MODEL_IDLE_TTL_SECONDS = float(os.getenv("MODEL_IDLE_TTL_SECONDS", "0"))  # 0 keeps models loaded forever
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "false").lower() in ("1", "true", "yes")
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of lazily loaded models (tokenizers, pipelines, ...).
+
+    Modules register a loader under a name; the model is built on the first ``get`` and then
+    shared by every caller in the process. Models unused for longer than ``idle_ttl`` seconds are
+    dropped by ``unload_idle`` (run periodically once ``start`` has been called) and reloaded on
+    the next ``get``.
+    """
+
+    def __init__(self, idle_ttl: float = MODEL_IDLE_TTL_SECONDS, warm_up: bool = MODEL_WARMUP):
+        self.idle_ttl = idle_ttl
+        self.warm_up_on_start = warm_up
+        self._loaders: Dict[str, Callable] = {}
+        self._models = {}
+        self._last_used: Dict[str, float] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper = None
+
+    def register(self, name: str, loader: Callable):
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str):
+        """
+        Return the model registered under ``name``, loading it on first use.
+        """
+        with self._lock:
+            if name not in self._loaders:
+                raise KeyError(f"No model registered under '{name}'")
+            model = self._models.get(name)
+            load_lock = self._load_locks[name]
+        if model is None:
+            with load_lock:  # Concurrent callers wait for a single load
+                model = self._models.get(name)
+                if model is None:
+                    model = self._loaders[name]()
+                    with self._lock:
+                        self._models[name] = model
+        self._last_used[name] = time.monotonic()
+        return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def unload(self, name: str):
+        with self._lock:
+            self._models.pop(name, None)
+            self._last_used.pop(name, None)
+        gc.collect()
+
+    def unload_idle(self, now: Optional[float] = None) -> List[str]:
+        """
+        Drop every model that has not been used for longer than the idle TTL.
+        """
+        if self.idle_ttl <= 0:
+            return []
+        now = time.monotonic() if now is None else now
+        idle = [name for name, last_used in list(self._last_used.items()) if now - last_used > self.idle_ttl]
+        for name in idle:
+            self.unload(name)
+        return idle
+
+    def warm_up(self, names: Optional[List[str]] = None):
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def start(self):
+        """
+        Optionally warm up every registered model and start unloading idle ones.
+        """
+        if self.warm_up_on_start:
+            self.warm_up()
+        if self.idle_ttl > 0 and self._reaper is None:
+            self._stop.clear()
+            self._reaper = threading.Thread(target=self._reap, daemon=True)
+            self._reaper.start()
+
+    def stop(self):
+        self._stop.set()
+        self._reaper = None
+
+    def _reap(self):
+        while not self._stop.wait(max(self.idle_ttl / 2, 1.0)):
+            self.unload_idle()
+
+
+model_registry = ModelRegistry()
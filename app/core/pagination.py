@@ -0,0 +1,39 @@
+# app/core/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple, Union
+
+CursorValue = Union[datetime, int]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(value: CursorValue, document_id: int, sort: Optional[str] = None) -> str:
+    """
+    Opaque cursor pointing just past a document in the ``(value, id)`` ordering: the upload
+    timestamp by default, or the statistic named by ``sort``, which the cursor remembers.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value, document_id]
+    if sort is not None:
+        payload.append(sort)
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[str] = None) -> Tuple[CursorValue, int]:
+    """
+    ``(value, id)`` of a cursor, which must come from a listing in the ``sort`` order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, document_id, *cursor_sort = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = datetime.fromisoformat(value) if isinstance(value, str) else int(value)
+        document_id = int(document_id)
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if (cursor_sort[0] if cursor_sort else None) != sort:
+        raise InvalidCursorError(f"Cursor does not belong to this sort order: {cursor}")
+    return value, document_id
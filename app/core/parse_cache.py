@@ -0,0 +1,168 @@
+# app/core/parse_cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.file_storage import hash_file
+from app.models.parse_result_models import ParseResult
+
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "256"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded both by entry count and by the total size of its values.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return  # Never let a single oversized value flush the whole cache
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self.total_bytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+def _result_size(result: dict) -> int:
+    return len(result["summary"]) + sum(len(chunk) for chunk in result["chunks"])
+
+
+class ParseCache:
+    """
+    Two-tier cache of parse results keyed by the content hash of the uploaded file and the parse parameters.
+
+    The in-process LRU tier answers repeated requests without touching the database; the
+    persistent tier (the ``parse_results`` table) survives restarts and is shared between workers.
+    """
+
+    def __init__(self, max_entries: int = PARSE_CACHE_MAX_ENTRIES, max_bytes: int = PARSE_CACHE_MAX_BYTES,
+                 persistent: bool = True):
+        self.memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=_result_size)
+        self.persistent = persistent
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_file(file_location: str, block_size: int = 1024 * 1024) -> str:
+        return hash_file(file_location, block_size)
+
+    @staticmethod
+    def make_key(content_hash: str, **params) -> str:
+        """
+        Build the cache key from the content hash and every parameter that influences the parse result.
+        """
+        payload = json.dumps({"content_hash": content_hash, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        result = self.memory.get(key)
+        if result is not None:
+            self._count("memory_hits")
+            return result
+
+        if self.persistent:
+            try:
+                row = ParseResult.get_or_none(ParseResult.cache_key == key)
+            except Exception as e:
+                print(f"Failed to read parse cache: {e}")
+                row = None
+            if row is not None:
+                result = {"summary": row.summary, "chunks": json.loads(row.chunks)}
+                self.memory.set(key, result)
+                self._count("persistent_hits")
+                return result
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, content_hash: str, result: dict):
+        result = {"summary": result["summary"], "chunks": list(result["chunks"])}
+        self.memory.set(key, result)
+
+        if self.persistent:
+            try:
+                ParseResult.insert(
+                    cache_key=key,
+                    content_hash=content_hash,
+                    summary=result["summary"],
+                    chunks=json.dumps(result["chunks"]),
+                ).on_conflict_ignore().execute()
+            except Exception as e:
+                print(f"Failed to write parse cache: {e}")
+
+    def delete_content(self, content_hash: str):
+        """
+        Forget the results parsed from some content, once no document references it.
+        """
+        if not self.persistent:
+            return
+        try:
+            query = ParseResult.select(ParseResult.cache_key).where(ParseResult.content_hash == content_hash)
+            for (cache_key,) in query.tuples():
+                self.memory.pop(cache_key)
+            ParseResult.delete().where(ParseResult.content_hash == content_hash).execute()
+        except Exception as e:
+            print(f"Failed to delete from parse cache: {e}")
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "entries": len(self.memory),
+            "bytes": self.memory.total_bytes,
+        }
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+parse_cache_instance = ParseCache()
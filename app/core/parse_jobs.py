@@ -0,0 +1,210 @@
+# app/core/parse_jobs.py
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from typing import Optional
+
+from app.core.blob_store import BlobStore, blob_store_instance
+from app.core.document_parser import INCREMENTAL_PARSE, PARSE_PARAMS, document_stats
+from app.core.metrics import metrics_registry
+from app.core.parse_cache import ParseCache, parse_cache_instance
+from app.core.parse_worker import _init_worker, _run_parse_job
+from app.core.segment_cache import SegmentCache, segment_cache_instance
+from app.core.sidecar import SidecarStore, sidecar_store_instance
+from app.crud.document_chunk_crud import DocumentChunkCRUD
+from app.crud.document_crud import DocumentCRUD
+from app.crud.parse_job_crud import ParseJobCRUD
+from app.db.database import database_instance
+from app.dependencies import Dependency
+from app.models.parse_job_models import ParseJob
+
+PARSE_JOB_WORKERS = int(os.getenv("PARSE_JOB_WORKERS", "2"))
+PARSE_JOB_QUEUE_DEPTH = int(os.getenv("PARSE_JOB_QUEUE_DEPTH", "32"))
+
+logger = logging.getLogger(__name__)
+
+
+class ParseQueueFullError(Exception):
+    """Raised when the number of unfinished parse jobs has reached the configured queue depth."""
+
+
+class ParseJobQueue:
+    """
+    Runs document parsing in a bounded pool of worker processes.
+
+    Jobs are stored in the ``parse_jobs`` table so their status survives restarts; unfinished jobs
+    are resubmitted by ``recover`` at startup. Workers only compute results; every database write
+    happens in this process, on the threads that receive results and progress, each batch of
+    writes with a connection checked out of the pool for it.
+    """
+
+    def __init__(self, parse_cache: Optional[ParseCache] = None, job_crud: Optional[ParseJobCRUD] = None,
+                 document_crud: Optional[DocumentCRUD] = None, blob_store: Optional[BlobStore] = None,
+                 chunk_crud: Optional[DocumentChunkCRUD] = None, segment_cache: Optional[SegmentCache] = None,
+                 sidecar_store: Optional[SidecarStore] = None, dependency: Optional[Dependency] = None,
+                 max_workers: int = PARSE_JOB_WORKERS, max_queue_depth: int = PARSE_JOB_QUEUE_DEPTH):
+        self.dependency = dependency or Dependency(database_instance)
+        self.parse_cache = parse_cache or parse_cache_instance
+        self.blob_store = blob_store or blob_store_instance
+        self.job_crud = job_crud or ParseJobCRUD(db=None)
+        self.document_crud = document_crud or DocumentCRUD(db=None)
+        self.chunk_crud = chunk_crud or DocumentChunkCRUD(db=None)
+        self.segment_cache = segment_cache or segment_cache_instance
+        self.sidecar_store = sidecar_store or sidecar_store_instance
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.parse_params = PARSE_PARAMS
+        self._executor = None
+        self._progress_queue = None
+        self._progress_thread = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the worker pool, if it is not running yet.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._start_executor()
+
+    def _start_executor(self):
+        # Worker processes are spawned rather than forked: forking a process that already
+        # initialized torch thread pools can deadlock. Their entry points live in parse_worker,
+        # which imports the parser alone.
+        context = multiprocessing.get_context("spawn")
+        self._progress_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue,),
+        )
+        self._progress_thread = threading.Thread(target=self._consume_progress, daemon=True)
+        self._progress_thread.start()
+
+    def shutdown(self):
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.put(None)
+        self._executor = None
+
+    def recover(self):
+        """
+        Resubmit the jobs left unfinished by a previous run. A startup step, run once before any
+        job is submitted: later, unfinished jobs are the ones in flight.
+        """
+        with self.dependency.connection():
+            for job in self.job_crud.get_unfinished_jobs():
+                document = self.document_crud.get_document(document_id=job.document_id)
+                if document is None:
+                    self.job_crud.update_job(job.id, status=ParseJob.FAILED, error="Document not found")
+                    continue
+                self.job_crud.update_job(job.id, status=ParseJob.QUEUED, progress=0.0)
+                self._dispatch(job.id, document, segments=self._previous_segments(document))
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def submit(self, document) -> ParseJob:
+        """
+        Enqueue a parse of ``document``; results already in the parse cache complete immediately.
+        """
+        if self.in_flight() >= self.max_queue_depth:
+            raise ParseQueueFullError(f"Parse queue is full ({self.max_queue_depth} jobs)")
+
+        content_hash = self.blob_store.content_hash(document)
+        cached = self.parse_cache.get(self.parse_cache.make_key(content_hash, **self.parse_params))
+        if cached is not None:
+            self.chunk_crud.copy_chunks(document.id, content_hash)
+            self.document_crud.copy_parsed_text(document.id, content_hash)
+            return self.job_crud.create_job(
+                document.id, status=ParseJob.DONE, progress=1.0, result=json.dumps(cached)
+            )
+
+        job = self.job_crud.create_job(document.id)
+        self._dispatch(job.id, document, content_hash, self._previous_segments(document))
+        return job
+
+    def get(self, job_id: int) -> Optional[ParseJob]:
+        return self.job_crud.get_job(job_id)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight(),
+            "max_queue_depth": self.max_queue_depth,
+            "max_workers": self.max_workers,
+        }
+
+    def _previous_segments(self, document) -> dict:
+        """
+        Cached segments of the previous version of a document's file, which the worker cannot read
+        from the database itself.
+        """
+        if not INCREMENTAL_PARSE:
+            return {}
+        return self.segment_cache.get_many(self.document_crud.get_previous_segment_keys(document.file_name))
+
+    def _dispatch(self, job_id: int, document, content_hash: Optional[str] = None, segments: Optional[dict] = None):
+        self.start()
+        file_location = self.blob_store.location(document)
+        if content_hash is None:
+            content_hash = self.blob_store.content_hash(document)
+        with self._lock:
+            future = self._executor.submit(_run_parse_job, job_id, file_location, document.file_type, segments)
+            self._futures[job_id] = future
+        future.add_done_callback(
+            lambda done: self._on_done(job_id, document.id, content_hash, done)
+        )
+
+    def _on_done(self, job_id: int, document_id: int, content_hash: str, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        try:
+            try:
+                result = future.result()
+            except CancelledError:
+                return  # Left queued in the database and resubmitted on the next start
+            except Exception as e:
+                logger.exception("Parse job %s failed", job_id)
+                with self.dependency.connection():
+                    self.job_crud.update_job(job_id, status=ParseJob.FAILED, error=str(e))
+                return
+
+            metrics_registry.merge(result.pop("metrics", {}))  # Observed in the worker, served from here
+            parsed = {"chunks": result["chunks"], "summary": result["summary"]}
+            cache_key = self.parse_cache.make_key(content_hash, **self.parse_params)
+            self.sidecar_store.write(content_hash, cache_key, result)
+            with self.dependency.connection():
+                self.document_crud.update_parsed_text(document_id, result["text"], content_hash)
+                self.document_crud.update_stats(document_id, content_hash, document_stats(result))
+                self.chunk_crud.replace_chunks(
+                    document_id, result["chunks"], result["token_spans"], result.get("embeddings")
+                )
+                self.segment_cache.set_many(result.get("segments") or {})
+                if result.get("segment_keys") is not None:
+                    self.document_crud.update_segment_keys(document_id, content_hash, result["segment_keys"])
+                if not result.get("summary_partial"):
+                    self.parse_cache.set(cache_key, content_hash, parsed)
+                self.job_crud.update_job(job_id, status=ParseJob.DONE, progress=1.0, result=json.dumps(parsed))
+        except Exception:
+            logger.exception("Failed to store result of parse job %s", job_id)
+
+    def _consume_progress(self):
+        while True:
+            event = self._progress_queue.get()
+            if event is None:
+                return
+            job_id, fraction = event
+            if fraction >= 1.0:
+                continue  # Completion is recorded together with the result in _on_done
+            try:
+                with self.dependency.connection():
+                    self.job_crud.update_progress(job_id, fraction)
+            except Exception:
+                logger.exception("Failed to update progress of parse job %s", job_id)
@@ -0,0 +1,38 @@
+# app/core/parse_worker.py
+"""
+Entry points of the parse job worker processes.
+
+Workers are spawned and import this module by name, so it imports the parser and nothing of the
+web app or the job bookkeeping: a worker builds no app, opens no database connection and runs no
+startup migration.
+"""
+from typing import Dict, Optional
+
+from app.core.document_parser import DocumentParser
+from app.core.metrics import metrics_registry
+
+# State of a worker process, set up by _init_worker.
+_progress_queue = None
+_worker_parser = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_parse_job(job_id: int, file_location: str, file_type: str, segments: Optional[Dict[str, dict]] = None) -> dict:
+    """
+    Parse a document, reusing the cached ``segments`` loaded by the parent; the parser and its
+    models are built once per process. The stage timings and sizes observed in this process are
+    returned under ``metrics``, for the parent to record.
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = DocumentParser()
+    result = _worker_parser.parse(
+        file_location, file_type, progress=lambda fraction: _progress_queue.put((job_id, fraction)),
+        segments=segments,
+    )
+    result["metrics"] = metrics_registry.drain()
+    return result
@@ -0,0 +1,199 @@
+# app/core/pdf_extraction.py
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+from app.core.parse_cache import LRUCache
+
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+PDF_PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PDF_PAGE_CACHE_MAX_ENTRIES", "20000"))
+PDF_PAGE_CACHE_MAX_BYTES = int(os.getenv("PDF_PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+# State of a worker process, set up by _init_worker: the PDF it read last, as ``(key, reader)``.
+_worker_document = None
+
+
+def _init_worker():
+    global _worker_document
+    _worker_document = None
+
+
+def _worker_reader(file_location: str):
+    """
+    Reader of a PDF inside a worker process. The ranges of one document usually land on the same
+    workers one after the other, so the last document read is kept open instead of parsing the
+    file again for every range.
+    """
+    global _worker_document
+    from pypdf import PdfReader
+    stat = os.stat(file_location)
+    key = (file_location, stat.st_size, stat.st_mtime_ns)
+    if _worker_document is None or _worker_document[0] != key:
+        _worker_document = (key, PdfReader(file_location))
+    return _worker_document[1]
+
+
+def _extract_page_range(file_location: str, page_numbers: List[int]) -> List[str]:
+    """
+    Entry point executed inside a worker process: extract the text of some pages of a PDF.
+    """
+    pdf_reader = _worker_reader(file_location)
+    return [pdf_reader.pages[number].extract_text() for number in page_numbers]
+
+
+def _object_digest(obj, memo: dict, active: set) -> bytes:
+    """
+    Hash of a PDF object by value, following references. Objects reached through a reference are
+    hashed once per document (``memo``); a reference back to an object being hashed (``active``)
+    stands for itself. Image data cannot change the text, so only the image dictionary is hashed.
+    """
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        if ref in memo:
+            return memo[ref]
+        if ref in active:
+            return b"cycle"
+        active.add(ref)
+        try:
+            value = _object_digest(obj.get_object(), memo, active)
+        finally:
+            active.discard(ref)
+        memo[ref] = value
+        return value
+
+    digest = hashlib.sha256(type(obj).__name__.encode("utf-8"))
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj.keys()):
+            if key not in ("/Parent", "/P"):  # Back references to the page tree
+                digest.update(key.encode("utf-8"))
+                digest.update(_object_digest(obj.raw_get(key), memo, active))
+        if isinstance(obj, StreamObject) and obj.get("/Subtype") != "/Image":
+            digest.update(obj.get_data())
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            digest.update(_object_digest(item, memo, active))
+    else:
+        digest.update(repr(obj).encode("utf-8"))
+    return digest.digest()
+
+
+def page_fingerprint(page, memo: Optional[dict] = None) -> str:
+    """
+    Hash of everything on a page that determines its extracted text: the content stream and every
+    resource it draws with, resolved by value (fonts with their encodings and ToUnicode maps, form
+    XObjects with their own resources, and so on). Identical pages in different files, or in
+    different versions of a file, share a fingerprint. ``memo`` carries the hashes of shared
+    objects between the pages of one document.
+    """
+    memo = {} if memo is None else memo
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    resources = page.raw_get("/Resources") if "/Resources" in page else None
+    if resources is not None:
+        digest.update(_object_digest(resources, memo, set()))
+    digest.update(repr(page.get("/Rotate", 0)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _page_ranges(page_numbers: List[int], pages_per_task: int) -> List[List[int]]:
+    return [page_numbers[i:i + pages_per_task] for i in range(0, len(page_numbers), pages_per_task)]
+
+
+class PdfTextExtractor:
+    """
+    Extracts PDF text page by page, fanning large documents out over a pool of worker processes.
+
+    pypdf's extraction is pure Python and bound to one core, so pages missing from the per-page
+    cache are split into ranges of ``pages_per_task`` and extracted in parallel once there are at
+    least ``parallel_min_pages`` of them; the text is reassembled in page order. Cached pages are
+    looked up by fingerprint, so re-requested or partially edited documents only extract the pages
+    that changed.
+    """
+
+    def __init__(self, max_workers: int = PDF_EXTRACTION_WORKERS, pages_per_task: int = PDF_PAGES_PER_TASK,
+                 parallel_min_pages: int = PDF_PARALLEL_MIN_PAGES, page_cache: Optional[LRUCache] = None,
+                 executor=None):
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self.parallel_min_pages = parallel_min_pages
+        self.page_cache = page_cache or LRUCache(
+            max_entries=PDF_PAGE_CACHE_MAX_ENTRIES, max_bytes=PDF_PAGE_CACHE_MAX_BYTES
+        )
+        self._executor = executor
+        self._lock = threading.Lock()
+
+    def extract_text(self, file_location: str) -> str:
+        return "".join(self.iter_pages(file_location))
+
+    def extract_pages(self, file_location: str) -> List[str]:
+        return list(self.iter_pages(file_location))
+
+    def iter_pages(self, file_location: str) -> Iterator[str]:
+        """
+        Yield the text of each page in order, as soon as it and every page before it are available.
+        """
+        from pypdf import PdfReader
+        with open(file_location, "rb") as f:
+            pdf_reader = PdfReader(f)
+            memo = {}
+            fingerprints = [page_fingerprint(page, memo) for page in pdf_reader.pages]
+            missing = [number for number, fingerprint in enumerate(fingerprints)
+                       if self.page_cache.get(fingerprint) is None]
+
+            if len(missing) < max(self.parallel_min_pages, 1) or self.max_workers <= 1:
+                extracted = (pdf_reader.pages[number].extract_text() for number in missing)
+            else:
+                extracted = self._extract_in_parallel(file_location, missing)
+
+            pending = iter(missing)
+            next_missing = next(pending, None)
+            for number, fingerprint in enumerate(fingerprints):
+                if number == next_missing:
+                    text = next(extracted)
+                    self.page_cache.set(fingerprint, text)
+                    next_missing = next(pending, None)
+                else:
+                    text = self.page_cache.get(fingerprint)
+                    if text is None:  # Evicted since the lookup above
+                        text = pdf_reader.pages[number].extract_text()
+                yield text
+
+    def _extract_in_parallel(self, file_location: str, page_numbers: List[int]) -> Iterator[str]:
+        ranges = _page_ranges(page_numbers, self.pages_per_task)
+        futures = [
+            self._get_executor().submit(_extract_page_range, file_location, page_range) for page_range in ranges
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked, like the parse job workers, to stay clear of torch thread pools
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+pdf_text_extractor = PdfTextExtractor()
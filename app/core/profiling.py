@@ -0,0 +1,174 @@
+# app/core/profiling.py
+import contextvars
+import functools
+import inspect
+import os
+import pstats
+import random
+import re
+import time
+from typing import Callable, List, Optional
+
+from fastapi.routing import APIRoute
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_REQUEST_MS", "1000"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILER = os.getenv("PROFILER", "cprofile")  # "cprofile" or "pyinstrument"
+
+# Set by the middleware for a sampled request; every profiler started for the request is added to it
+_sampled_request = contextvars.ContextVar("sampled_request", default=None)
+
+
+class _CProfiler:
+    extension = "prof"
+
+    def __init__(self):
+        import cProfile
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    @staticmethod
+    def dump(profiles: List["_CProfiler"], path: str):
+        stats = pstats.Stats(profiles[0]._profile)
+        for profile in profiles[1:]:
+            stats.add(profile._profile)
+        stats.dump_stats(path)
+
+
+class _Pyinstrument:
+    extension = "html"
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self._profiler = Profiler(async_mode="enabled")
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self):
+        self._profiler.stop()
+
+    @staticmethod
+    def dump(profiles: List["_Pyinstrument"], path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(profile._profiler.output_html() for profile in profiles))
+
+
+PROFILERS = {"cprofile": _CProfiler, "pyinstrument": _Pyinstrument}
+
+
+class SlowRequestProfiler:
+    """
+    Profiles a random sample of requests and keeps the trace of those slower than ``slow_ms``.
+
+    The middleware marks a request as sampled; the endpoint itself is profiled by the wrapper that
+    ``ProfiledRoute`` puts around it, in whichever thread it runs, so sync endpoints are traced in
+    their threadpool worker rather than on the event loop. Work an async endpoint hands to the
+    executors is profiled in its own thread by ``run_profiled`` and merged into the same trace. Traces are written to ``directory`` as
+    cProfile stats (``.prof``, readable with ``pstats`` or snakeviz) or pyinstrument HTML reports.
+    """
+
+    def __init__(self, sample_rate: float = PROFILE_SAMPLE_RATE, slow_ms: float = PROFILE_SLOW_REQUEST_MS,
+                 directory: str = PROFILE_DIR, profiler: str = PROFILER):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.directory = directory
+        self.profiler = profiler
+        self.dumped = 0
+
+    def begin(self) -> Optional[contextvars.Token]:
+        """
+        Decide whether the current request is sampled; returns a token to pass to ``end`` if it is.
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        return _sampled_request.set({"profiler": self.profiler, "profiles": []})
+
+    def end(self, token: Optional[contextvars.Token], method: str, route: str, duration: float) -> Optional[str]:
+        """
+        Dump the trace of a sampled request that was slow; returns the path of the trace, if any.
+        """
+        if token is None:
+            return None
+        sampled = _sampled_request.get()
+        _sampled_request.reset(token)
+        profiles = sampled["profiles"]
+        if not profiles or duration * 1000 < self.slow_ms:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{method}-{slug}-{int(duration * 1000)}ms.{profiles[0].extension}"
+        path = os.path.join(self.directory, name)
+        try:
+            profiles[0].dump(profiles, path)
+        except Exception as e:
+            print(f"Failed to write request profile: {e}")
+            return None
+        self.dumped += 1
+        return path
+
+
+request_profiler = SlowRequestProfiler()
+
+
+def _start_profile():
+    sampled = _sampled_request.get()
+    if sampled is None or sampled["profiler"] is None:
+        return None
+    try:
+        profile = PROFILERS[sampled["profiler"]]()
+        profile.start()
+    except Exception as e:  # Unknown profiler, pyinstrument missing, or another profiler already active
+        print(f"Failed to start request profiler: {e}")
+        sampled["profiler"] = None
+        return None
+    sampled["profiles"].append(profile)
+    return profile
+
+
+def run_profiled(func: Callable, *args, **kwargs):
+    """
+    Call ``func``, under a profiler of its own when the current request is sampled. Used for work a
+    request hands to another thread, whose trace is merged into the request's.
+    """
+    profile = _start_profile()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if profile is not None:
+            profile.stop()
+
+
+def profile_endpoint(endpoint: Callable) -> Callable:
+    """
+    Wrap an endpoint so it runs under a profiler when its request is sampled.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def profiled_endpoint(*args, **kwargs):
+            profile = _start_profile()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.stop()
+    else:
+        @functools.wraps(endpoint)
+        def profiled_endpoint(*args, **kwargs):
+            return run_profiled(endpoint, *args, **kwargs)
+    return profiled_endpoint
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route class whose endpoint is profiled on requests the middleware sampled.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, profile_endpoint(endpoint), **kwargs)
@@ -0,0 +1,183 @@
+# app/core/search.py
+import heapq
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from peewee import Expression, fn
+
+from app.models.document_models import Document, METADATA_FIELDS
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "postgres")  # "postgres" or "memory"
+SEARCH_TEXT_CONFIG = os.getenv("SEARCH_TEXT_CONFIG", "english")
+SEARCH_SNIPPET_WORDS = 20
+
+_WORD = re.compile(r"\w+")
+
+
+class PostgresSearchIndex:
+    """
+    Full-text search over ``documents.search_vector``, a tsvector kept up to date by
+    ``DocumentCRUD`` in the same statement that stores a document's parsed text.
+
+    Matching goes through the GIN index on the vector; only matching rows are ranked, and the
+    comparatively expensive snippets are built for the rows of the requested page alone.
+    """
+
+    def __init__(self, config: str = SEARCH_TEXT_CONFIG):
+        self.config = config
+
+    def start(self):
+        """
+        Compute vectors for documents parsed before the search column existed.
+        """
+        try:
+            Document.update(search_vector=fn.to_tsvector(self.config, Document.parsed_text)).where(
+                Document.search_vector.is_null() & Document.parsed_text.is_null(False)
+            ).execute()
+        except Exception as e:
+            print(f"Failed to backfill search vectors: {e}")
+
+    def document_fields(self, parsed_text: Optional[str]) -> dict:
+        """
+        Extra column values to write alongside a document's parsed text.
+        """
+        if parsed_text is None:
+            return {"search_vector": None}
+        return {"search_vector": fn.to_tsvector(self.config, parsed_text)}
+
+    def index_document(self, document_id: int, parsed_text: Optional[str]):
+        pass  # Written together with parsed_text through document_fields
+
+    def remove_document(self, document_id: int):
+        pass  # Removed with the row
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[dict]:
+        tsquery = fn.websearch_to_tsquery(self.config, query)
+        rank = fn.ts_rank_cd(Document.search_vector, tsquery)
+        page = (
+            Document.select(Document.id, rank.alias("rank"))
+            .where(Expression(Document.search_vector, "@@", tsquery))
+            .order_by(rank.desc(), Document.id.desc())
+            .limit(limit)
+            .offset(offset)
+            .alias("page")
+        )
+        snippet = fn.ts_headline(
+            self.config, Document.parsed_text, tsquery,
+            f"MaxFragments=2, MinWords=5, MaxWords={SEARCH_SNIPPET_WORDS}",
+        )
+        rows = (
+            Document.select(*METADATA_FIELDS, page.c.rank.alias("rank"), snippet.alias("snippet"))
+            .join(page, on=(Document.id == page.c.id))
+            .order_by(page.c.rank.desc(), Document.id.desc())
+            .dicts()
+        )
+        return list(rows)
+
+
+class InvertedIndex:
+    """
+    In-process search index for deployments and tests without Postgres.
+
+    Keeps a posting list per lowercased word and ranks documents matching every query word with
+    BM25. It is rebuilt from the ``documents`` table by ``start`` and then updated incrementally.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)  # word -> {document id: frequency}
+        self._lengths: Dict[int, int] = {}
+        self._texts: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def start(self):
+        try:
+            rows = Document.select(Document.id, Document.parsed_text).where(Document.parsed_text.is_null(False))
+            for document_id, parsed_text in rows.tuples().iterator():
+                self.index_document(document_id, parsed_text)
+        except Exception as e:
+            print(f"Failed to build search index: {e}")
+
+    def document_fields(self, parsed_text: Optional[str]) -> dict:
+        return {}
+
+    def index_document(self, document_id: int, parsed_text: Optional[str]):
+        self.remove_document(document_id)
+        if parsed_text is None:
+            return
+        words = Counter(word.lower() for word in _WORD.findall(parsed_text))
+        with self._lock:
+            for word, frequency in words.items():
+                self._postings[word][document_id] = frequency
+            self._lengths[document_id] = sum(words.values())
+            self._texts[document_id] = parsed_text
+
+    def remove_document(self, document_id: int):
+        with self._lock:
+            if self._lengths.pop(document_id, None) is None:
+                return
+            text = self._texts.pop(document_id)
+            for word in set(word.lower() for word in _WORD.findall(text)):
+                postings = self._postings.get(word)
+                if postings is not None:
+                    postings.pop(document_id, None)
+                    if not postings:
+                        del self._postings[word]
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[dict]:
+        terms = list(dict.fromkeys(word.lower() for word in _WORD.findall(query)))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            total = len(self._lengths)
+            average_length = sum(self._lengths.values()) / total
+            candidates = set.intersection(*(set(posting) for posting in postings))
+            scores = {}
+            for document_id in candidates:
+                length_norm = self.k1 * (1 - self.b + self.b * self._lengths[document_id] / average_length)
+                score = 0.0
+                for posting in postings:
+                    frequency = posting[document_id]
+                    idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                    score += idf * frequency * (self.k1 + 1) / (frequency + length_norm)
+                scores[document_id] = score
+            ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], item[0]))[offset:]
+            snippets = {document_id: _snippet(self._texts[document_id], set(terms)) for document_id, _ in ranked}
+
+        metadata = {
+            row["id"]: row
+            for row in Document.select(*METADATA_FIELDS).where(Document.id.in_([id for id, _ in ranked])).dicts()
+        } if ranked else {}
+        return [
+            {**metadata[document_id], "rank": score, "snippet": snippets[document_id]}
+            for document_id, score in ranked
+            if document_id in metadata  # Deleted since it was ranked
+        ]
+
+
+def _snippet(text: str, terms: set, words: int = SEARCH_SNIPPET_WORDS) -> str:
+    """
+    A window of text around the first query word, with query words wrapped in <b> like ts_headline.
+    """
+    matches = list(_WORD.finditer(text))
+    first = next((i for i, match in enumerate(matches) if match.group().lower() in terms), 0)
+    window = matches[max(0, first - words // 4):max(0, first - words // 4) + words]
+    if not window:
+        return ""
+    fragment = text[window[0].start():window[-1].end()]
+    return _WORD.sub(lambda m: f"<b>{m.group()}</b>" if m.group().lower() in terms else m.group(), fragment)
+
+
+search_index_instance = InvertedIndex() if SEARCH_BACKEND == "memory" else PostgresSearchIndex()
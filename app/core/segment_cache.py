@@ -0,0 +1,154 @@
+# app/core/segment_cache.py
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+from peewee import EXCLUDED, chunked, fn
+
+from app.core.parse_cache import LRUCache, ParseCache
+from app.models.parse_segment_models import ParseSegment
+
+SEGMENT_CACHE_MAX_ENTRIES = int(os.getenv("SEGMENT_CACHE_MAX_ENTRIES", "4096"))
+SEGMENT_CACHE_MAX_BYTES = int(os.getenv("SEGMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SEGMENT_INSERT_BATCH_SIZE = 100
+SEGMENT_SELECT_BATCH_SIZE = 500  # Keys per IN list when loading segments
+
+
+def _segment_size(segment: dict) -> int:
+    embeddings = segment.get("embeddings")
+    token_ids = segment.get("token_ids")
+    return (
+        len(segment["text"]) + sum(len(chunk) for chunk in segment["chunks"])
+        + sum(len(summary) for summary in segment.get("summaries") or ())
+        + (embeddings.nbytes if embeddings is not None else 0)
+        + (token_ids.nbytes if token_ids is not None else 0)
+    )
+
+
+def _to_segment(row: ParseSegment) -> dict:
+    chunks = json.loads(row.chunks)
+    embeddings = None
+    if row.embeddings is not None:
+        embeddings = np.frombuffer(bytes(row.embeddings), dtype=np.float32).reshape(len(chunks), -1)
+    return {
+        "text": row.text,
+        "token_count": row.token_count,
+        "chunks": chunks,
+        "token_spans": [tuple(span) for span in json.loads(row.token_spans)],
+        "char_spans": [tuple(span) for span in json.loads(row.char_spans)] if row.char_spans is not None else None,
+        "token_ids": np.frombuffer(bytes(row.token_ids), dtype=np.uint32) if row.token_ids is not None else None,
+        "embeddings": embeddings,
+        "summaries": json.loads(row.summaries) if row.summaries is not None else None,
+    }
+
+
+def _to_row(key: str, segment: dict) -> dict:
+    embeddings = segment.get("embeddings")
+    token_ids = segment.get("token_ids")
+    summaries = segment.get("summaries")
+    return {
+        "cache_key": key,
+        "text": segment["text"],
+        "token_count": segment["token_count"],
+        "chunks": json.dumps(segment["chunks"]),
+        "token_spans": json.dumps(segment["token_spans"]),
+        "char_spans": json.dumps(segment["char_spans"]) if segment.get("char_spans") is not None else None,
+        "token_ids": np.ascontiguousarray(token_ids, dtype=np.uint32).tobytes() if token_ids is not None else None,
+        "embeddings": np.ascontiguousarray(embeddings, dtype=np.float32).tobytes() if embeddings is not None else None,
+        "summaries": json.dumps(summaries) if summaries is not None else None,
+    }
+
+
+class SegmentCache:
+    """
+    Parse results of individual segment groups (a few pages, slides or paragraphs), keyed by the
+    content hash of their text and the parse parameters, so a re-uploaded document only reprocesses
+    the groups that changed.
+
+    A segment holds its text, token count and ids, chunks with their token offsets within the segment, and,
+    once computed, the chunk embeddings and the map-level summaries. Like ``ParseCache`` it has an
+    in-process LRU tier in front of the ``parse_segments`` table. The parser only reads the
+    in-process tier, plus the segments it is handed: the table is read by ``get_many``, in
+    batches, where the parse is prepared with a database connection, and the segments the parser
+    computed are returned with the parse result and written by ``set_many`` where it is stored.
+    """
+
+    def __init__(self, max_entries: int = SEGMENT_CACHE_MAX_ENTRIES, max_bytes: int = SEGMENT_CACHE_MAX_BYTES,
+                 persistent: bool = True):
+        self.memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=_segment_size)
+        self.persistent = persistent
+
+    @staticmethod
+    def make_key(content_hash: str, **params) -> str:
+        return ParseCache.make_key(content_hash, **params)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        A segment from the in-process tier; never queries the database.
+        """
+        return self.memory.get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        """
+        The segments of ``keys`` found in either tier, reading the table in batches.
+        """
+        segments = {}
+        for key in keys:
+            segment = self.memory.get(key)
+            if segment is not None:
+                segments[key] = segment
+        missing = [key for key in dict.fromkeys(keys) if key not in segments]
+        if not self.persistent or not missing:
+            return segments
+
+        try:
+            for batch in chunked(missing, SEGMENT_SELECT_BATCH_SIZE):
+                for row in ParseSegment.select().where(ParseSegment.cache_key.in_(batch)):
+                    segments[row.cache_key] = segment = _to_segment(row)
+                    self.memory.set(row.cache_key, segment)
+        except Exception as e:
+            print(f"Failed to read segment cache: {e}")
+        return segments
+
+    def set_many(self, segments: Dict[str, dict]):
+        """
+        Store new segments, or replace segments that gained embeddings or summaries.
+        """
+        for key, segment in segments.items():
+            self.memory.set(key, segment)
+
+        if self.persistent and segments:
+            try:
+                rows = [_to_row(key, segment) for key, segment in segments.items()]
+                with ParseSegment._meta.database.atomic():
+                    for batch in chunked(rows, SEGMENT_INSERT_BATCH_SIZE):
+                        # Never let a concurrent parse that computed less overwrite what is stored
+                        ParseSegment.insert_many(batch).on_conflict(
+                            conflict_target=[ParseSegment.cache_key],
+                            update={
+                                ParseSegment.token_ids: fn.COALESCE(EXCLUDED.token_ids, ParseSegment.token_ids),
+                                ParseSegment.char_spans: fn.COALESCE(EXCLUDED.char_spans, ParseSegment.char_spans),
+                                ParseSegment.embeddings: fn.COALESCE(EXCLUDED.embeddings, ParseSegment.embeddings),
+                                ParseSegment.summaries: fn.COALESCE(EXCLUDED.summaries, ParseSegment.summaries),
+                            },
+                        ).execute()
+            except Exception as e:
+                print(f"Failed to write segment cache: {e}")
+
+    def delete_many(self, keys: List[str]):
+        """
+        Delete segments that no document refers to any more.
+        """
+        for key in keys:
+            self.memory.pop(key)
+
+        if self.persistent and keys:
+            try:
+                for batch in chunked(keys, SEGMENT_SELECT_BATCH_SIZE):
+                    ParseSegment.delete().where(ParseSegment.cache_key.in_(batch)).execute()
+            except Exception as e:
+                print(f"Failed to delete from segment cache: {e}")
+
+
+segment_cache_instance = SegmentCache()
@@ -0,0 +1,252 @@
+# app/core/sidecar.py
+import mmap
+import os
+import shutil
+import struct
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SIDECAR_ROOT = os.getenv("SIDECAR_ROOT", "uploads/sidecars")
+SIDECAR_CHECKPOINT_CHARS = 1024  # Characters between two entries of the character-to-byte index
+
+MAGIC = b"DKSIDE01"
+# magic, char count, byte count, token count, page count, chunk count, checkpoint interval, has token ids
+HEADER = struct.Struct("<8sQQQIIII")
+HEADER_SIZE = 64
+
+
+class SidecarFormatError(ValueError):
+    """Raised when a file is not a text sidecar, or was written by an incompatible version."""
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def locate_chunks(text: str, chunks: Sequence[str]) -> List[Tuple[int, int]]:
+    """
+    Character span of each chunk in ``text``, for chunks whose spans were not recorded by the
+    chunker (decoded by a tokenizer without offsets). Chunks come in order and may overlap, so
+    each is searched from the start of the previous one; a chunk that is not a slice of the text
+    gets an empty span at the previous chunk's start.
+    """
+    spans = []
+    cursor = 0
+    for chunk in chunks:
+        start = text.find(chunk, cursor)
+        if start < 0:
+            spans.append((cursor, cursor))
+            continue
+        spans.append((start, start + len(chunk)))
+        cursor = start
+    return spans
+
+
+def write_sidecar(path: str, text: str, page_lengths: Sequence[int], chunk_spans: Sequence[Tuple[int, int]],
+                  token_spans: Sequence[Tuple[int, int]], token_ids: Optional[np.ndarray],
+                  checkpoint_chars: int = SIDECAR_CHECKPOINT_CHARS):
+    """
+    Write a document's text sidecar: a 64-byte header followed by 8-byte aligned sections
+
+    - the UTF-8 text,
+    - ``page_count + 1`` uint64 character offsets of the pages (slides, paragraphs),
+    - one row of uint64 ``(char_start, char_end, token_start, token_end)`` per chunk,
+    - the uint64 byte offset of every ``checkpoint_chars``-th character, and
+    - the token ids as packed uint32, when the tokenizer produced integer ids.
+
+    The file is written next to its destination and moved into place, so readers never see a
+    partial sidecar.
+    """
+    data = text.encode("utf-8")
+    page_offsets = np.concatenate(([0], np.cumsum(page_lengths, dtype=np.uint64))).astype(np.uint64)
+    chunk_table = np.array(
+        [(*chunk_span, *token_span) for chunk_span, token_span in zip(chunk_spans, token_spans)], dtype=np.uint64
+    ).reshape(-1, 4)
+    checkpoints = _checkpoints(text, checkpoint_chars)
+    tokens = np.ascontiguousarray(token_ids, dtype=np.uint32) if token_ids is not None else None
+    token_count = int(chunk_table[-1, 3]) if len(chunk_table) else 0
+    if tokens is not None:
+        token_count = len(tokens)
+
+    header = HEADER.pack(
+        MAGIC, len(text), len(data), token_count, len(page_offsets) - 1, len(chunk_table), checkpoint_chars,
+        int(tokens is not None),
+    )
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for section in (data, page_offsets.tobytes(), chunk_table.tobytes(), checkpoints.tobytes(),
+                            tokens.tobytes() if tokens is not None else b""):
+                f.write(section)
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _checkpoints(text: str, checkpoint_chars: int) -> np.ndarray:
+    offsets = [0]
+    position = 0
+    for start in range(0, len(text), checkpoint_chars):
+        position += len(text[start:start + checkpoint_chars].encode("utf-8"))
+        offsets.append(position)
+    return np.array(offsets, dtype=np.uint64)
+
+
+class Sidecar:
+    """
+    Read-only view of a text sidecar through ``mmap``.
+
+    The indexes and token ids are numpy arrays over the mapping, so opening a sidecar reads
+    nothing but its header, and a slice only touches the pages of the file it covers. A text
+    slice decodes just its own bytes, located through the character-to-byte checkpoints.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _load(self):
+        if len(self._mmap) < HEADER_SIZE:
+            raise SidecarFormatError("Truncated sidecar header")
+        (magic, self.char_count, self.byte_count, self.token_count, self.page_count, self.chunk_count,
+         self.checkpoint_chars, has_tokens) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SidecarFormatError("Not a text sidecar")
+
+        offset = _align(HEADER_SIZE + self.byte_count)
+        self._text_start = HEADER_SIZE
+
+        def section(dtype, count):
+            nonlocal offset
+            array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+            offset = _align(offset + array.nbytes)
+            return array
+
+        self.page_offsets = section(np.uint64, self.page_count + 1)
+        self.chunks = section(np.uint64, self.chunk_count * 4).reshape(-1, 4)
+        self._checkpoints = section(np.uint64, -(-self.char_count // self.checkpoint_chars) + 1)
+        self.token_ids = section(np.uint32, self.token_count) if has_tokens else None
+
+    def close(self):
+        # The arrays export the mapping's buffer and must go before it can be closed
+        self.page_offsets = self.chunks = self._checkpoints = self.token_ids = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # A token view is still referenced; the mapping goes away with the last view
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Characters ``[start, end)`` of the text.
+        """
+        end = self.char_count if end is None else min(end, self.char_count)
+        start = min(max(start, 0), end)
+        byte_start = self._byte_offset(start)
+        return self._mmap[byte_start:self._byte_offset(end, byte_start, start)].decode("utf-8")
+
+    def page(self, number: int) -> str:
+        return self.text(int(self.page_offsets[number]), int(self.page_offsets[number + 1]))
+
+    def chunk(self, ordinal: int) -> str:
+        char_start, char_end, _, _ = self.chunks[ordinal]
+        return self.text(int(char_start), int(char_end))
+
+    def tokens(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """
+        Token ids ``[start, end)``, as a view over the file.
+        """
+        if self.token_ids is None:
+            raise SidecarFormatError("This sidecar has no token ids")
+        return self.token_ids[start:end]
+
+    def _byte_offset(self, position: int, known_byte: int = None, known_position: int = None) -> int:
+        checkpoint = position // self.checkpoint_chars
+        base_position = checkpoint * self.checkpoint_chars
+        base = self._text_start + int(self._checkpoints[checkpoint])
+        if known_byte is not None and known_position >= base_position:
+            base, base_position = known_byte, known_position  # Continue from the start of the slice
+        remaining = position - base_position
+        if remaining == 0:
+            return base
+        # At most 4 bytes per character: decode just enough of the text to walk ``remaining`` characters
+        window = self._mmap[base:min(base + 4 * remaining, self._text_start + self.byte_count)]
+        return base + len(window.decode("utf-8", errors="ignore")[:remaining].encode("utf-8"))
+
+
+class SidecarStore:
+    """
+    Directory of text sidecars, one directory per content hash holding a file per parse cache key
+    of the results written from it, so every document with the same content and parse settings
+    shares one file, and the sidecars of some content go away with it in one step.
+    """
+
+    def __init__(self, root: str = SIDECAR_ROOT):
+        self.root = root
+
+    def content_dir(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def path_for(self, content_hash: str, cache_key: str) -> str:
+        return os.path.join(self.content_dir(content_hash), f"{cache_key}.sidecar")
+
+    def exists(self, content_hash: str, cache_key: str) -> bool:
+        return os.path.exists(self.path_for(content_hash, cache_key))
+
+    def write(self, content_hash: str, cache_key: str, result: dict):
+        """
+        Write the sidecar of a parse result unless it exists already. Like a cache write, a failure
+        is reported and does not fail the parse.
+        """
+        if "segment_lengths" not in result:  # Results cached before sidecars existed
+            return
+        path = self.path_for(content_hash, cache_key)
+        if os.path.exists(path):
+            return
+        try:
+            chunk_spans = result.get("char_spans")
+            if chunk_spans is None:
+                chunk_spans = locate_chunks(result["text"], result["chunks"])
+            write_sidecar(
+                path, result["text"], result["segment_lengths"], chunk_spans, result["token_spans"],
+                result.get("token_ids"),
+            )
+        except Exception as e:
+            print(f"Failed to write text sidecar: {e}")
+
+    def open(self, content_hash: str, cache_key: str) -> Optional[Sidecar]:
+        path = self.path_for(content_hash, cache_key)
+        if not os.path.exists(path):
+            return None
+        return Sidecar(path)
+
+    def delete_content(self, content_hash: str):
+        """
+        Delete every sidecar written from some content, once no document references it.
+        """
+        try:
+            shutil.rmtree(self.content_dir(content_hash))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Failed to delete text sidecars: {e}")
+
+
+sidecar_store_instance = SidecarStore()
@@ -0,0 +1,71 @@
+# app/core/summarizer_backends.py
+import os
+from typing import Callable, Dict
+
+SUMMARIZER_BACKEND = os.getenv("SUMMARIZER_BACKEND", "pytorch")
+SUMMARIZER_ONNX_DIR = os.getenv("SUMMARIZER_ONNX_DIR", "models/onnx")
+
+
+class UnknownSummarizerBackendError(ValueError):
+    """Raised when SUMMARIZER_BACKEND names a backend that does not exist."""
+
+
+def _load_pytorch(model_name: str):
+    from transformers import pipeline
+    return pipeline("summarization", model=model_name)
+
+
+def _load_int8(model_name: str):
+    """
+    The PyTorch model with the weights of its linear layers quantized to int8; activations are
+    quantized on the fly, so no calibration data is needed.
+    """
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+
+def _load_onnx(model_name: str):
+    """
+    The model exported to ONNX and run by ONNX Runtime. The export is saved under
+    ``SUMMARIZER_ONNX_DIR`` and reused by later processes.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise ImportError("The onnx summarizer backend requires `pip install optimum[onnxruntime]`") from e
+    from transformers import AutoTokenizer, pipeline
+
+    export_dir = os.path.join(SUMMARIZER_ONNX_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+SUMMARIZER_BACKENDS: Dict[str, Callable] = {
+    "pytorch": _load_pytorch,  # Full precision, the reference output
+    "int8": _load_int8,
+    "onnx": _load_onnx,
+}
+
+
+def load_summarizer(model_name: str, backend: str = SUMMARIZER_BACKEND):
+    """
+    Build a summarization pipeline for ``model_name`` running on the given inference backend.
+    """
+    try:
+        loader = SUMMARIZER_BACKENDS[backend]
+    except KeyError:
+        raise UnknownSummarizerBackendError(
+            f"Unknown summarizer backend '{backend}', expected one of {', '.join(SUMMARIZER_BACKENDS)}"
+        ) from None
+    return loader(model_name)
@@ -0,0 +1,108 @@
+# app/core/summary_batcher.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+from app.core.metrics import MODEL_BATCH_SIZE
+
+SUMMARY_BATCH_WINDOW_MS = float(os.getenv("SUMMARY_BATCH_WINDOW_MS", "10"))
+SUMMARY_MAX_BATCH_SIZE = int(os.getenv("SUMMARY_MAX_BATCH_SIZE", "8"))
+
+
+class _SummaryRequest:
+    def __init__(self, text: str, generate_kwargs: dict):
+        self.text = text
+        self.generate_kwargs = generate_kwargs
+        self.group = tuple(sorted(generate_kwargs.items()))
+        self.future = Future()
+
+
+class SummaryBatcher:
+    """
+    Micro-batching front end for a summarization pipeline.
+
+    Concurrent ``summarize`` calls are queued and run by a single dispatcher thread as one padded
+    batch. A lone request is dispatched immediately; only when several requests are already waiting
+    does the dispatcher hold the batch open for up to ``window_ms`` to let it fill up to
+    ``max_batch_size``. Requests with different generation settings are never mixed in one batch.
+    """
+
+    def __init__(self, summarizer_getter: Callable, window_ms: float = SUMMARY_BATCH_WINDOW_MS,
+                 max_batch_size: int = SUMMARY_MAX_BATCH_SIZE):
+        self.summarizer_getter = summarizer_getter
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = []  # Size of every batch run, most recent last
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def summarize(self, text: str, **generate_kwargs) -> str:
+        return self.submit(text, **generate_kwargs).result()
+
+    def summarize_many(self, texts: List[str], **generate_kwargs) -> List[str]:
+        futures = [self.submit(text, **generate_kwargs) for text in texts]
+        return [future.result() for future in futures]
+
+    def submit(self, text: str, **generate_kwargs) -> Future:
+        self._ensure_started()
+        request = _SummaryRequest(text, generate_kwargs)
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[_SummaryRequest]:
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if len(batch) > 1:  # Under load: give concurrent callers a short window to join
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        return batch
+
+    def _dispatch(self):
+        while True:
+            batch = self._collect()
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.group, []).append(request)
+            for requests in groups.values():
+                self._run(requests)
+
+    def _run(self, requests: List[_SummaryRequest]):
+        # Requests cancelled while queued (their caller ran out of time) are dropped
+        requests = [request for request in requests if request.future.set_running_or_notify_cancel()]
+        if not requests:
+            return
+        self.batch_sizes = (self.batch_sizes + [len(requests)])[-100:]
+        MODEL_BATCH_SIZE.observe(len(requests), model="summarizer")
+        try:
+            summarizer = self.summarizer_getter()
+            results = summarizer(
+                [request.text for request in requests], batch_size=len(requests), **requests[0].generate_kwargs
+            )
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+        for request, result in zip(requests, results):
+            result = result[0] if isinstance(result, list) else result
+            request.future.set_result(result["summary_text"])
@@ -0,0 +1,134 @@
+# app/core/summary_policy.py
+import math
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import Future, wait
+from typing import List, NamedTuple, Optional, Tuple
+
+# Inputs with fewer tokens than the abstractive threshold, but at least this many, get an extractive summary
+SUMMARY_EXTRACTIVE_MIN_TOKENS = int(os.getenv("SUMMARY_EXTRACTIVE_MIN_TOKENS", "64"))
+# Inputs up to this many tokens are decoded greedily; beams are added as the input doubles beyond it
+SUMMARY_GREEDY_MAX_TOKENS = int(os.getenv("SUMMARY_GREEDY_MAX_TOKENS", "1024"))
+SUMMARY_MAX_BEAMS = int(os.getenv("SUMMARY_MAX_BEAMS", "4"))
+SUMMARY_LENGTH_RATIO = float(os.getenv("SUMMARY_LENGTH_RATIO", "0.15"))  # Summary tokens per input token
+SUMMARY_MAP_NUM_BEAMS = int(os.getenv("SUMMARY_MAP_NUM_BEAMS", "1"))  # Partial summaries of long texts
+# Wall-clock seconds a parse may take before its summary is cut short (0 for no limit)
+SUMMARY_TIME_BUDGET_SECONDS = float(os.getenv("SUMMARY_TIME_BUDGET_SECONDS", "0"))
+WORDS_PER_TOKEN = 0.75
+
+# Every setting of the policy that influences a summary, for the parse cache keys.
+POLICY_PARAMS = {
+    "summary_extractive_min_tokens": SUMMARY_EXTRACTIVE_MIN_TOKENS,
+    "summary_greedy_max_tokens": SUMMARY_GREEDY_MAX_TOKENS,
+    "summary_max_beams": SUMMARY_MAX_BEAMS,
+    "summary_length_ratio": SUMMARY_LENGTH_RATIO,
+}
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n")
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not now of off on once only or other
+our ours out over own same she should so some such than that the their theirs them then there these they this
+those through to too under until up very was we were what when where which while who whom why will with would
+you your yours
+""".split())
+
+
+class SummaryPlan(NamedTuple):
+    method: str  # "none", "extractive" or "abstractive"
+    max_length: int  # Tokens
+    min_length: int
+    num_beams: int
+
+
+def plan_summary(token_count: int, abstractive_min_tokens: int, max_length: int, min_length: int) -> SummaryPlan:
+    """
+    How to summarize an input of ``token_count`` tokens.
+
+    Inputs of at least ``abstractive_min_tokens`` go to the model, with a summary length
+    proportional to the input, capped at ``max_length``, and greedy decoding up to
+    ``SUMMARY_GREEDY_MAX_TOKENS``: beam search costs a multiple of the decoding time and
+    mostly pays off on long inputs. Medium inputs get an extractive summary, which costs no
+    inference, and very short ones none.
+    """
+    length = min(max_length, max(2 * min_length, round(token_count * SUMMARY_LENGTH_RATIO)))
+    if token_count >= abstractive_min_tokens:
+        num_beams = 1
+        if token_count > SUMMARY_GREEDY_MAX_TOKENS:
+            num_beams = min(SUMMARY_MAX_BEAMS, 1 + math.ceil(math.log2(token_count / SUMMARY_GREEDY_MAX_TOKENS)))
+        return SummaryPlan("abstractive", length, min(min_length, length // 2), max(num_beams, 1))
+    if token_count >= SUMMARY_EXTRACTIVE_MIN_TOKENS:
+        return SummaryPlan("extractive", length, 0, 0)
+    return SummaryPlan("none", 0, 0, 0)
+
+
+class SummaryBudget:
+    """
+    Wall-clock budget of a summary. Work that would overrun it is cut short, and the summary is
+    built from what finished in time; ``exhausted`` then tells the caller it is partial.
+    """
+
+    def __init__(self, seconds: float = SUMMARY_TIME_BUDGET_SECONDS):
+        self.deadline = time.monotonic() + seconds if seconds > 0 else None
+        self.exhausted = False
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left, or None without a limit.
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def collect(self, futures: List[Future]) -> Tuple[List[str], bool]:
+        """
+        Results of the futures that finish within the budget, in order, and whether all did.
+        Futures still queued when it runs out are cancelled.
+        """
+        if self.deadline is None:
+            return [future.result() for future in futures], True
+        done, pending = wait(futures, timeout=self.remaining())
+        for future in pending:
+            future.cancel()
+        if pending:
+            self.exhausted = True
+        return [future.result() for future in futures if future in done], not pending
+
+
+def _sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_BREAK.split(text) if sentence and sentence.strip()]
+
+
+def extractive_summary(text: str, max_length: int) -> str:
+    """
+    The sentences of ``text`` that best cover its frequent content words, in their original order,
+    within about ``max_length`` tokens.
+
+    A sentence scores the mean frequency, relative to the most frequent one, of its content (non
+    stop) words. Sentences are taken best first while they fit; the first one is cut to fit if
+    even it is too long.
+    """
+    max_words = max(int(max_length * WORDS_PER_TOKEN), 1)
+    sentences = _sentences(text)
+    content = [[word for word in _WORD.findall(sentence.lower()) if word not in _STOPWORDS] for sentence in sentences]
+    frequencies = Counter(word for words in content for word in words)
+    if not frequencies:
+        return ""
+    top = max(frequencies.values())
+    scores = [sum(frequencies[word] for word in words) / (top * len(words)) if words else 0.0 for words in content]
+
+    chosen, length = [], 0
+    for index in sorted(range(len(sentences)), key=lambda index: (-scores[index], index)):
+        words = len(sentences[index].split())
+        if length + words <= max_words:
+            chosen.append(index)
+            length += words
+        elif not chosen:
+            return " ".join(sentences[index].split()[:max_words])
+        if length >= max_words:
+            break
+    return " ".join(sentences[index] for index in sorted(chosen))
@@ -0,0 +1,156 @@
+# app/core/vector_index.py
+import threading
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.embeddings import from_bytes
+from app.models.document_chunk_models import DocumentChunk
+
+VECTOR_INDEX_INITIAL_CAPACITY = 1024
+
+
+class VectorIndex:
+    """
+    In-process index of chunk embeddings answering nearest-neighbour queries by brute force.
+
+    Every embedding lives in one contiguous float32 matrix that grows by doubling, so a query is a
+    single matrix-vector product followed by a partial sort: exact results with BLAS throughput,
+    a few tens of milliseconds for a few million 384-dimensional rows. Removed documents only
+    mark their rows dead; the matrix is compacted once dead rows outnumber live ones.
+
+    The ``document_chunks`` table is the source of truth: the index is rebuilt from it by
+    ``start`` and kept up to date by ``DocumentChunkCRUD``.
+    """
+
+    def __init__(self, initial_capacity: int = VECTOR_INDEX_INITIAL_CAPACITY):
+        self.initial_capacity = initial_capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._document_ids = np.empty(0, dtype=np.int64)
+        self._ordinals = np.empty(0, dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        self._size = 0
+        self._dead = 0
+        self._rows: Dict[int, Tuple[int, int]] = {}  # document id -> [start, stop) of its contiguous rows
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size - self._dead
+
+    def start(self):
+        try:
+            query = (
+                DocumentChunk.select(DocumentChunk.document, DocumentChunk.ordinal, DocumentChunk.embedding)
+                .where(DocumentChunk.embedding.is_null(False))
+                .order_by(DocumentChunk.document, DocumentChunk.ordinal)
+                .tuples()
+            )
+            for document_id, rows in groupby(query.iterator(), key=lambda row: row[0]):
+                self._add_rows(document_id, list(rows))
+        except Exception as e:
+            print(f"Failed to build vector index: {e}")
+
+    def add_document(self, document_id: int, embeddings: np.ndarray, ordinals: Optional[List[int]] = None):
+        """
+        Index the embeddings of a document's chunks, replacing any it had; row ``i`` belongs to
+        chunk ``ordinals[i]``, by default chunk ``i``.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        ordinals = np.arange(len(embeddings)) if ordinals is None else np.asarray(ordinals)
+        with self._lock:
+            self._remove(document_id)
+            if not len(embeddings):
+                return
+            start, stop = self._size, self._size + len(embeddings)
+            self._reserve(stop, embeddings.shape[1])
+            self._matrix[start:stop] = embeddings
+            self._document_ids[start:stop] = document_id
+            self._ordinals[start:stop] = ordinals
+            self._alive[start:stop] = True
+            self._rows[document_id] = (start, stop)
+            self._size = stop
+
+    def refresh_document(self, document_id: int):
+        """
+        Re-read a document's embeddings from the database, after they were written there directly.
+        """
+        rows = (
+            DocumentChunk.select(DocumentChunk.document, DocumentChunk.ordinal, DocumentChunk.embedding)
+            .where((DocumentChunk.document == document_id) & DocumentChunk.embedding.is_null(False))
+            .order_by(DocumentChunk.ordinal)
+            .tuples()
+        )
+        self._add_rows(document_id, list(rows))
+
+    def remove_document(self, document_id: int):
+        with self._lock:
+            self._remove(document_id)
+
+    def search(self, embedding: np.ndarray, top_k: int) -> List[Tuple[int, int, float]]:
+        """
+        The ``top_k`` chunks most similar to ``embedding``, as ``(document id, ordinal, score)``, best first.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            live = self._size - self._dead
+            if live == 0:
+                return []
+            scores = self._matrix[:self._size] @ query
+            if self._dead:
+                scores[~self._alive[:self._size]] = -np.inf
+            k = min(top_k, live)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(int(self._document_ids[i]), int(self._ordinals[i]), float(scores[i])) for i in top]
+
+    def _add_rows(self, document_id: int, rows: list):
+        if rows:
+            self.add_document(
+                document_id, np.stack([from_bytes(row[2]) for row in rows]), [row[1] for row in rows]
+            )
+        else:
+            self.remove_document(document_id)
+
+    def _remove(self, document_id: int):
+        rows = self._rows.pop(document_id, None)
+        if rows is None:
+            return
+        start, stop = rows
+        self._alive[start:stop] = False
+        self._dead += stop - start
+        if self._dead > max(self._size - self._dead, self.initial_capacity):
+            self._compact()
+
+    def _reserve(self, size: int, dimension: int):
+        if self._matrix is not None and self._matrix.shape[1] != dimension:
+            raise ValueError(f"Embedding dimension {dimension} does not match the index ({self._matrix.shape[1]})")
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if size <= capacity:
+            return
+        capacity = max(capacity * 2, size, self.initial_capacity)
+        matrix = np.empty((capacity, dimension), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+        self._document_ids = np.resize(self._document_ids, capacity)
+        self._ordinals = np.resize(self._ordinals, capacity)
+        self._alive = np.resize(self._alive, capacity)
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:self._size])
+        self._matrix[:len(keep)] = self._matrix[keep]
+        self._document_ids[:len(keep)] = self._document_ids[keep]
+        self._ordinals[:len(keep)] = self._ordinals[keep]
+        self._alive[:len(keep)] = True
+        self._alive[len(keep):] = False
+        self._size, self._dead = len(keep), 0
+        # Rows keep their order, so every document still occupies one contiguous run
+        document_ids = self._document_ids[:self._size]
+        boundaries = np.flatnonzero(np.diff(document_ids)) + 1
+        starts = np.concatenate(([0], boundaries)).tolist()
+        stops = np.concatenate((boundaries, [self._size])).tolist()
+        self._rows = {int(document_ids[start]): (start, stop) for start, stop in zip(starts, stops) if stop > start}
+
+
+vector_index_instance = VectorIndex()
@@ -0,0 +1,60 @@
+from typing import Dict, Optional, Tuple
+
+from peewee import EXCLUDED
+
+from app.models.blob_models import Blob
+
+
+class BlobCRUD:
+    def __init__(self, db):
+        self.db = db
+
+    def get_blob(self, content_hash: str) -> Optional[Blob]:
+        return Blob.get_or_none(Blob.content_hash == content_hash)  # Returns None if not found
+
+    def acquire(self, content_hash: str, byte_size: int) -> int:
+        """
+        Add a reference to a blob, creating its row on first use, and return the new reference count.
+        """
+        Blob.insert(content_hash=content_hash, byte_size=byte_size, ref_count=1).on_conflict(
+            conflict_target=[Blob.content_hash],
+            update={Blob.ref_count: Blob.ref_count + 1},
+        ).execute()
+        return Blob.get(Blob.content_hash == content_hash).ref_count
+
+    def acquire_many(self, blobs: Dict[str, Tuple[int, int]]):
+        """
+        Add references to many blobs in one statement; ``blobs`` maps each content hash to its byte
+        size and the number of references to add.
+        """
+        if not blobs:
+            return
+        rows = [
+            {"content_hash": content_hash, "byte_size": byte_size, "ref_count": count}
+            for content_hash, (byte_size, count) in blobs.items()
+        ]
+        Blob.insert_many(rows).on_conflict(
+            conflict_target=[Blob.content_hash],
+            update={Blob.ref_count: Blob.ref_count + EXCLUDED.ref_count},
+        ).execute()
+
+    def atomic(self):
+        """
+        Transaction around a reference count change and the file operation that depends on it: the
+        row updated first stays locked until it ends, so other workers' changes to it wait.
+        """
+        return Blob._meta.database.atomic()
+
+    def release(self, content_hash: str) -> int:
+        """
+        Drop a reference to a blob and return the remaining count; the row is removed at zero.
+        """
+        with self.atomic():  # The update locks the row, so the count read back is the one it left
+            Blob.update(ref_count=Blob.ref_count - 1).where(Blob.content_hash == content_hash).execute()
+            blob = self.get_blob(content_hash)
+            if blob is None:
+                return 0
+            if blob.ref_count <= 0:
+                Blob.delete().where((Blob.content_hash == content_hash) & (Blob.ref_count <= 0)).execute()
+                return 0
+            return blob.ref_count
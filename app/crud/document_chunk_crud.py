@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from peewee import Tuple as Row, Value, chunked, fn
+
+from app.core.embeddings import to_bytes
+from app.core.vector_index import vector_index_instance
+from app.models.document_chunk_models import DocumentChunk
+from app.models.document_models import Document
+
+CHUNK_INSERT_BATCH_SIZE = 1000  # Rows per INSERT statement when storing a document's chunks
+
+
+class DocumentChunkCRUD:
+    def __init__(self, db):
+        self.db = db
+
+    def replace_chunks(self, document_id: int, chunks: List[str], token_spans: List[Tuple[int, int]],
+                       embeddings: Optional[np.ndarray] = None) -> int:
+        """
+        Store the chunks of a finished parse, and their embeddings if any, in place of any earlier
+        ones, in one transaction with multi-row INSERTs of up to ``CHUNK_INSERT_BATCH_SIZE`` rows.
+        """
+        rows = [
+            {
+                "document": document_id,
+                "ordinal": ordinal,
+                "token_start": start,
+                "token_end": end,
+                "text": text,
+                "embedding": to_bytes(embeddings[ordinal]) if embeddings is not None else None,
+            }
+            for ordinal, (text, (start, end)) in enumerate(zip(chunks, token_spans))
+        ]
+        with DocumentChunk._meta.database.atomic():
+            DocumentChunk.delete().where(DocumentChunk.document == document_id).execute()
+            for batch in chunked(rows, CHUNK_INSERT_BATCH_SIZE):
+                DocumentChunk.insert_many(batch).execute()
+        if embeddings is not None:
+            vector_index_instance.add_document(document_id, embeddings[:len(rows)])
+        else:
+            vector_index_instance.remove_document(document_id)
+        return len(rows)
+
+    def copy_chunks(self, document_id: int, content_hash: str) -> int:
+        """
+        Give a document without chunks those of another document with the same content, in a single
+        statement. Used when a parse is answered from the parse cache instead of being run.
+        """
+        source = (
+            DocumentChunk.select(DocumentChunk.document)
+            .join(Document)
+            .where((Document.content_hash == content_hash) & (Document.id != document_id))
+            .limit(1)
+        )
+        existing = DocumentChunk.select(DocumentChunk.ordinal).where(DocumentChunk.document == document_id)
+        query = DocumentChunk.select(
+            Value(document_id), DocumentChunk.ordinal, DocumentChunk.token_start, DocumentChunk.token_end,
+            DocumentChunk.text, DocumentChunk.embedding,
+        ).where((DocumentChunk.document == source) & ~fn.EXISTS(existing))
+        fields = [DocumentChunk.document, DocumentChunk.ordinal, DocumentChunk.token_start, DocumentChunk.token_end,
+                  DocumentChunk.text, DocumentChunk.embedding]
+        copied = DocumentChunk.insert_from(query, fields).as_rowcount().execute()
+        if copied:
+            vector_index_instance.refresh_document(document_id)
+        return copied
+
+    def get_chunks(self, document_id: int, limit: int, start: int = 0, end: Optional[int] = None,
+                   token_start: Optional[int] = None, token_end: Optional[int] = None) -> List[DocumentChunk]:
+        """
+        Chunks of a document in order, with ordinals in ``[start, end)`` and, if given, overlapping
+        the token range ``[token_start, token_end)``.
+        """
+        query = DocumentChunk.select().where((DocumentChunk.document == document_id) & (DocumentChunk.ordinal >= start))
+        if end is not None:
+            query = query.where(DocumentChunk.ordinal < end)
+        if token_start is not None:
+            query = query.where(DocumentChunk.token_end > token_start)
+        if token_end is not None:
+            query = query.where(DocumentChunk.token_start < token_end)
+        return list(query.order_by(DocumentChunk.ordinal).limit(limit))
+
+    def get_chunks_by_keys(self, keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], dict]:
+        """
+        Chunks given as ``(document id, ordinal)`` pairs, with the name of their document, in one query.
+        """
+        if not keys:
+            return {}
+        query = (
+            DocumentChunk.select(
+                DocumentChunk.document.alias("document_id"), Document.file_name, DocumentChunk.ordinal,
+                DocumentChunk.token_start, DocumentChunk.token_end, DocumentChunk.text,
+            )
+            .join(Document)
+            .where(Row(DocumentChunk.document, DocumentChunk.ordinal).in_([Row(*key) for key in keys]))
+            .dicts()
+        )
+        return {(row["document_id"], row["ordinal"]): row for row in query}
@@ -1,6 +1,20 @@
-from typing import Optional, List
+import json
+from datetime import datetime
+from typing import Dict, Optional, List, Tuple, Union
+
+from peewee import Tuple as Row, chunked
+
 from app.api.schemas.document_schemas import DocumentCreate
-from app.models.document_models import Document
+from app.core.blob_store import blob_store_instance
+from app.core.parse_cache import parse_cache_instance
+from app.core.search import search_index_instance
+from app.core.segment_cache import segment_cache_instance
+from app.core.sidecar import sidecar_store_instance
+from app.core.vector_index import vector_index_instance
+from app.models.document_models import Document, METADATA_FIELDS, SORTABLE_FIELDS, STATS_FIELDS
+
+DOCUMENT_INSERT_BATCH_SIZE = 500  # Rows per INSERT statement of a bulk upload
+SEGMENT_REFERENCE_BATCH_SIZE = 100  # Segment keys per query when looking for documents that refer to them
 
 
 class DocumentCRUD:
@@ -24,6 +38,7 @@ class DocumentCRUD:
             "application/msword": "DOC",  # Add more mappings as necessary
             "application/vnd.ms-excel": "XLS",  # Add more mappings as necessary
             "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "XLSX",
+            "text/plain": "TXT",
             "image/jpeg": "JPEG",
             "image/png": "PNG",
             # Add more mappings as needed
@@ -34,13 +49,160 @@ class DocumentCRUD:
     def create_document(self, document: DocumentCreate) -> Document:
         db_document = Document.create(
             file_name=document.file_name,
-            file_type=self.map_file_type(document.file_type)
+            file_type=self.map_file_type(document.file_type),
+            parsed_text=document.parsed_text,
+            content_hash=document.content_hash,
+            byte_size=document.byte_size,
+            page_count=document.page_count,
+            char_count=document.char_count,
+            token_count=document.token_count,
+            chunk_count=document.chunk_count,
+            **search_index_instance.document_fields(document.parsed_text),
         )
+        if document.parsed_text is not None:
+            search_index_instance.index_document(db_document.id, document.parsed_text)
         return db_document
 
+    def create_documents(self, documents: List[DocumentCreate]) -> List[Document]:
+        """
+        Insert many documents in one transaction, with multi-row INSERTs of up to
+        ``DOCUMENT_INSERT_BATCH_SIZE`` rows, and return them in the order given.
+        """
+        rows = [
+            {
+                "file_name": document.file_name,
+                "file_type": self.map_file_type(document.file_type),
+                "upload_timestamp": document.upload_timestamp,
+                "parsed_text": document.parsed_text,
+                "content_hash": document.content_hash,
+                "byte_size": document.byte_size,
+                "page_count": document.page_count,
+                "char_count": document.char_count,
+                "token_count": document.token_count,
+                "chunk_count": document.chunk_count,
+            }
+            for document in documents
+        ]
+        ids = []
+        with Document._meta.database.atomic():
+            for batch in chunked(rows, DOCUMENT_INSERT_BATCH_SIZE):
+                batch = [{**row, **search_index_instance.document_fields(row["parsed_text"])} for row in batch]
+                ids.extend(row[0] for row in Document.insert_many(batch).returning(Document.id).tuples().execute())
+        for document_id, row in zip(ids, rows):
+            if row["parsed_text"] is not None:
+                search_index_instance.index_document(document_id, row["parsed_text"])
+        return [Document(id=document_id, **row) for document_id, row in zip(ids, rows)]
+
     def get_documents(self) -> List[Document]:
         return list(Document.select())  # Returns all documents as a list
 
+    def list_documents(self, limit: int, after: Optional[Tuple[Union[datetime, int], int]] = None,
+                       file_type: Optional[str] = None, uploaded_from: Optional[datetime] = None,
+                       uploaded_to: Optional[datetime] = None, sort: str = "-upload_timestamp",
+                       ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None) -> List[Document]:
+        """
+        One page of document metadata using keyset pagination on ``(sort field, id)``: newest first
+        by default, or ordered by a statistic such as ``token_count`` (``-token_count`` for descending).
+
+        ``after`` is the ``(sort value, id)`` of the last document of the previous page. The row
+        comparison lets Postgres seek straight to it in the composite index, so every page costs
+        the same however deep it is. ``uploaded_from`` is inclusive, ``uploaded_to`` exclusive.
+        ``ranges`` maps statistics to inclusive ``(min, max)`` bounds, either of which may be None.
+        Documents whose sort or filter statistic is not known yet are left out.
+        """
+        descending = sort.startswith("-")
+        field = SORTABLE_FIELDS[sort.lstrip("-")]
+        query = Document.select(*METADATA_FIELDS)
+        if field is not Document.upload_timestamp:
+            query = query.where(field.is_null(False))
+        if after is not None:
+            row, position = Row(field, Document.id), Row(*after)
+            query = query.where(row < position if descending else row > position)
+        if file_type is not None:
+            query = query.where(Document.file_type == file_type)
+        if uploaded_from is not None:
+            query = query.where(Document.upload_timestamp >= uploaded_from)
+        if uploaded_to is not None:
+            query = query.where(Document.upload_timestamp < uploaded_to)
+        for name, (low, high) in (ranges or {}).items():
+            if low is not None:
+                query = query.where(SORTABLE_FIELDS[name] >= low)
+            if high is not None:
+                query = query.where(SORTABLE_FIELDS[name] <= high)
+        order = (field.desc(), Document.id.desc()) if descending else (field.asc(), Document.id.asc())
+        return list(query.order_by(*order).limit(limit))
+
+    def get_document_stats(self, document_id: int) -> Optional[Document]:
+        """
+        The statistics columns of a document, without loading its text.
+        """
+        return Document.select(*STATS_FIELDS).where(Document.id == document_id).first()
+
+    def update_stats(self, document_id: int, content_hash: Optional[str], stats: dict) -> int:
+        """
+        Store the statistics computed by a parse on the document and on every document with the
+        same content, which the parse result is shared with.
+        """
+        condition = Document.id == document_id
+        if content_hash is not None:
+            condition |= Document.content_hash == content_hash
+        return Document.update(**stats).where(condition).execute()
+
+    def update_segment_keys(self, document_id: int, content_hash: Optional[str], segment_keys: List[str]) -> int:
+        """
+        Store the segment keys of an incremental parse, like ``update_stats``.
+        """
+        condition = Document.id == document_id
+        if content_hash is not None:
+            condition |= Document.content_hash == content_hash
+        return Document.update(segment_keys=json.dumps(segment_keys)).where(condition).execute()
+
+    def get_referenced_segment_keys(self, segment_keys: List[str]) -> set:
+        """
+        The ones among ``segment_keys`` that some document still refers to. Segments are keyed by
+        their text, so documents with other names and contents may share them.
+        """
+        referenced = set()
+        for batch in chunked(segment_keys, SEGMENT_REFERENCE_BATCH_SIZE):
+            condition = Document.segment_keys.contains(batch[0])
+            for key in batch[1:]:
+                condition |= Document.segment_keys.contains(key)
+            for document in Document.select(Document.segment_keys).where(condition):
+                referenced.update(json.loads(document.segment_keys))
+        return referenced & set(segment_keys)
+
+    def get_previous_segment_keys(self, file_name: str) -> List[str]:
+        """
+        Segment keys of the latest parsed upload of a file name: the previous version of a file
+        that is uploaded again after an edit.
+        """
+        document = (
+            Document.select(Document.segment_keys)
+            .where((Document.file_name == file_name) & Document.segment_keys.is_null(False))
+            .order_by(Document.upload_timestamp.desc())
+            .first()
+        )
+        return json.loads(document.segment_keys) if document else []
+
+    def get_stats_by_hash(self, content_hashes: List[str]) -> Dict[str, dict]:
+        """
+        Statistics already computed for documents with the given content, so an upload of content
+        that was parsed before has them at once.
+        """
+        if not content_hashes:
+            return {}
+        query = (
+            Document.select(*STATS_FIELDS)
+            .where(Document.content_hash.in_(list(set(content_hashes))) & Document.token_count.is_null(False))
+        )
+        return {
+            document.content_hash: {
+                "page_count": document.page_count, "char_count": document.char_count,
+                "token_count": document.token_count, "chunk_count": document.chunk_count,
+            }
+            for document in query
+        }
+
     def get_document(self, document_id: int) -> Optional[Document]:
         return Document.get_or_none(Document.id == document_id)  # Returns None if not found
 
@@ -52,9 +214,72 @@ class DocumentCRUD:
             db_document.save()  # Save changes to the database
         return db_document
 
+    def update_parsed_text(self, document_id: int, parsed_text: str, content_hash: Optional[str] = None) -> int:
+        """
+        Store a document's parsed text, and that of every document with the same content like
+        ``update_stats``, and bring their search index entries up to date.
+        """
+        condition = Document.id == document_id
+        if content_hash is not None:
+            condition |= Document.content_hash == content_hash
+        document_ids = [document.id for document in Document.select(Document.id).where(condition)]
+        if not document_ids:
+            return 0
+        updated = Document.update(
+            parsed_text=parsed_text, **search_index_instance.document_fields(parsed_text)
+        ).where(Document.id.in_(document_ids)).execute()
+        for updated_id in document_ids:
+            search_index_instance.index_document(updated_id, parsed_text)
+        return updated
+
+    def copy_parsed_text(self, document_id: int, content_hash: str) -> int:
+        """
+        Give a document the parsed text of another document with the same content, for a parse
+        answered from the parse cache.
+        """
+        parsed_text = self.get_parsed_text_by_hash(content_hash)
+        if parsed_text is None:
+            return 0
+        return self.update_parsed_text(document_id, parsed_text)
+
+    def get_parsed_text_by_hash(self, content_hash: str) -> Optional[str]:
+        """
+        Return text already extracted from another document with the same content, if any.
+        """
+        document = (
+            Document.select(Document.parsed_text)
+            .where((Document.content_hash == content_hash) & Document.parsed_text.is_null(False))
+            .first()
+        )
+        return document.parsed_text if document else None
+
+    def get_parsed_texts_by_hash(self, content_hashes: List[str]) -> Dict[str, str]:
+        """
+        Batch form of ``get_parsed_text_by_hash``: one query for many content hashes.
+        """
+        if not content_hashes:
+            return {}
+        query = (
+            Document.select(Document.content_hash, Document.parsed_text)
+            .where(Document.content_hash.in_(list(set(content_hashes))) & Document.parsed_text.is_null(False))
+            .tuples()
+        )
+        return {content_hash: parsed_text for content_hash, parsed_text in query}
+
     def delete_document(self, document_id: int) -> bool:
         db_document = Document.get_or_none(Document.id == document_id)
         if db_document:
             db_document.delete_instance()  # Delete the document from the database
+            search_index_instance.remove_document(document_id)
+            vector_index_instance.remove_document(document_id)  # Its chunks go with the row
+            if db_document.content_hash and blob_store_instance.release(db_document.content_hash):
+                # The file is gone, and with it what was parsed from it
+                parse_cache_instance.delete_content(db_document.content_hash)
+                sidecar_store_instance.delete_content(db_document.content_hash)
+            if db_document.segment_keys:
+                # Segments only serve documents that refer to them; an edited copy refers to most of them
+                segment_keys = list(dict.fromkeys(json.loads(db_document.segment_keys)))
+                referenced = self.get_referenced_segment_keys(segment_keys)
+                segment_cache_instance.delete_many([key for key in segment_keys if key not in referenced])
             return True
         return False
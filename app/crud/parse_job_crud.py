@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional, List
+
+from app.models.parse_job_models import ParseJob
+
+
+class ParseJobCRUD:
+    def __init__(self, db):
+        self.db = db
+
+    def create_job(self, document_id: int, **fields) -> ParseJob:
+        return ParseJob.create(document=document_id, **fields)
+
+    def get_job(self, job_id: int) -> Optional[ParseJob]:
+        return ParseJob.get_or_none(ParseJob.id == job_id)  # Returns None if not found
+
+    def update_job(self, job_id: int, **fields) -> int:
+        fields["updated_timestamp"] = datetime.now()
+        return ParseJob.update(**fields).where(ParseJob.id == job_id).execute()
+
+    def update_progress(self, job_id: int, progress: float) -> int:
+        """
+        Mark a job as running with the given progress, unless it has already finished.
+        """
+        return (
+            ParseJob.update(status=ParseJob.RUNNING, progress=progress, updated_timestamp=datetime.now())
+            .where((ParseJob.id == job_id) & ParseJob.status.in_([ParseJob.QUEUED, ParseJob.RUNNING]))
+            .execute()
+        )
+
+    def get_unfinished_jobs(self) -> List[ParseJob]:
+        return list(
+            ParseJob.select()
+            .where(ParseJob.status.in_([ParseJob.QUEUED, ParseJob.RUNNING]))
+            .order_by(ParseJob.id)
+        )
@@ -1,26 +1,122 @@
 # app/db/database.py
 import os
+import time
+
 from peewee import PostgresqlDatabase
+from playhouse.pool import PooledPostgresqlDatabase
 from dotenv import load_dotenv, dotenv_values
 
 load_dotenv()
 
+DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "20"))
+DB_POOL_STALE_TIMEOUT = int(os.getenv("DB_POOL_STALE_TIMEOUT", "300"))
+DB_POOL_WAIT_TIMEOUT = int(os.getenv("DB_POOL_WAIT_TIMEOUT", "10"))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+
+class HealthCheckedPooledPostgresqlDatabase(PooledPostgresqlDatabase):
+    """
+    Connection pool that pings connections which sat idle in the pool for longer than
+    ``health_check_interval`` seconds before handing them out again, and discards those that fail.
+    """
+
+    def __init__(self, database, health_check_interval: float = DB_POOL_HEALTH_CHECK_INTERVAL, **kwargs):
+        self.health_check_interval = health_check_interval
+        self.checkouts = 0
+        self.failed_health_checks = 0
+        self._checked_in_at = {}
+        super().__init__(database, **kwargs)
+
+    def _connect(self):
+        conn = super()._connect()
+        self.checkouts += 1  # Called with the pool lock held
+        return conn
+
+    def _is_closed(self, conn):
+        if super()._is_closed(conn):
+            self._checked_in_at.pop(self.conn_key(conn), None)
+            return True
+        checked_in_at = self._checked_in_at.pop(self.conn_key(conn), None)
+        if self.health_check_interval and checked_in_at is not None \
+                and time.time() - checked_in_at > self.health_check_interval:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            except Exception:
+                self.failed_health_checks += 1
+                self._close(conn, close_conn=True)
+                return True
+        return False
+
+    def _close(self, conn, close_conn=False):
+        key = self.conn_key(conn)
+        with self._pool_lock:
+            idle = len(self._connections)
+            super()._close(conn, close_conn)
+            # Only a connection that went back to the pool is timed; one closed as stale or unusable is
+            # forgotten, so a later connection at the same address does not inherit its timestamp
+            if len(self._connections) > idle:
+                self._checked_in_at[key] = time.time()
+            else:
+                self._checked_in_at.pop(key, None)
+
+    def close_idle(self):
+        with self._pool_lock:
+            super().close_idle()
+            self._checked_in_at.clear()  # Only idle connections have a check-in time
+
+
 class Database:
 
-    def __init__(self, database_url: str):
-        self.database = PostgresqlDatabase(database_url)
+    def __init__(self, database_url: str, pooled: bool = DB_POOL_ENABLED,
+                 max_connections: int = DB_POOL_MAX_CONNECTIONS, stale_timeout: int = DB_POOL_STALE_TIMEOUT,
+                 wait_timeout: int = DB_POOL_WAIT_TIMEOUT,
+                 health_check_interval: float = DB_POOL_HEALTH_CHECK_INTERVAL):
+        self.pooled = pooled
+        if pooled:
+            self.database = HealthCheckedPooledPostgresqlDatabase(
+                database_url,
+                max_connections=max_connections,
+                stale_timeout=stale_timeout,
+                timeout=wait_timeout,
+                health_check_interval=health_check_interval,
+            )
+        else:
+            self.database = PostgresqlDatabase(database_url)
 
     def connect(self):
-        self.database.connect()
+        """Open a connection for the calling thread; in pooled mode it is checked out of the pool."""
+        self.database.connect(reuse_if_open=True)
 
     def close(self):
+        """Close the calling thread's connection; in pooled mode it is returned to the pool."""
         if not self.database.is_closed():
             self.database.close()
 
+    def execute_sql(self, sql, params=None):
+        return self.database.execute_sql(sql, params)
+
     def create_tables(self, models):
         """Create tables in the database."""
         with self.database:
             self.database.create_tables(models, safe=True)
 
+    def pool_stats(self) -> dict:
+        """Utilization of the connection pool."""
+        if not self.pooled:
+            return {"pooled": False}
+        pool = self.database
+        in_use = len(pool._in_use)
+        return {
+            "pooled": True,
+            "max_connections": pool._max_connections,
+            "in_use": in_use,
+            "idle": len(pool._connections),
+            "utilization": in_use / pool._max_connections if pool._max_connections else 0.0,
+            "checkouts": pool.checkouts,
+            "failed_health_checks": pool.failed_health_checks,
+        }
+
 db_url = f"{os.getenv('DATABASE_PUBLIC_URL')}"
-database_instance = Database(db_url)
\ No newline at end of file
+database_instance = Database(db_url)
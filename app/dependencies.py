@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+
 from app.db.database import Database
 
 class Dependency:
@@ -5,8 +7,17 @@ class Dependency:
         self.db = db
 
     def get_db(self):
+        """
+        Check a connection out for the calling thread and return it to the pool when done.
+        """
         try:
             self.db.connect()
             yield self.db.database
         finally:
             self.db.close()
+
+    def connection(self):
+        """
+        Context-manager form of ``get_db``, for route bodies whose queries all run on the current thread.
+        """
+        return contextmanager(self.get_db)()
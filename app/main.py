@@ -1,8 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.endpoints import DocumentRoutes
+from app.api.endpoints import DatabaseRoutes, DocumentRoutes, MetricsRoutes, ParseJobRoutes
+from app.api.endpoints.document_routes import BULK_UPLOAD_MAX_BYTES
+from app.api.middleware import MetricsMiddleware, RequestSizeLimitMiddleware
+from app.core.executors import executors_instance
+from app.core.file_storage import MULTIPART_OVERHEAD_BYTES, UPLOAD_MAX_BYTES
 from app.core.initializer import AppInitializer
+from app.core.model_registry import model_registry
+from app.core.parse_jobs import ParseJobQueue
+from app.core.pdf_extraction import pdf_text_extractor
+from app.core.search import search_index_instance
+from app.core.vector_index import vector_index_instance
 from app.db.database import database_instance
 from app.dependencies import Dependency
 
@@ -10,6 +19,11 @@ from app.dependencies import Dependency
 def create_app() -> FastAPI:
     app = FastAPI()
 
+    # Innermost, so its 413 responses still get CORS headers
+    app.add_middleware(RequestSizeLimitMiddleware, limits={
+        "/api/upload/": UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/api/upload/bulk": BULK_UPLOAD_MAX_BYTES,
+    })
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:5174"],  # Adjust to your frontend URL
@@ -17,14 +31,33 @@ def create_app() -> FastAPI:
         allow_methods=["*"],  # Allow all HTTP methods
         allow_headers=["*"],  # Allow all headers
     )
+    app.add_middleware(MetricsMiddleware)  # Outermost, so its timings include CORS handling
 
-    initializer = AppInitializer(app, database_instance.database)
+    initializer = AppInitializer(app, database_instance)
     initializer.initialize()
     dependency = Dependency(initializer.db)
 
+    app.add_event_handler("startup", search_index_instance.start)
+    app.add_event_handler("startup", vector_index_instance.start)
+    app.add_event_handler("startup", model_registry.start)
+    app.add_event_handler("shutdown", model_registry.stop)
+
+    parse_job_queue = ParseJobQueue(dependency=dependency)
+    app.add_event_handler("startup", parse_job_queue.start)
+    app.add_event_handler("startup", parse_job_queue.recover)
+    app.add_event_handler("shutdown", parse_job_queue.shutdown)
+    app.add_event_handler("shutdown", pdf_text_extractor.shutdown)
+    app.add_event_handler("shutdown", executors_instance.shutdown)
+
     # Include routers
     document_routes = DocumentRoutes(dependency = dependency)
     app.include_router(document_routes.router)
+    parse_job_routes = ParseJobRoutes(dependency=dependency, parse_job_queue=parse_job_queue)
+    app.include_router(parse_job_routes.router)
+    database_routes = DatabaseRoutes(dependency=dependency)
+    app.include_router(database_routes.router)
+    metrics_routes = MetricsRoutes()
+    app.include_router(metrics_routes.router)
     return app
 
 
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from peewee import Model, CharField, DateTimeField, IntegerField, BigIntegerField
+
+from app.db.database import database_instance
+
+
+class Blob(Model):
+    content_hash = CharField(max_length=64, primary_key=True)
+    byte_size = BigIntegerField()
+    ref_count = IntegerField(default=0)  # Number of documents referencing this content
+    created_timestamp = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = database_instance.database
+        table_name = 'blobs'
@@ -0,0 +1,19 @@
+from peewee import Model, BlobField, CompositeKey, ForeignKeyField, IntegerField, TextField
+
+from app.db.database import database_instance
+from app.models.document_models import Document
+
+
+class DocumentChunk(Model):
+    document = ForeignKeyField(Document, backref="chunks", on_delete="CASCADE", index=False)
+    ordinal = IntegerField()  # Position of the chunk in the document, from 0
+    token_start = IntegerField()  # Offset of the chunk's first token in the tokenized document
+    token_end = IntegerField()  # Offset one past its last token; consecutive chunks overlap
+    text = TextField()
+    embedding = BlobField(null=True)  # float32 sentence embedding of the text, as raw bytes
+
+    class Meta:
+        database = database_instance.database
+        table_name = 'document_chunks'
+        # Also the index behind range queries over a document's chunks
+        primary_key = CompositeKey("document", "ordinal")
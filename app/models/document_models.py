@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from peewee import Model, CharField, TextField, DateTimeField, IntegerField
+from peewee import Model, CharField, TextField, DateTimeField, IntegerField, BigIntegerField
+from playhouse.postgres_ext import TSVectorField
 
 from app.db.database import database_instance
 
@@ -11,7 +12,68 @@ class Document(Model):
     file_type = CharField(max_length=50)
     upload_timestamp = DateTimeField(default=datetime.now)
     parsed_text = TextField(null=True)
+    content_hash = CharField(max_length=64, null=True, index=True)  # SHA-256 of the uploaded bytes
+    byte_size = BigIntegerField(null=True)
+    # Statistics of the parsed text, set by the first parse, or at upload when the content was already parsed
+    page_count = IntegerField(null=True)  # PDF pages or PPTX slides; None for formats without pages
+    char_count = IntegerField(null=True)
+    token_count = IntegerField(null=True)
+    chunk_count = IntegerField(null=True)
+    # JSON list of the segment cache keys of the parsed text's groups, in order, for an incremental
+    # parse of a later version of the file to start from
+    segment_keys = TextField(null=True)
+    # Full-text search vector of parsed_text; its GIN index is created by AppInitializer
+    search_vector = TSVectorField(null=True, index=False)
 
     class Meta:
         database = database_instance.database  # Set the database attribute
-        table_name = 'documents'
\ No newline at end of file
+        table_name = 'documents'
+        indexes = (
+            # Keyset pagination of the document listing, newest first, optionally filtered by type
+            (("upload_timestamp", "id"), False),
+            (("file_type", "upload_timestamp", "id"), False),
+            # Latest parsed version of a file, whose segments an incremental parse starts from
+            (("file_name", "upload_timestamp"), False),
+            # Range filters and keyset pagination of the listing sorted by a statistic
+            (("byte_size", "id"), False),
+            (("page_count", "id"), False),
+            (("char_count", "id"), False),
+            (("token_count", "id"), False),
+            (("chunk_count", "id"), False),
+        )
+
+
+# Columns returned by listings; parsed_text can be arbitrarily large and is never listed.
+METADATA_FIELDS = (
+    Document.id,
+    Document.file_name,
+    Document.file_type,
+    Document.upload_timestamp,
+    Document.content_hash,
+    Document.byte_size,
+    Document.page_count,
+    Document.char_count,
+    Document.token_count,
+    Document.chunk_count,
+)
+
+# Columns of GET /api/documents/{id}/stats.
+STATS_FIELDS = (
+    Document.id,
+    Document.content_hash,
+    Document.byte_size,
+    Document.page_count,
+    Document.char_count,
+    Document.token_count,
+    Document.chunk_count,
+)
+
+# Statistics a listing can be sorted and filtered by.
+SORTABLE_FIELDS = {
+    "upload_timestamp": Document.upload_timestamp,
+    "byte_size": Document.byte_size,
+    "page_count": Document.page_count,
+    "char_count": Document.char_count,
+    "token_count": Document.token_count,
+    "chunk_count": Document.chunk_count,
+}
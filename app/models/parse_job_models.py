@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from peewee import Model, AutoField, CharField, TextField, DateTimeField, FloatField, ForeignKeyField
+
+from app.db.database import database_instance
+from app.models.document_models import Document
+
+
+class ParseJob(Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    id = AutoField()
+    document = ForeignKeyField(Document, backref="parse_jobs", on_delete="CASCADE")
+    status = CharField(max_length=20, default=QUEUED, index=True)
+    progress = FloatField(default=0.0)
+    result = TextField(null=True)  # JSON-encoded ParsedDocument once the job is done
+    error = TextField(null=True)
+    created_timestamp = DateTimeField(default=datetime.now)
+    updated_timestamp = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = database_instance.database
+        table_name = 'parse_jobs'
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from peewee import Model, CharField, TextField, DateTimeField
+
+from app.db.database import database_instance
+
+
+class ParseResult(Model):
+    cache_key = CharField(max_length=64, primary_key=True)
+    content_hash = CharField(max_length=64, index=True)
+    summary = TextField()
+    chunks = TextField()  # JSON-encoded list of chunk strings
+    created_timestamp = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = database_instance.database
+        table_name = 'parse_results'
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from peewee import Model, BlobField, CharField, DateTimeField, IntegerField, TextField
+
+from app.db.database import database_instance
+
+
+class ParseSegment(Model):
+    cache_key = CharField(max_length=64, primary_key=True)  # Content hash of the segment and the parse parameters
+    text = TextField()
+    token_count = IntegerField()
+    chunks = TextField()  # JSON-encoded list of the segment's chunk strings
+    token_spans = TextField()  # JSON-encoded [start, end) token offsets of each chunk within the segment
+    char_spans = TextField(null=True)  # JSON-encoded [start, end) character offsets of each chunk, when sliced
+    token_ids = BlobField(null=True)  # Token ids of the segment as packed uint32, for the text sidecar
+    embeddings = BlobField(null=True)  # float32 embeddings of the chunks, one row each, as raw bytes
+    summaries = TextField(null=True)  # JSON-encoded map-level summaries, once the segment was part of a long text
+    created_timestamp = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = database_instance.database
+        table_name = 'parse_segments'
@@ -0,0 +1,167 @@
+# benchmarks/compare_summarizers.py
+"""
+Compare the summarizer inference backends on a fixed corpus.
+
+For every backend the harness reports the load time, the latency of summarizing each document
+alone, the throughput of summarizing the whole corpus in batches, and the ROUGE drift of its
+summaries from those of the reference backend (full-precision PyTorch).
+
+    python -m benchmarks.compare_summarizers uploads --backends pytorch int8 onnx --runs 3
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List
+
+from app.core.document_parser import SUMMARIZER_NAME, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH
+from app.core.extractors import extractor_registry
+from app.core.summarizer_backends import SUMMARIZER_BACKENDS, load_summarizer
+from app.core.summary_batcher import SUMMARY_MAX_BATCH_SIZE
+
+REFERENCE_BACKEND = "pytorch"
+FILE_TYPES = {".pdf": "PDF", ".docx": "DOCX", ".pptx": "PPTX", ".xlsx": "XLSX", ".txt": "TXT"}
+
+_WORD = re.compile(r"\w+")
+
+
+def rouge_n(candidate: str, reference: str, n: int) -> float:
+    """ROUGE-N F1 of two texts."""
+    def ngrams(text):
+        words = _WORD.findall(text.lower())
+        return Counter(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+    candidate_ngrams, reference_ngrams = ngrams(candidate), ngrams(reference)
+    overlap = sum((candidate_ngrams & reference_ngrams).values())
+    return _f1(overlap, sum(candidate_ngrams.values()), sum(reference_ngrams.values()))
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 of two texts: their longest common word subsequence."""
+    candidate_words, reference_words = _WORD.findall(candidate.lower()), _WORD.findall(reference.lower())
+    previous = [0] * (len(reference_words) + 1)
+    for candidate_word in candidate_words:
+        current = [0]
+        for j, reference_word in enumerate(reference_words):
+            current.append(previous[j] + 1 if candidate_word == reference_word else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(candidate_words), len(reference_words))
+
+
+def _f1(overlap: int, candidate_total: int, reference_total: int) -> float:
+    if candidate_total == 0 and reference_total == 0:
+        return 1.0
+    if overlap == 0:
+        return 0.0
+    precision, recall = overlap / candidate_total, overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def load_corpus(paths: List[str]) -> Dict[str, str]:
+    """
+    Text of every supported file under the given files and directories, by path, in a stable order.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(root, name) for root, _, names in os.walk(path) for name in names
+            )
+        else:
+            files.append(path)
+    corpus = {}
+    for file in sorted(files):
+        file_type = FILE_TYPES.get(os.path.splitext(file)[1].lower())
+        if file_type is not None:
+            text = "".join(extractor_registry.extract(file, file_type)).strip()
+            if text:
+                corpus[file] = text
+    return corpus
+
+
+def measure(summarizer, texts: List[str], runs: int, batch_size: int) -> dict:
+    generate_kwargs = dict(
+        max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH, do_sample=False, truncation=True
+    )
+    summarizer(texts[:1], **generate_kwargs)  # Warm-up
+
+    latencies = []
+    for _ in range(runs):
+        for text in texts:
+            started = time.perf_counter()
+            summarizer([text], **generate_kwargs)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        results = summarizer(texts, batch_size=batch_size, **generate_kwargs)
+    batched_seconds = (time.perf_counter() - started) / runs
+
+    latencies.sort()
+    return {
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_p50_s": latencies[len(latencies) // 2],
+        "latency_p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "throughput_docs_per_s": len(texts) / batched_seconds,
+        "summaries": [result["summary_text"] for result in results],
+    }
+
+
+def compare(corpus: Dict[str, str], backends: List[str], runs: int = 1, batch_size: int = SUMMARY_MAX_BATCH_SIZE,
+            model_name: str = SUMMARIZER_NAME, loader=load_summarizer) -> Dict[str, dict]:
+    """
+    Measure every backend on the corpus; ROUGE is computed against the reference backend's summaries.
+    """
+    texts = list(corpus.values())
+    backends = [REFERENCE_BACKEND] + [backend for backend in backends if backend != REFERENCE_BACKEND]
+    report = {}
+    for backend in backends:
+        started = time.perf_counter()
+        summarizer = loader(model_name, backend)
+        load_seconds = time.perf_counter() - started
+        report[backend] = {"load_s": load_seconds, **measure(summarizer, texts, runs, batch_size)}
+        del summarizer
+
+    reference = report[REFERENCE_BACKEND]
+    for backend, result in report.items():
+        pairs = list(zip(result["summaries"], reference["summaries"]))
+        result["rouge1"] = statistics.mean(rouge_n(candidate, ref, 1) for candidate, ref in pairs)
+        result["rouge2"] = statistics.mean(rouge_n(candidate, ref, 2) for candidate, ref in pairs)
+        result["rougeL"] = statistics.mean(rouge_l(candidate, ref) for candidate, ref in pairs)
+        result["speedup"] = reference["latency_mean_s"] / result["latency_mean_s"]
+    return report
+
+
+def format_report(report: Dict[str, dict]) -> str:
+    columns = ["load_s", "latency_mean_s", "latency_p50_s", "latency_p95_s", "throughput_docs_per_s", "speedup",
+               "rouge1", "rouge2", "rougeL"]
+    lines = ["backend  " + "  ".join(f"{column:>21}" for column in columns)]
+    for backend, result in report.items():
+        lines.append(f"{backend:<8} " + "  ".join(f"{result[column]:>21.3f}" for column in columns))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="*", default=["uploads"], help="Files or directories to summarize")
+    parser.add_argument("--backends", nargs="+", default=list(SUMMARIZER_BACKENDS), choices=list(SUMMARIZER_BACKENDS))
+    parser.add_argument("--runs", type=int, default=1, help="Timed passes over the corpus")
+    parser.add_argument("--batch-size", type=int, default=SUMMARY_MAX_BATCH_SIZE)
+    parser.add_argument("--json", help="Also write the full report, summaries included, to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error("The corpus holds no supported documents")
+    report = compare(corpus, args.backends, runs=args.runs, batch_size=args.batch_size)
+    print(f"{len(corpus)} documents, {args.runs} run(s)")
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,166 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic documents of controlled sizes for the benchmarks.
+
+The same seed and size always produce the same text, so timings from different runs and
+machines are measured on identical input.
+"""
+import os
+import random
+from typing import Dict, List
+
+# Sizes in words; a page holds about PAGE_WORDS of them
+SIZES = {"small": 500, "medium": 5_000, "large": 50_000}
+FILE_TYPES = ("PDF", "DOCX", "PPTX", "TXT")
+PARAGRAPH_WORDS = 80
+PAGE_WORDS = 400
+LINE_CHARS = 90
+
+_VOCABULARY = (
+    "the of and to in is that for it as with was on be by this are from at or an which have not has but "
+    "their more been its were can all one also other when there than these into only some new would "
+    "document service upload parse summary chunk token model text page slide report revenue quarter "
+    "customer contract policy analysis market growth research system network data storage process "
+    "result method study design review annual budget project team meeting schedule product support "
+    "quality security software hardware region office strategy risk value price cost sales forecast"
+).split()
+
+
+def generate_text(words: int, seed: int = 0) -> List[str]:
+    """
+    Paragraphs of pseudo-English prose totalling ``words`` words.
+    """
+    rng = random.Random(seed)
+    paragraphs = []
+    remaining = words
+    while remaining > 0:
+        count = min(PARAGRAPH_WORDS, remaining)
+        sentences, sentence = [], []
+        for _ in range(count):
+            sentence.append(rng.choice(_VOCABULARY))
+            if len(sentence) >= rng.randint(8, 20):
+                sentences.append(" ".join(sentence).capitalize() + ".")
+                sentence = []
+        if sentence:
+            sentences.append(" ".join(sentence).capitalize() + ".")
+        paragraphs.append(" ".join(sentences))
+        remaining -= count
+    return paragraphs
+
+
+def _pages(paragraphs: List[str]) -> List[List[str]]:
+    pages, page, words = [], [], 0
+    for paragraph in paragraphs:
+        page.append(paragraph)
+        words += paragraph.count(" ") + 1
+        if words >= PAGE_WORDS:
+            pages.append(page)
+            page, words = [], 0
+    if page:
+        pages.append(page)
+    return pages
+
+
+def _wrap(paragraph: str, width: int = LINE_CHARS) -> List[str]:
+    lines, line = [], ""
+    for word in paragraph.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def write_pdf(path: str, paragraphs: List[str]):
+    """
+    A minimal PDF with one Helvetica text page per PAGE_WORDS words, written without a PDF library.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in _pages(paragraphs):
+        lines = [line for paragraph in page for line in _wrap(paragraph) + [""]]
+        operators = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            operators.append(f"({escaped}) '")
+        operators.append("ET")
+        content = "\n".join(operators).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def write_docx(path: str, paragraphs: List[str]):
+    from docx import Document
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def write_pptx(path: str, paragraphs: List[str]):
+    """One slide per paragraph, with the paragraph's first words as the title."""
+    from pptx import Presentation
+    from pptx.util import Inches
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # Blank
+    for paragraph in paragraphs:
+        slide = presentation.slides.add_slide(layout)
+        title = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(9), Inches(1))
+        title.text_frame.text = " ".join(paragraph.split()[:5])
+        body = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(5))
+        body.text_frame.word_wrap = True
+        body.text_frame.text = paragraph
+    presentation.save(path)
+
+
+def write_txt(path: str, paragraphs: List[str]):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(paragraphs))
+
+
+WRITERS = {"PDF": write_pdf, "DOCX": write_docx, "PPTX": write_pptx, "TXT": write_txt}
+MIME_TYPES = {
+    "PDF": "application/pdf",
+    "DOCX": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "PPTX": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "TXT": "text/plain",
+}
+
+
+def generate_corpus(directory: str, sizes=("small", "medium"), file_types=FILE_TYPES,
+                    seed: int = 0) -> Dict[str, Dict[str, str]]:
+    """
+    Write one document per file type and size into ``directory`` and return their paths as
+    ``{size: {file_type: path}}``. Existing files are reused.
+    """
+    os.makedirs(directory, exist_ok=True)
+    corpus = {}
+    for size in sizes:
+        paragraphs = generate_text(SIZES[size], seed=seed)
+        for file_type in file_types:
+            path = os.path.join(directory, f"{size}-{seed}.{file_type.lower()}")
+            if not os.path.exists(path):
+                WRITERS[file_type](path, paragraphs)
+            corpus.setdefault(size, {})[file_type] = path
+    return corpus
@@ -0,0 +1,120 @@
+# benchmarks/load.py
+"""
+Load tests of the HTTP API, run in-process against the ASGI app with a SQLite file standing in
+for Postgres.
+"""
+import os
+from typing import Dict
+
+import httpx
+from fastapi import FastAPI
+from peewee import SqliteDatabase
+
+from app.api.endpoints import DocumentRoutes
+from app.core.blob_store import BlobStore
+from app.core.document_parser import DocumentParser
+from app.core.parse_cache import ParseCache
+from app.crud.document_crud import DocumentCRUD
+from app.dependencies import Dependency
+from app.models.blob_models import Blob
+from app.models.document_chunk_models import DocumentChunk
+from app.models.document_models import Document
+from app.models.parse_job_models import ParseJob
+from app.models.parse_result_models import ParseResult
+from benchmarks.corpus import MIME_TYPES
+from benchmarks.timing import measure_load
+
+MODELS = [Document, Blob, ParseResult, ParseJob, DocumentChunk]
+SEARCH_QUERY = "revenue growth"
+
+
+class SqliteStandIn:
+    """
+    The interface of ``app.db.database.Database`` over a SQLite file. WAL mode lets the thread
+    pool read while another thread writes, much like concurrent Postgres connections.
+    """
+
+    def __init__(self, path: str):
+        self.database = SqliteDatabase(path, pragmas={"journal_mode": "wal", "synchronous": "off"})
+        self.database.returning_clause = True  # Like Postgres, hand back the ids of multi-row inserts
+
+    def connect(self):
+        self.database.connect(reuse_if_open=True)
+
+    def close(self):
+        if not self.database.is_closed():
+            self.database.close()
+
+    def execute_sql(self, sql, params=None):
+        return self.database.execute_sql(sql, params)
+
+    def create_tables(self, models):
+        with self.database:
+            self.database.create_tables(models, safe=True)
+
+    def pool_stats(self) -> dict:
+        return {"pooled": False}
+
+
+def _client(routes: DocumentRoutes) -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(routes.router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None)
+
+
+async def run_load(corpus: Dict[str, Dict[str, str]], parser: DocumentParser, workdir: str, total: int,
+                   concurrency: int) -> Dict[str, dict]:
+    """
+    Upload, list, search and parse (cold and cached) under concurrent load; returns one result per endpoint.
+    """
+    db = SqliteStandIn(os.path.join(workdir, "benchmark.db"))
+    uploads = []
+    for files in corpus.values():
+        for file_type, path in files.items():
+            with open(path, "rb") as f:
+                uploads.append((os.path.basename(path), f.read(), MIME_TYPES[file_type]))
+
+    with db.database.bind_ctx(MODELS):
+        db.create_tables(MODELS)
+        dependency = Dependency(db)
+        blob_store = BlobStore(root=os.path.join(workdir, "blobs"))
+        cold = DocumentRoutes(dependency, parse_cache=ParseCache(max_entries=0, persistent=False), parser=parser,
+                              blob_store=blob_store)
+        cached = DocumentRoutes(dependency, parse_cache=ParseCache(persistent=False), parser=parser,
+                                blob_store=blob_store)
+        results = {}
+        async with _client(cold) as client, _client(cached) as cached_client:
+            documents = []
+
+            async def upload(number):
+                response = await client.post("/api/upload/", files={"file": uploads[number % len(uploads)]})
+                response.raise_for_status()
+                documents.append(response.json())
+            results["http.upload"] = await measure_load(upload, total, concurrency)
+
+            # Give the first copy of every file its text, as a finished parse job would, so search has matches
+            document_crud = DocumentCRUD(db=db)
+            with dependency.connection():
+                for document in documents[:len(uploads)]:
+                    path = blob_store.path_for(document["content_hash"])
+                    text = "".join(parser.extractors.extract(path, document["file_type"]))
+                    document_crud.update_parsed_text(document["id"], text)
+
+            async def get(path, http=client, **params):
+                response = await http.get(path, params=params)
+                response.raise_for_status()
+
+            results["http.list"] = await measure_load(lambda number: get("/api/documents", limit=50), total,
+                                                      concurrency)
+            results["http.search"] = await measure_load(
+                lambda number: get("/api/documents/search", q=SEARCH_QUERY), total, concurrency
+            )
+            ids = [document["id"] for document in documents[:len(uploads)]]
+            results["http.parse"] = await measure_load(
+                lambda number: get(f"/api/documents/{ids[number % len(ids)]}/parse"), total, concurrency
+            )
+            results["http.parse_cached"] = await measure_load(
+                lambda number: get(f"/api/documents/{ids[number % len(ids)]}/parse", http=cached_client), total,
+                concurrency,
+            )
+    return results
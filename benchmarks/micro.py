@@ -0,0 +1,57 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks of the parse pipeline's hot paths: every extractor, tokenization, both chunkers,
+summarization and the whole parse, per file type and document size.
+"""
+from typing import Dict
+
+from app.core.chunking import StreamingChunker, coalesce
+from app.core.document_parser import CHUNK_MAX_LENGTH, CHUNK_OVERLAP, SEGMENT_MIN_CHARS, DocumentParser
+from app.core.extractors import extractor_registry
+from app.core.pdf_extraction import pdf_text_extractor
+from benchmarks.corpus import generate_text
+from benchmarks.timing import measure
+
+SUMMARY_INPUT_WORDS = 700  # Fits the summarizer in one pass
+
+
+def _clear_caches():
+    pdf_text_extractor.page_cache.clear()  # Extraction is measured cold
+
+
+def run_micro(corpus: Dict[str, Dict[str, str]], parser: DocumentParser, iterations: int) -> Dict[str, dict]:
+    results = {}
+    for size, files in corpus.items():
+        for file_type, path in files.items():
+            results[f"extract.{file_type.lower()}.{size}"] = measure(
+                lambda: sum(len(segment) for segment in extractor_registry.extract(path, file_type)),
+                iterations, setup=_clear_caches,
+            )
+
+    for size, files in corpus.items():
+        text = "".join(extractor_registry.extract(files["TXT"], "TXT"))
+        segments = list(coalesce(iter(text.split("\n\n")), SEGMENT_MIN_CHARS))
+        tokens = parser.tokenize(text)
+        segment_tokens = [parser.tokenize(segment) for segment in segments]
+
+        def stream_chunks():
+            chunker = StreamingChunker(CHUNK_MAX_LENGTH, CHUNK_OVERLAP)
+            for segment, pieces in zip(segments, segment_tokens):
+                chunker.feed(segment, pieces)
+            return chunker.finish()
+
+        results[f"tokenize.{size}"] = measure(lambda: parser.tokenize(text), iterations)
+        results[f"split_with_overlap.{size}"] = measure(
+            lambda: parser.split_with_overlap(text, CHUNK_MAX_LENGTH, CHUNK_OVERLAP, tokens=tokens), iterations
+        )
+        results[f"streaming_chunker.{size}"] = measure(stream_chunks, iterations)
+
+    summary_input = "\n\n".join(generate_text(SUMMARY_INPUT_WORDS))
+    results["summarize_text"] = measure(lambda: parser.summarize_text(summary_input, max_length=0), iterations)
+
+    for size, files in corpus.items():
+        for file_type, path in files.items():
+            results[f"parse.{file_type.lower()}.{size}"] = measure(
+                lambda: parser.parse(path, file_type), iterations, setup=_clear_caches
+            )
+    return results
@@ -0,0 +1,44 @@
+# benchmarks/models.py
+"""
+Model stand-ins for benchmarking the service itself, without model inference.
+
+``--models fake`` swaps the tokenizer for a whitespace tokenizer and the summarizer for one that
+returns each text's first sentence, so timings are deterministic, need no model download and
+isolate extraction, chunking, storage and request handling. ``--models real`` uses the models
+the service runs with.
+"""
+import re
+
+from app.core.document_parser import DocumentParser
+from app.core.segment_cache import SegmentCache
+
+_WORD = re.compile(r"\S+")
+
+
+class WhitespaceTokenizer:
+    """Fast tokenizer interface over whitespace-separated words, with character offsets."""
+
+    is_fast = True
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        spans = [match.span() for match in _WORD.finditer(text)]
+        return {"input_ids": list(range(len(spans))), "offset_mapping": spans}
+
+    def decode(self, ids, skip_special_tokens=True):
+        raise NotImplementedError("Chunks are sliced from the text using offsets")
+
+
+class LeadSummarizer:
+    """Summarization pipeline interface returning the first sentence of every text."""
+
+    def __call__(self, texts, batch_size=1, **generate_kwargs):
+        return [{"summary_text": text.split(". ", 1)[0]} for text in texts]
+
+
+def make_parser(models: str = "fake") -> DocumentParser:
+    # Segments are never cached, so every parse measures the full pipeline
+    segment_cache = SegmentCache(max_entries=0, persistent=False)
+    if models == "real":
+        return DocumentParser(segment_cache=segment_cache)
+    return DocumentParser(tokenizer=WhitespaceTokenizer(), summarizer=LeadSummarizer(), embeddings_enabled=False,
+                          segment_cache=segment_cache)
@@ -0,0 +1,109 @@
+# benchmarks/run.py
+"""
+Benchmark suite: micro-benchmarks of the parse pipeline and load tests of the HTTP API.
+
+    python -m benchmarks.run --quick                      # Measure and print
+    python -m benchmarks.run --save-baseline              # Measure and store benchmarks/baseline.json
+    python -m benchmarks.run --compare --threshold 0.15   # Fail if anything regressed past the baseline
+
+The service's own modules are imported without building the Postgres-backed app: the load tests
+run against a SQLite file and the in-process search index.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+PROFILES = {
+    "quick": {"sizes": ("small", "medium"), "iterations": 10, "requests": 64, "concurrency": 8},
+    "full": {"sizes": ("small", "medium", "large"), "iterations": 20, "requests": 256, "concurrency": 16},
+}
+
+
+def _prepare_environment(workdir: str):
+    os.environ.setdefault("SEARCH_BACKEND", "memory")
+    os.environ.setdefault("BLOB_STORE_ROOT", os.path.join(workdir, "blobs"))
+    os.environ.setdefault("SIDECAR_ROOT", os.path.join(workdir, "sidecars"))
+
+
+def run(profile: str, models: str, workdir: str) -> dict:
+    from benchmarks.corpus import generate_corpus
+    from benchmarks.load import run_load
+    from benchmarks.micro import run_micro
+    from benchmarks.models import make_parser
+
+    settings = PROFILES[profile]
+    corpus = generate_corpus(os.path.join(workdir, "corpus"), sizes=settings["sizes"])
+    parser = make_parser(models)
+    results = {f"micro.{name}": result for name, result in run_micro(corpus, parser, settings["iterations"]).items()}
+    load = asyncio.run(run_load(corpus, parser, workdir, settings["requests"], settings["concurrency"]))
+    results.update(load)
+    return {
+        "meta": {
+            "profile": profile,
+            "models": models,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Smaller corpus and fewer iterations")
+    parser.add_argument("--models", choices=("fake", "real"), default="fake",
+                        help="fake: whitespace tokenizer and lead-sentence summarizer; real: the service's models")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Exit with status 1 on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Tolerated relative drop in throughput or rise in p95 latency (default 0.20)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as workdir:
+        _prepare_environment(workdir)
+        from benchmarks.timing import REGRESSION_THRESHOLD, compare, format_results
+
+        report = run("quick" if args.quick else "full", args.models, workdir)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    comparable = baseline is not None and all(
+        baseline["meta"].get(key) == report["meta"][key] for key in ("profile", "models")
+    )
+    print(format_results(report["results"], baseline["results"] if comparable else None))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare:
+        if not comparable:
+            sys.exit(f"No baseline for profile '{report['meta']['profile']}' with {args.models} models "
+                     f"at {args.baseline}; run with --save-baseline first")
+        threshold = REGRESSION_THRESHOLD if args.threshold is None else args.threshold
+        regressions = compare(report["results"], baseline["results"], threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}:")
+            print("\n".join(f"  {regression}" for regression in regressions))
+            sys.exit(1)
+        print(f"\nNo regressions beyond {threshold:.0%}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
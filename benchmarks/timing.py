@@ -0,0 +1,94 @@
+# benchmarks/timing.py
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+REGRESSION_THRESHOLD = 0.20  # Tolerated relative drop in throughput or rise in p95 latency
+
+
+def summarize(latencies: List[float], elapsed: float) -> dict:
+    """
+    Throughput and latency percentiles of ``len(latencies)`` operations completed in ``elapsed`` seconds.
+    """
+    ordered = sorted(latencies)
+
+    def percentile(fraction):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+    return {
+        "iterations": len(ordered),
+        "throughput_per_s": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+    }
+
+
+def measure(func: Callable, iterations: int, warmup: int = 1, setup: Optional[Callable] = None) -> dict:
+    """
+    Time ``iterations`` sequential calls of ``func``; ``setup`` runs before every call, untimed.
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    latencies = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, sum(latencies))
+
+
+async def measure_load(request: Callable[[int], Awaitable], total: int, concurrency: int) -> dict:
+    """
+    Issue ``total`` requests from ``concurrency`` concurrent clients; ``request`` receives the
+    request number and must raise on failure.
+    """
+    latencies = []
+    counter = iter(range(total))
+
+    async def client():
+        for number in counter:
+            started = time.perf_counter()
+            await request(number)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return {**summarize(latencies, time.perf_counter() - started), "concurrency": concurrency}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+            threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Regressions of ``results`` against ``baseline``: benchmarks whose throughput fell, or whose p95
+    latency rose, by more than ``threshold``. Benchmarks missing on either side are ignored.
+    """
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["throughput_per_s"] < base["throughput_per_s"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {current['throughput_per_s']:.1f}/s < baseline {base['throughput_per_s']:.1f}/s"
+            )
+        if current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.2f} ms > baseline {base['p95_ms']:.2f} ms")
+    return regressions
+
+
+def format_results(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> str:
+    lines = [f"{'benchmark':<40} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'vs baseline':>12}"]
+    for name, result in results.items():
+        change = ""
+        if baseline and name in baseline and baseline[name]["throughput_per_s"]:
+            change = f"{result['throughput_per_s'] / baseline[name]['throughput_per_s'] - 1:+.1%}"
+        lines.append(
+            f"{name:<40} {result['throughput_per_s']:>10.1f} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+            f"{change:>12}"
+        )
+    return "\n".join(lines)
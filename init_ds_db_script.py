@@ -63,7 +63,12 @@ def initialize_schema():
         cursor = conn.cursor()
 
         # Drop tables if they exist
+        cursor.execute("DROP TABLE IF EXISTS document_chunks;")
+        cursor.execute("DROP TABLE IF EXISTS parse_jobs;")
+        cursor.execute("DROP TABLE IF EXISTS parse_results;")
+        cursor.execute("DROP TABLE IF EXISTS parse_segments;")
         cursor.execute("DROP TABLE IF EXISTS documents;")
+        cursor.execute("DROP TABLE IF EXISTS blobs;")
 
         # Create the documents table
         cursor.execute('''
@@ -72,7 +77,93 @@ def initialize_schema():
             file_name VARCHAR(100) NOT NULL,
             file_type VARCHAR(100) NOT NULL,
             upload_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            parsed_text TEXT
+            parsed_text TEXT,
+            content_hash VARCHAR(64),
+            byte_size BIGINT,
+            page_count INTEGER,
+            char_count INTEGER,
+            token_count INTEGER,
+            chunk_count INTEGER,
+            segment_keys TEXT,
+            search_vector TSVECTOR
+        );
+        ''')
+        cursor.execute("CREATE INDEX document_content_hash ON documents (content_hash);")
+        cursor.execute("CREATE INDEX document_upload_timestamp_id ON documents (upload_timestamp, id);")
+        cursor.execute(
+            "CREATE INDEX document_file_type_upload_timestamp_id ON documents (file_type, upload_timestamp, id);"
+        )
+        cursor.execute(
+            "CREATE INDEX document_file_name_upload_timestamp ON documents (file_name, upload_timestamp);"
+        )
+        cursor.execute("CREATE INDEX document_search_vector ON documents USING GIN (search_vector);")
+        for column in ("byte_size", "page_count", "char_count", "token_count", "chunk_count"):
+            cursor.execute(f"CREATE INDEX document_{column}_id ON documents ({column}, id);")
+
+        # Create the blob reference count table
+        cursor.execute('''
+        CREATE TABLE blobs (
+            content_hash VARCHAR(64) PRIMARY KEY,
+            byte_size BIGINT NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        ''')
+
+        # Create the parse result cache table
+        cursor.execute('''
+        CREATE TABLE parse_results (
+            cache_key VARCHAR(64) PRIMARY KEY,
+            content_hash VARCHAR(64) NOT NULL,
+            summary TEXT NOT NULL,
+            chunks TEXT NOT NULL,
+            created_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        ''')
+        cursor.execute("CREATE INDEX parseresult_content_hash ON parse_results (content_hash);")
+
+        # Create the parse job table
+        cursor.execute('''
+        CREATE TABLE parse_jobs (
+            id SERIAL PRIMARY KEY,
+            document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            progress REAL NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        ''')
+        cursor.execute("CREATE INDEX parsejob_document_id ON parse_jobs (document_id);")
+        cursor.execute("CREATE INDEX parsejob_status ON parse_jobs (status);")
+
+        # Create the document chunk table; its primary key serves range queries over a document's chunks
+        cursor.execute('''
+        CREATE TABLE document_chunks (
+            document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+            ordinal INTEGER NOT NULL,
+            token_start INTEGER NOT NULL,
+            token_end INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            embedding BYTEA,
+            PRIMARY KEY (document_id, ordinal)
+        );
+        ''')
+
+        # Create the parse segment table, the persistent tier of the incremental parse cache
+        cursor.execute('''
+        CREATE TABLE parse_segments (
+            cache_key VARCHAR(64) PRIMARY KEY,
+            text TEXT NOT NULL,
+            token_count INTEGER NOT NULL,
+            chunks TEXT NOT NULL,
+            token_spans TEXT NOT NULL,
+            char_spans TEXT,
+            token_ids BYTEA,
+            embeddings BYTEA,
+            summaries TEXT,
+            created_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
         );
         ''')
         print("Schema initialized successfully.")
@@ -0,0 +1,30 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+
+from app.api.endpoints import DatabaseRoutes
+from app.dependencies import Dependency
+
+
+@pytest.fixture
+def mock_dependency():
+    dependency = MagicMock(spec=Dependency)
+    dependency.db = MagicMock()
+    return dependency
+
+
+@pytest.fixture
+def client(mock_dependency):
+    app = FastAPI()
+    app.include_router(DatabaseRoutes(dependency=mock_dependency).router)
+    return TestClient(app)
+
+
+def test_pool_stats(client, mock_dependency):
+    mock_dependency.db.pool_stats.return_value = {"pooled": True, "in_use": 1, "idle": 2}
+
+    response = client.get("/api/db/pool/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {"pooled": True, "in_use": 1, "idle": 2}
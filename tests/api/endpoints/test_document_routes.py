@@ -11,6 +11,8 @@ from unittest.mock import MagicMock, create_autospec, patch
 
 from app.api.endpoints import DocumentRoutes
 from app.api.schemas.document_schemas import Document
+from app.core.blob_store import blob_store_instance
+from app.core.sidecar import sidecar_store_instance
 from app.crud.document_crud import DocumentCRUD
 from app.dependencies import Dependency
 
@@ -23,6 +25,13 @@ sample_document_txt = Document(id=4, file_name="dummy.txt", file_type="txt", upl
 sample_document_long_docx = Document(id=5, file_name="Stuttgart.docx", file_type="DOCX", upload_timestamp=datetime(2022, 1, 1))
 
 
+@pytest.fixture(autouse=True)
+def storage_roots(tmp_path, monkeypatch):
+    # Uploads and sidecars written by the routes go to a temporary directory instead of the source tree
+    monkeypatch.setattr(blob_store_instance, "root", str(tmp_path / "blobs"))
+    monkeypatch.setattr(sidecar_store_instance, "root", str(tmp_path / "sidecars"))
+
+
 @pytest.fixture
 def client_success():
     app = FastAPI()
@@ -211,3 +220,357 @@ def test_create_directory():
     finally:
         # Cleanup: Remove the temporary directory after the test
         shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def list_documents():
+    with patch('app.crud.document_crud.DocumentCRUD.list_documents') as mock_list_documents:
+        yield mock_list_documents
+
+
+@pytest.fixture
+def client_list():
+    app = FastAPI()
+    document_routes = DocumentRoutes(dependency=MagicMock(spec=Dependency))
+    app.include_router(document_routes.router)
+    return TestClient(app)
+
+
+def test_list_documents_first_page(client_list, list_documents):
+    list_documents.return_value = [sample_document_pdf, sample_document_docx]
+
+    response = client_list.get("/api/documents", params={"limit": 1, "file_type": "PDF"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [1]
+    assert "parsed_text" not in body["items"][0]
+    assert body["next_cursor"]
+    list_documents.assert_called_once_with(2, after=None, file_type="PDF", uploaded_from=None, uploaded_to=None,
+                                           sort="-upload_timestamp", ranges={})
+
+    client_list.get("/api/documents", params={"limit": 1, "cursor": body["next_cursor"]})
+    assert list_documents.call_args.kwargs["after"] == (datetime(2022, 1, 1), 1)
+
+
+def test_list_documents_sorted_by_statistic(client_list, list_documents):
+    list_documents.return_value = [
+        Document(id=3, file_name="a.pdf", file_type="PDF", upload_timestamp=datetime(2022, 1, 1), token_count=900),
+        Document(id=1, file_name="b.pdf", file_type="PDF", upload_timestamp=datetime(2022, 1, 2), token_count=500),
+    ]
+
+    response = client_list.get("/api/documents", params={"limit": 1, "sort": "-token_count", "min_pages": 2})
+
+    assert response.json()["items"][0]["token_count"] == 900
+    assert list_documents.call_args.kwargs["sort"] == "-token_count"
+    assert list_documents.call_args.kwargs["ranges"] == {"page_count": (2, None)}
+    cursor = response.json()["next_cursor"]
+    client_list.get("/api/documents", params={"sort": "-token_count", "cursor": cursor})
+    assert list_documents.call_args.kwargs["after"] == (900, 3)
+    assert client_list.get("/api/documents", params={"cursor": cursor}).status_code == 400  # Another sort order
+    assert client_list.get("/api/documents", params={"sort": "file_name"}).status_code == 422
+
+
+def test_get_document_stats(client_list):
+    from app.models.document_models import Document as DocumentModel
+
+    stats = DocumentModel(id=1, content_hash="a" * 64, byte_size=2048, page_count=3, char_count=5000, token_count=1100,
+                          chunk_count=11)
+    with patch('app.crud.document_crud.DocumentCRUD.get_document_stats', return_value=stats):
+        response = client_list.get("/api/documents/1/stats")
+    with patch('app.crud.document_crud.DocumentCRUD.get_document_stats', return_value=None):
+        missing = client_list.get("/api/documents/999/stats")
+
+    assert response.json() == {"id": 1, "content_hash": "a" * 64, "byte_size": 2048, "page_count": 3,
+                               "char_count": 5000, "token_count": 1100, "chunk_count": 11}
+    assert missing.status_code == 404
+
+
+def test_list_documents_last_page(client_list, list_documents):
+    list_documents.return_value = [sample_document_pdf]
+
+    response = client_list.get("/api/documents")
+
+    assert response.json()["next_cursor"] is None
+
+
+def test_list_documents_invalid_cursor(client_list):
+    response = client_list.get("/api/documents", params={"cursor": "bogus"})
+
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def client_bulk(tmp_path):
+    from app.core.blob_store import BlobStore
+
+    app = FastAPI()
+    blob_store = BlobStore(root=str(tmp_path / "blobs"), blob_crud=MagicMock())
+    document_routes = DocumentRoutes(dependency=MagicMock(spec=Dependency), blob_store=blob_store)
+    app.include_router(document_routes.router)
+    return TestClient(app)
+
+
+def test_bulk_upload(client_bulk):
+    files = [
+        ("files", ("a.txt", b"first", "text/plain")),
+        ("files", ("b.txt", b"second", "text/plain")),
+    ]
+
+    def create_documents(documents):
+        return [
+            Document(id=i + 1, file_name=d.file_name, file_type="TXT", upload_timestamp=d.upload_timestamp,
+                     content_hash=d.content_hash, byte_size=d.byte_size)
+            for i, d in enumerate(documents)
+        ]
+
+    with patch('app.crud.document_crud.DocumentCRUD.create_documents', side_effect=create_documents) as mock_create, \
+         patch('app.crud.document_crud.DocumentCRUD.get_parsed_texts_by_hash', return_value={}):
+        response = client_bulk.post("/api/upload/bulk", files=files)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 0)
+    assert [result["document"]["file_name"] for result in body["results"]] == ["a.txt", "b.txt"]
+    assert body["results"][1]["document"]["byte_size"] == 6
+    mock_create.assert_called_once()  # One batch for all files
+
+
+def test_bulk_upload_reports_oversized_files(client_bulk):
+    files = [
+        ("files", ("a.txt", b"first", "text/plain")),
+        ("files", ("big.txt", b"x" * 20, "text/plain")),
+    ]
+
+    from app.core.file_storage import stream_upload
+
+    async def stream_small_upload(upload, destination, max_bytes):
+        return await stream_upload(upload, destination, max_bytes=10)
+
+    with patch('app.core.blob_store.stream_upload', side_effect=stream_small_upload), \
+         patch('app.crud.document_crud.DocumentCRUD.create_documents', return_value=[sample_document_pdf]), \
+         patch('app.crud.document_crud.DocumentCRUD.get_parsed_texts_by_hash', return_value={}):
+        response = client_bulk.post("/api/upload/bulk", files=files)
+
+    body = response.json()
+    assert (body["created"], body["failed"]) == (1, 1)
+    assert body["results"][1]["status"] == "failed"
+
+
+@pytest.mark.parametrize("max_files, count, status_code", [(2, 3, 413), (1200, 1001, 200)])
+def test_bulk_upload_file_limit(client_bulk, max_files, count, status_code):
+    files = [("files", (f"{i}.txt", str(i).encode(), "text/plain")) for i in range(count)]
+
+    def create_documents(documents):
+        return [sample_document_pdf] * len(documents)
+
+    with patch('app.api.endpoints.document_routes.BULK_UPLOAD_MAX_FILES', max_files), \
+         patch('app.crud.document_crud.DocumentCRUD.create_documents', side_effect=create_documents), \
+         patch('app.crud.document_crud.DocumentCRUD.get_parsed_texts_by_hash', return_value={}):
+        response = client_bulk.post("/api/upload/bulk", files=files)
+
+    assert response.status_code == status_code
+    if status_code == 413:  # The endpoint's own error, not one from form parsing
+        assert response.json() == {"detail": "At most 2 files can be uploaded at once."}
+    else:
+        assert response.json()["created"] == count  # Above Starlette's default limit of 1000 files
+
+
+def test_bulk_upload_without_files(client_bulk):
+    response = client_bulk.post("/api/upload/bulk", data={"other": "value"}, files=[("x", ("a.txt", b"a"))])
+
+    assert response.status_code == 422
+
+
+def test_search_documents():
+    app = FastAPI()
+    search_index = MagicMock()
+    hit = {"id": 1, "file_name": "dummy.pdf", "file_type": "PDF", "upload_timestamp": datetime(2022, 1, 1),
+           "rank": 0.5, "snippet": "the <b>revenue</b> grew"}
+    search_index.search.return_value = [hit, {**hit, "id": 2}]
+    document_routes = DocumentRoutes(dependency=MagicMock(spec=Dependency), search_index=search_index)
+    app.include_router(document_routes.router)
+
+    response = TestClient(app).get("/api/documents/search", params={"q": "revenue", "limit": 1, "offset": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [1]
+    assert body["items"][0]["snippet"] == "the <b>revenue</b> grew"
+    assert body["next_offset"] == 4
+    search_index.search.assert_called_once_with("revenue", 2, 3)
+
+
+def test_get_document_chunks(client_list):
+    from app.models.document_chunk_models import DocumentChunk
+
+    chunks = [DocumentChunk(document=1, ordinal=i, token_start=i * 103, token_end=i * 103 + 128, text=f"chunk {i}")
+              for i in (2, 3, 4)]
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=sample_document_pdf), \
+         patch('app.crud.document_chunk_crud.DocumentChunkCRUD.get_chunks', return_value=chunks) as mock_get_chunks:
+        response = client_list.get("/api/documents/1/chunks", params={"start": 2, "limit": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["ordinal"] for item in body["items"]] == [2, 3]
+    assert body["items"][0] == {"ordinal": 2, "token_start": 206, "token_end": 334, "text": "chunk 2"}
+    assert body["next_start"] == 4
+    mock_get_chunks.assert_called_once_with(1, 3, start=2, end=None, token_start=None, token_end=None)
+
+
+def test_get_document_chunks_not_found(client_list):
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=None):
+        response = client_list.get("/api/documents/999/chunks")
+
+    assert response.status_code == 404
+
+
+def test_similar_chunks():
+    import numpy as np
+
+    app = FastAPI()
+    parser = MagicMock()
+    parser.embed.return_value = np.ones((1, 2), dtype=np.float32)
+    vector_index = MagicMock()
+    vector_index.search.return_value = [(2, 0, 0.9), (3, 1, 0.5)]
+    document_routes = DocumentRoutes(dependency=MagicMock(spec=Dependency), parser=parser, vector_index=vector_index)
+    app.include_router(document_routes.router)
+    chunk = {"document_id": 2, "file_name": "dummy.docx", "ordinal": 0, "token_start": 0, "token_end": 128,
+             "text": "chunk"}
+
+    with patch('app.crud.document_chunk_crud.DocumentChunkCRUD.get_chunks_by_keys',
+               return_value={(2, 0): chunk}) as mock_get_chunks:
+        response = TestClient(app).post("/api/documents/similar", json={"text": "query", "top_k": 2})
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [{**chunk, "score": 0.9}]  # Chunk 1 of document 3 was deleted
+    parser.embed.assert_called_once_with(["query"])
+    assert vector_index.search.call_args.args[1] == 2
+    mock_get_chunks.assert_called_once_with([(2, 0), (3, 1)])
+
+
+@pytest.fixture
+def client_stream():
+    app = FastAPI()
+    parser = MagicMock()
+    parser.extractors = ["PDF"]
+    parser.parse_params = {}
+
+    def iter_parse(file_location, file_type, segments=None):
+        yield 0, "first chunk", (0, 128)
+        yield 1, "second chunk", (103, 140)
+        return {"text": "first chunk second chunk", "chunks": ["first chunk", "second chunk"],
+                "token_spans": [(0, 128), (103, 140)], "embeddings": None, "summary": "the summary",
+                "token_count": 140, "page_count": 1}
+    parser.iter_parse.side_effect = iter_parse
+    parse_cache = MagicMock()
+    parse_cache.get.return_value = None
+    blob_store = MagicMock()
+    blob_store.content_hash.return_value = "abc"
+    document_routes = DocumentRoutes(dependency=MagicMock(spec=Dependency), parser=parser, parse_cache=parse_cache,
+                                     blob_store=blob_store)
+    app.include_router(document_routes.router)
+    return TestClient(app), parse_cache, parser
+
+
+def test_stream_parse_document_ndjson(client_stream):
+    import json
+
+    client, parse_cache, parser = client_stream
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=sample_document_pdf), \
+         patch('app.crud.document_crud.DocumentCRUD.get_previous_segment_keys', return_value=["k"]) as mock_keys, \
+         patch('app.crud.document_crud.DocumentCRUD.update_stats') as mock_update_stats, \
+         patch('app.crud.document_crud.DocumentCRUD.update_parsed_text') as mock_update_parsed_text, \
+         patch('app.crud.document_chunk_crud.DocumentChunkCRUD.replace_chunks') as mock_replace_chunks:
+        response = client.get("/api/documents/1/parse/stream")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["metadata", "chunk", "chunk", "summary"]
+    assert events[0]["file_name"] == "dummy.pdf"
+    assert events[2] == {"event": "chunk", "ordinal": 1, "token_start": 103, "token_end": 140, "text": "second chunk"}
+    assert events[3]["summary"] == "the summary"
+    parse_cache.set.assert_called_once()
+    # The segments of the previous version are loaded with the lookup, and handed to the parser
+    mock_keys.assert_called_once_with("dummy.pdf")
+    assert parser.iter_parse.call_args.kwargs["segments"] is parser.segment_cache.get_many.return_value
+    mock_update_parsed_text.assert_called_once_with(1, "first chunk second chunk", "abc")
+    mock_replace_chunks.assert_called_once_with(1, ["first chunk", "second chunk"], [(0, 128), (103, 140)], None)
+    mock_update_stats.assert_called_once_with(
+        1, "abc", {"page_count": 1, "char_count": 24, "token_count": 140, "chunk_count": 2}
+    )
+
+
+def test_stream_parse_document_sse_from_cache(client_stream):
+    client, parse_cache, _ = client_stream
+    parse_cache.get.return_value = {"chunks": ["cached chunk"], "summary": "cached summary"}
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=sample_document_pdf), \
+         patch('app.crud.document_chunk_crud.DocumentChunkCRUD.copy_chunks'), \
+         patch('app.crud.document_crud.DocumentCRUD.copy_parsed_text') as mock_copy_parsed_text:
+        response = client.get("/api/documents/1/parse/stream", params={"format": "sse"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.split("\n\n")[1:3] == [
+        'event: chunk\ndata: {"ordinal": 0, "text": "cached chunk"}',
+        'event: summary\ndata: {"summary": "cached summary"}',
+    ]
+    mock_copy_parsed_text.assert_called_once_with(1, "abc")  # Searchable like the document parsed first
+
+
+def test_stream_parse_document_not_found(client_stream):
+    client, _, _ = client_stream
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=None):
+        response = client.get("/api/documents/999/parse/stream")
+
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def client_sidecar(tmp_path):
+    import numpy as np
+
+    from app.core.sidecar import SidecarStore
+
+    sidecar_store = SidecarStore(root=str(tmp_path / "sidecars"))
+    sidecar_store.write("abc", "abcdef", {
+        "text": "First page. Second page.", "chunks": ["First page.", "Second page."], "token_spans": [(0, 2), (2, 4)],
+        "segment_lengths": [12, 12], "token_ids": np.array([10, 11, 12, 13], dtype=np.uint32),
+    })
+    parse_cache = MagicMock()
+    parse_cache.make_key.return_value = "abcdef"
+    parser = MagicMock()
+    parser.parse_params = {}
+    blob_store = MagicMock()
+    blob_store.content_hash.return_value = "abc"
+    app = FastAPI()
+    document_routes = DocumentRoutes(dependency=MagicMock(spec=Dependency), parser=parser, parse_cache=parse_cache,
+                                     blob_store=blob_store, sidecar_store=sidecar_store)
+    app.include_router(document_routes.router)
+    return TestClient(app), parse_cache
+
+
+def test_get_document_text(client_sidecar):
+    client, _ = client_sidecar
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=sample_document_pdf):
+        by_range = client.get("/api/documents/1/text", params={"start": 6, "end": 10}).json()
+        by_page = client.get("/api/documents/1/text", params={"page": 1}).json()
+        by_chunk = client.get("/api/documents/1/text", params={"chunk": 0}).json()
+        missing_page = client.get("/api/documents/1/text", params={"page": 2})
+
+    assert by_range == {"document_id": 1, "start": 6, "end": 10, "text": "page", "char_count": 24, "page_count": 2,
+                        "chunk_count": 2, "token_count": 4}
+    assert (by_page["start"], by_page["text"]) == (12, "Second page.")
+    assert by_chunk["text"] == "First page."
+    assert missing_page.status_code == 404
+
+
+def test_get_document_tokens(client_sidecar):
+    client, parse_cache = client_sidecar
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=sample_document_pdf):
+        response = client.get("/api/documents/1/tokens", params={"start": 1, "end": 3})
+        parse_cache.make_key.return_value = "unparsed"
+        unparsed = client.get("/api/documents/1/tokens")
+
+    assert response.json() == {"document_id": 1, "start": 1, "end": 3, "ids": [11, 12], "token_count": 4}
+    assert unparsed.status_code == 404
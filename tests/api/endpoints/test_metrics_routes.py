@@ -0,0 +1,20 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import MetricsRoutes
+from app.core.metrics import MetricsRegistry
+
+
+def test_metrics_are_served_in_prometheus_format():
+    registry = MetricsRegistry()
+    registry.histogram("stage_duration_seconds", "Stage latency.", buckets=(1,), label_names=("stage",)).observe(
+        0.5, stage="parse.extract"
+    )
+    app = FastAPI()
+    app.include_router(MetricsRoutes(registry=registry).router)
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'stage_duration_seconds_count{stage="parse.extract"} 1' in response.text
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from app.api.endpoints import ParseJobRoutes
+from app.core.parse_jobs import ParseQueueFullError
+from app.dependencies import Dependency
+
+
+def make_job(**fields):
+    job = MagicMock(
+        id=7,
+        document_id=1,
+        status="queued",
+        progress=0.0,
+        error=None,
+        result=None,
+        created_timestamp=datetime(2022, 1, 1),
+        updated_timestamp=datetime(2022, 1, 1),
+    )
+    job.configure_mock(**fields)
+    return job
+
+
+@pytest.fixture
+def mock_queue():
+    return MagicMock()
+
+
+@pytest.fixture
+def client(mock_queue):
+    app = FastAPI()
+    parse_job_routes = ParseJobRoutes(dependency=MagicMock(spec=Dependency), parse_job_queue=mock_queue)
+    app.include_router(parse_job_routes.router)
+    return TestClient(app)
+
+
+def test_create_parse_job(client, mock_queue):
+    mock_queue.submit.return_value = make_job()
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=MagicMock(file_type="PDF")):
+        response = client.post("/api/documents/1/parse-jobs")
+
+    assert response.status_code == 202
+    assert response.json()["id"] == 7
+    assert response.json()["status"] == "queued"
+
+
+def test_create_parse_job_document_not_found(client):
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=None):
+        response = client.post("/api/documents/999/parse-jobs")
+
+    assert response.status_code == 404
+
+
+def test_create_parse_job_unsupported_format(client):
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=MagicMock(file_type="txt")):
+        response = client.post("/api/documents/4/parse-jobs")
+
+    assert response.status_code == 415
+
+
+def test_create_parse_job_queue_full(client, mock_queue):
+    mock_queue.submit.side_effect = ParseQueueFullError()
+    with patch('app.crud.document_crud.DocumentCRUD.get_document', return_value=MagicMock(file_type="PDF")):
+        response = client.post("/api/documents/1/parse-jobs")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_get_parse_job_done(client, mock_queue):
+    mock_queue.get.return_value = make_job(status="done", progress=1.0, result='{"summary": "", "chunks": ["chunk"]}')
+
+    response = client.get("/api/parse-jobs/7")
+
+    assert response.status_code == 200
+    assert response.json()["result"] == {"summary": "", "chunks": ["chunk"]}
+
+
+def test_get_parse_job_not_found(client, mock_queue):
+    mock_queue.get.return_value = None
+
+    response = client.get("/api/parse-jobs/999")
+
+    assert response.status_code == 404
@@ -0,0 +1,62 @@
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.api.middleware import RequestSizeLimitMiddleware
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware, limits={"/upload": 1000})
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(await file.read())
+        return {"size": len(received[-1])}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(app), received
+
+
+def test_small_upload_passes(client):
+    client, received = client
+
+    response = client.post("/upload", files={"file": ("a.txt", b"x" * 100)})
+
+    assert response.json() == {"size": 100}
+
+
+def test_declared_length_over_the_limit_is_rejected_before_parsing(client):
+    client, received = client
+
+    response = client.post("/upload", files={"file": ("a.txt", b"x" * 5000)})
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body exceeds the limit of 1000 bytes"}
+    assert received == []
+
+
+def test_undeclared_length_is_cut_off_once_over_the_limit(client):
+    client, received = client
+
+    def body():  # No Content-Length, like a chunked request
+        yield b"--boundary\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.txt\"\r\n\r\n"
+        for _ in range(100):
+            yield b"x" * 100
+
+    response = client.post("/upload", content=body(),
+                           headers={"content-type": "multipart/form-data; boundary=boundary"})
+
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_other_routes_are_not_limited(client):
+    client, _ = client
+
+    assert client.post("/other", files={"file": ("a.txt", b"x" * 5000)}).json() == {"size": 5000}
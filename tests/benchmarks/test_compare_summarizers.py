@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks.compare_summarizers import compare, format_report, load_corpus, rouge_l, rouge_n
+
+
+def test_rouge_n():
+    assert rouge_n("the cat sat", "the cat sat", 1) == 1.0
+    assert rouge_n("the cat sat", "the dog sat", 1) == pytest.approx(2 / 3)
+    assert rouge_n("the cat sat", "the dog sat", 2) == 0.0
+    assert rouge_n("", "", 2) == 1.0
+
+
+def test_rouge_l():
+    assert rouge_l("the cat sat on the mat", "the cat on the mat") == pytest.approx(2 * 5 / 11)
+    assert rouge_l("a b", "c d") == 0.0
+
+
+def test_load_corpus(tmp_path):
+    text_file = tmp_path / "test_file.txt"
+    text_file.write_text("Test file content")
+
+    corpus = load_corpus([str(tmp_path), "uploads/dummy.docx", "pytest.ini"])
+
+    assert corpus == {"uploads/dummy.docx": "Dummy DOCX file", str(text_file): "Test file content"}
+
+
+def test_compare_reports_drift_from_reference():
+    def loader(model_name, backend):
+        def summarizer(texts, **kwargs):
+            suffix = "" if backend == "pytorch" else " drift"
+            return [{"summary_text": text.split(".")[0] + suffix} for text in texts]
+        return summarizer
+
+    report = compare({"a": "one two. three", "b": "four five. six"}, ["int8"], runs=2, loader=loader)
+
+    assert list(report) == ["pytorch", "int8"]
+    assert report["pytorch"]["rouge1"] == 1.0
+    assert report["int8"]["summaries"] == ["one two drift", "four five drift"]
+    assert report["int8"]["rouge1"] == pytest.approx(0.8)
+    assert report["int8"]["throughput_docs_per_s"] > 0
+    assert "int8" in format_report(report)
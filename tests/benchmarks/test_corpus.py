@@ -0,0 +1,32 @@
+import pytest
+
+from app.core.extractors import extractor_registry
+from benchmarks.corpus import SIZES, generate_corpus, generate_text
+from benchmarks.micro import run_micro
+from benchmarks.models import make_parser
+
+
+def test_generate_text_is_deterministic_and_sized():
+    paragraphs = generate_text(500, seed=3)
+
+    assert paragraphs == generate_text(500, seed=3)
+    assert sum(len(paragraph.split()) for paragraph in paragraphs) == 500
+
+
+@pytest.mark.parametrize("file_type", ["PDF", "DOCX", "PPTX", "TXT"])
+def test_generated_documents_extract_to_their_text(tmp_path, file_type):
+    path = generate_corpus(str(tmp_path), sizes=("small",), file_types=(file_type,))["small"][file_type]
+
+    words = "".join(extractor_registry.extract(path, file_type)).split()
+
+    assert len(words) >= SIZES["small"]  # Slides repeat their first words as a title
+
+
+def test_run_micro_with_fake_models(tmp_path):
+    corpus = generate_corpus(str(tmp_path), sizes=("small",), file_types=("TXT", "DOCX"))
+
+    results = run_micro(corpus, make_parser("fake"), iterations=2)
+
+    assert {"extract.docx.small", "streaming_chunker.small", "summarize_text", "parse.docx.small"} <= set(results)
+    assert results["parse.txt.small"]["iterations"] == 2
+    assert all(result["throughput_per_s"] > 0 for result in results.values())
@@ -0,0 +1,56 @@
+import asyncio
+
+from benchmarks.timing import compare, format_results, measure, measure_load, summarize
+
+
+def result(throughput, p95):
+    return {"iterations": 10, "throughput_per_s": throughput, "p50_ms": p95 / 2, "p95_ms": p95, "mean_ms": p95 / 2}
+
+
+def test_summarize():
+    stats = summarize([0.001 * i for i in range(1, 101)], elapsed=2.0)
+
+    assert stats["iterations"] == 100
+    assert stats["throughput_per_s"] == 50
+    assert round(stats["p50_ms"]) == 51
+    assert round(stats["p95_ms"]) == 96
+
+
+def test_measure_runs_setup_untimed():
+    calls = []
+
+    stats = measure(lambda: calls.append("run"), iterations=3, warmup=1, setup=lambda: calls.append("setup"))
+
+    assert stats["iterations"] == 3
+    assert calls == ["setup", "run"] * 4
+
+
+def test_measure_load_issues_every_request():
+    seen = []
+
+    async def request(number):
+        await asyncio.sleep(0)
+        seen.append(number)
+
+    stats = asyncio.run(measure_load(request, total=10, concurrency=3))
+
+    assert sorted(seen) == list(range(10))
+    assert stats["iterations"] == 10
+    assert stats["concurrency"] == 3
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"fast": result(100, 10), "slow": result(100, 10), "gone": result(1, 1)}
+    results = {"fast": result(95, 10.5), "slow": result(80, 12), "new": result(1, 1)}
+
+    regressions = compare(results, baseline, threshold=0.10)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("slow: throughput")
+    assert regressions[1].startswith("slow: p95")
+
+
+def test_format_results_shows_change_against_baseline():
+    table = format_results({"fast": result(110, 10)}, {"fast": result(100, 10)})
+
+    assert "+10.0%" in table
@@ -0,0 +1,125 @@
+import io
+import os
+
+import anyio
+import pytest
+from fastapi import UploadFile
+from unittest.mock import MagicMock, patch
+
+from app.core.blob_store import BlobStore
+
+CONTENT_HASH = "dffd6021bb2bd5b0af676290809ec3a53191dd81c7f70a4b28688a362182986f"  # sha256(b"Hello, World!")
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return BlobStore(root=str(tmp_path / "blobs"), blob_crud=MagicMock())
+
+
+def store(blob_store, content: bytes):
+    upload = UploadFile(file=io.BytesIO(content), filename="test.txt")
+    return anyio.run(lambda: blob_store.store(upload))
+
+
+def test_path_for_is_sharded(blob_store):
+    assert blob_store.path_for(CONTENT_HASH) == os.path.join(blob_store.root, "df", "fd", CONTENT_HASH)
+
+
+def test_store_new_content(blob_store):
+    stored_file = store(blob_store, b"Hello, World!")
+
+    assert stored_file.sha256 == CONTENT_HASH
+    assert stored_file.path == blob_store.path_for(CONTENT_HASH)
+    assert not stored_file.deduplicated
+    blob_store.blob_crud.acquire.assert_called_once_with(CONTENT_HASH, 13)
+    assert os.listdir(os.path.join(blob_store.root, "incoming")) == []
+
+
+def test_store_identical_content_is_deduplicated(blob_store):
+    store(blob_store, b"Hello, World!")
+    stored_file = store(blob_store, b"Hello, World!")
+
+    assert stored_file.deduplicated
+    assert blob_store.blob_crud.acquire.call_count == 2
+    assert os.listdir(os.path.join(blob_store.root, "incoming")) == []
+
+
+def test_release_removes_unreferenced_file(blob_store):
+    store(blob_store, b"Hello, World!")
+    blob_store.blob_crud.release.return_value = 1
+    assert blob_store.release(CONTENT_HASH) is False
+    assert os.path.exists(blob_store.path_for(CONTENT_HASH))
+
+    blob_store.blob_crud.release.return_value = 0
+    assert blob_store.release(CONTENT_HASH) is True
+    assert not os.path.exists(blob_store.path_for(CONTENT_HASH))
+
+
+def test_release_removes_file_before_the_row_is_unlocked(blob_store):
+    store(blob_store, b"Hello, World!")
+    blob_store.blob_crud.release.return_value = 0
+    exists_at_commit = []
+    blob_store.blob_crud.atomic.return_value.__exit__.side_effect = (
+        lambda *args: exists_at_commit.append(os.path.exists(blob_store.path_for(CONTENT_HASH)))
+    )
+
+    assert blob_store.release(CONTENT_HASH) is True
+
+    blob_store.blob_crud.release.assert_called_once_with(CONTENT_HASH)
+    assert exists_at_commit == [False]  # Another worker's upload sees either the file or no row
+
+
+def test_location_of_legacy_document(blob_store):
+    document = MagicMock(file_name="dummy.pdf", content_hash=None)
+
+    assert blob_store.location(document) == os.path.join("uploads", "dummy.pdf")
+
+
+def test_content_hash_uses_stored_hash(blob_store):
+    store(blob_store, b"Hello, World!")
+    document = MagicMock(file_name="test.txt", content_hash=CONTENT_HASH)
+
+    assert blob_store.location(document) == blob_store.path_for(CONTENT_HASH)
+    assert blob_store.content_hash(document) == CONTENT_HASH
+
+
+def test_adopt_many_takes_references_in_one_call(blob_store):
+    async def receive_all():
+        return [
+            await blob_store.receive(UploadFile(file=io.BytesIO(content), filename="test.txt"))
+            for content in (b"Hello, World!", b"Other", b"Hello, World!")
+        ]
+    incoming_files = anyio.run(receive_all)
+
+    stored_files = blob_store.adopt_many(incoming_files)
+
+    assert [stored_file.deduplicated for stored_file in stored_files] == [False, False, True]
+    assert stored_files[2].path == blob_store.path_for(CONTENT_HASH)
+    blob_store.blob_crud.acquire.assert_not_called()
+    acquired = blob_store.blob_crud.acquire_many.call_args.args[0]
+    assert acquired[CONTENT_HASH] == (13, 2)
+    assert os.listdir(os.path.join(blob_store.root, "incoming")) == []
+
+
+def test_adopt_many_gives_back_references_when_placing_fails(blob_store):
+    async def receive_all():
+        return [
+            await blob_store.receive(UploadFile(file=io.BytesIO(content), filename="test.txt"))
+            for content in (b"Hello, World!", b"Other")
+        ]
+    incoming_files = anyio.run(receive_all)
+    blob_store.blob_crud.release.return_value = 0
+    replace = os.replace
+
+    def fail_second(source, destination):
+        if not os.path.exists(blob_store.path_for(CONTENT_HASH)):
+            return replace(source, destination)
+        raise OSError("Simulated error")
+
+    with patch('app.core.blob_store.os.replace', side_effect=fail_second):
+        with pytest.raises(OSError):
+            blob_store.adopt_many(incoming_files)
+
+    released = [call.args[0] for call in blob_store.blob_crud.release.call_args_list]
+    assert released == [incoming.sha256 for incoming in incoming_files]
+    assert not os.path.exists(blob_store.path_for(CONTENT_HASH))  # Placed, then released with the rest
@@ -0,0 +1,360 @@
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from app.core.chunking import StreamingChunker, coalesce, group_segments
+from app.core.document_parser import DocumentParser
+from app.core.extractors import ExtractorRegistry
+from app.core.segment_cache import SegmentCache
+from app.core.summary_policy import SummaryBudget
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer standing in for the Hugging Face tokenizer."""
+
+    def encode(self, text, add_special_tokens=False):
+        return text.split()
+
+    def decode(self, tokens, skip_special_tokens=True):
+        return " ".join(tokens)
+
+
+class FakeEmbedder:
+    """Embeds a text as its word count, standing in for the sentence embedding model."""
+
+    def encode(self, texts):
+        return np.array([[len(text.split())] for text in texts], dtype=np.float32)
+
+
+class FakeFastTokenizer(FakeTokenizer):
+    """Whitespace tokenizer reporting offsets, where each token owns the whitespace before it."""
+
+    is_fast = True
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        import re
+        matches = list(re.finditer(r"\S+", text))
+        return {
+            "input_ids": [match.group() for match in matches],
+            "offset_mapping": [match.span() for match in matches],
+        }
+
+    def decode(self, tokens, skip_special_tokens=True):
+        raise AssertionError("Chunks must be sliced from the text, not decoded")
+
+
+@pytest.fixture
+def mock_summarizer():
+    summarizer = MagicMock()
+    summarizer.return_value = [{"summary_text": "summary"}]
+    return summarizer
+
+
+@pytest.fixture
+def parser(mock_summarizer):
+    return DocumentParser(tokenizer=FakeTokenizer(), summarizer=mock_summarizer, embedder=FakeEmbedder(),
+                          segment_cache=SegmentCache(persistent=False))
+
+
+def test_extract_text_pdf(parser):
+    assert parser.extract_text("uploads/dummy.pdf", "PDF") == "Dummy PDF file "
+
+
+def test_extract_text_docx(parser):
+    assert parser.extract_text("uploads/dummy.docx", "DOCX") == "Dummy DOCX file"
+
+
+def test_extract_text_unsupported(parser):
+    with pytest.raises(ValueError):
+        parser.extract_text("uploads/dummy.txt", "txt")
+
+
+def test_split_with_overlap(parser):
+    chunks = parser.split_with_overlap("a b c d e f", max_length=4, overlap=2)
+
+    assert chunks == ["a b c d", "c d e f", "e f"]
+
+
+def test_split_with_overlap_slices_text():
+    parser = DocumentParser(tokenizer=FakeFastTokenizer(), summarizer=MagicMock())
+
+    chunks = parser.split_with_overlap(" a  b\nc d e f ", max_length=4, overlap=2)
+
+    assert chunks == [" a  b\nc d", "\nc d e f ", " e f "]
+
+
+def test_split_with_overlap_reuses_tokens():
+    tokenizer = MagicMock(wraps=FakeFastTokenizer())
+    tokenizer.is_fast = True
+    parser = DocumentParser(tokenizer=tokenizer, summarizer=MagicMock())
+    text = "a b c"
+    tokens = parser.tokenize(text)
+
+    assert parser.split_with_overlap(text, max_length=2, overlap=0, tokens=tokens) == ["a b", " c"]
+    assert tokenizer.call_count == 1
+
+
+def test_summarize_short_text_is_empty(parser, mock_summarizer):
+    assert parser.summarize_text("too short", max_length=5) == ""
+    mock_summarizer.assert_not_called()
+
+
+def test_summarize_long_text(parser, mock_summarizer):
+    assert parser.summarize_text("one two three four five", max_length=5) == "summary"
+
+
+def test_summarize_medium_text_extractively(parser, mock_summarizer, monkeypatch):
+    monkeypatch.setattr("app.core.summary_policy.SUMMARY_EXTRACTIVE_MIN_TOKENS", 3)
+
+    assert parser.summarize_text("Cats purr. Cats sleep all day.", max_length=50) == "Cats purr. Cats sleep all day."
+    mock_summarizer.assert_not_called()
+
+
+def test_summarize_adapts_decoding_to_the_input(parser, mock_summarizer, monkeypatch):
+    monkeypatch.setattr("app.core.summary_policy.SUMMARY_GREEDY_MAX_TOKENS", 4)
+
+    parser.summarize_text("one two three", max_length=2)
+    parser.summarize_text("one two three four five six seven eight nine", max_length=2)
+
+    (_, short), (_, long) = [(call.args, call.kwargs) for call in mock_summarizer.call_args_list]
+    assert short["num_beams"] == 1 and long["num_beams"] == 3
+    assert short["max_length"] == long["max_length"] == 50  # Twice the minimum length, below the ratio
+    assert "max_time" not in short  # No time budget by default
+
+
+def test_summarize_within_time_budget(mock_summarizer, monkeypatch):
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MODEL_MAX_INPUT", 8)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_LENGTH", 4)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_OVERLAP", 0)
+    release = threading.Event()
+
+    def summarize(texts, **kwargs):
+        release.wait(5)
+        return [{"summary_text": "partial"} for _ in texts]
+
+    mock_summarizer.side_effect = summarize
+    parser = DocumentParser(tokenizer=FakeTokenizer(), summarizer=mock_summarizer)
+    budget = SummaryBudget(0.05)
+
+    summary = parser.summarize_text("Alpha beta gamma. Delta epsilon zeta. Eta theta iota.", max_length=5,
+                                    budget=budget)
+    release.set()
+
+    assert budget.exhausted
+    assert summary  # Extracted from the text, since no partial summary finished in time
+
+
+def test_parse_reports_progress(parser):
+    progress = []
+
+    result = parser.parse("uploads/dummy.docx", "DOCX", progress=progress.append)
+
+    assert result["embeddings"].tolist() == [[3.0]]
+    assert len(result.pop("segments")) == 1
+    assert result.pop("segment_lengths") == [15]
+    assert result.pop("char_spans") == [(0, 15)]
+    assert len(result.pop("segment_keys")) == 1
+    assert result.pop("token_ids") is None  # The fake tokenizer's ids are words
+    assert (result.pop("token_count"), result.pop("page_count")) == (3, None)  # DOCX has no pages
+    assert result.pop("summary_partial") is False
+    del result["embeddings"]
+    assert result == {"text": "Dummy DOCX file", "chunks": ["Dummy DOCX file"], "token_spans": [(0, 3)], "summary": ""}
+    assert progress[0] == 0.0
+    assert progress[-1] == 1.0
+
+
+def test_summarize_long_text_hierarchically(mock_summarizer, monkeypatch):
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MODEL_MAX_INPUT", 8)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_LENGTH", 4)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_OVERLAP", 0)
+    mock_summarizer.side_effect = lambda texts, **kwargs: [{"summary_text": "partial"} for _ in texts]
+    parser = DocumentParser(tokenizer=FakeTokenizer(), summarizer=mock_summarizer)
+
+    summary = parser.summarize_text("a b c d e f g h i j k l", max_length=5)
+
+    assert summary == "partial"
+    texts = [text for call in mock_summarizer.call_args_list for text in call.args[0]]
+    assert texts[:3] == ["a b c d", "e f g h", "i j k l"]  # Map level
+    assert texts[-1] == "partial partial partial"  # Reduce level
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "test_file.txt"
+    path.write_text("Test file content")
+    return str(path)
+
+
+def test_parse_txt(parser, text_file):
+    result = parser.parse(text_file, "TXT")
+
+    assert result["chunks"] == ["Test file content"]
+
+
+def test_parse_unsupported_file_type(parser, text_file):
+    with pytest.raises(ValueError):
+        parser.parse(text_file, "txt")
+
+
+def test_parse_maps_long_documents_while_extracting(mock_summarizer, monkeypatch):
+    monkeypatch.setattr("app.core.document_parser.SEGMENT_MIN_CHARS", 1)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_INPUT_MIN_LENGTH", 4)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MODEL_MAX_INPUT", 8)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_LENGTH", 4)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_OVERLAP", 0)
+    summarizer_called = threading.Event()
+
+    def summarize(texts, **kwargs):
+        summarizer_called.set()
+        return [{"summary_text": "partial"} for _ in texts]
+    mock_summarizer.side_effect = summarize
+    extractors = ExtractorRegistry()
+
+    @extractors.register("TEST")
+    def extract(file_location):
+        yield from ("a b c ", "d e f ", "g h i ")
+        # Nine tokens exceed the model input, so the first map chunks are summarized before extraction ends
+        assert summarizer_called.wait(timeout=5)
+        yield "j k l"
+    parser = DocumentParser(tokenizer=FakeFastTokenizer(), summarizer=mock_summarizer, extractors=extractors,
+                            embeddings_enabled=False, incremental=False)
+
+    result = parser.parse("any", "TEST")
+
+    assert result["summary"] == "partial"
+    assert result["embeddings"] is None
+    texts = [text for call in mock_summarizer.call_args_list for text in call.args[0]]
+    assert texts[:3] == ["a b c d", " e f g h", " i j k l"]
+    assert texts[-1] == "partial partial partial"
+
+
+@pytest.mark.parametrize("segments", [["a b c d e f g"], ["a b ", "c", " d e f", " g"], list("a b c d e f g")])
+def test_streaming_chunker_matches_split_with_overlap(segments):
+    parser = DocumentParser(tokenizer=FakeFastTokenizer(), summarizer=MagicMock())
+    text = "".join(segments)
+    chunker = StreamingChunker(max_length=3, overlap=1)
+
+    chunks = []
+    for segment in segments:
+        chunks.extend(chunker.feed(segment, parser.tokenize(segment)))
+    chunks.extend(chunker.finish())
+
+    assert chunks == parser.split_with_overlap(text, max_length=3, overlap=1)
+    assert chunker.token_count == 7
+    assert chunker.token_spans == [(0, 3), (2, 5), (4, 7), (6, 7)]
+    assert [text[start:end] for start, end in chunker.char_spans] == chunks
+
+
+def test_streaming_chunker_offsets_follow_repeated_text():
+    parser = DocumentParser(tokenizer=FakeFastTokenizer(), summarizer=MagicMock())
+    chunker = StreamingChunker(max_length=2, overlap=0)
+
+    for segment in ["Page one ", "Page one ", "Page one"]:  # Boilerplate repeated on every page
+        chunker.feed(segment, parser.tokenize(segment))
+    chunker.finish()
+
+    assert chunker.char_spans == [(0, 8), (8, 17), (17, 26)]
+
+
+def test_streaming_chunker_decodes_without_offsets(parser):
+    chunker = StreamingChunker(max_length=4, overlap=2, decode=" ".join)
+
+    chunks = chunker.feed("a b c", parser.tokenize("a b c")) + chunker.feed(" d e f", parser.tokenize(" d e f"))
+
+    assert chunks + chunker.finish() == ["a b c d", "c d e f", "e f"]
+    assert chunker.char_spans is None
+
+
+def test_coalesce():
+    assert list(coalesce(iter(["a", "bc", "d", "efgh", "i"]), 3)) == ["abc", "defgh", "i"]
+
+
+def test_iter_parse_yields_chunks_before_returning_result(parser, text_file):
+    parsing = parser.iter_parse(text_file, "TXT")
+
+    assert next(parsing) == (0, "Test file content", (0, 3))
+    with pytest.raises(StopIteration) as done:
+        next(parsing)
+    assert done.value.value["chunks"] == ["Test file content"]
+
+
+def test_group_segments_boundaries_survive_edits():
+    segments = [f"paragraph {number} " * 3 for number in range(40)]
+    edited = list(segments)
+    edited[20] = "an edited paragraph that is quite a bit longer than the others "
+
+    groups = list(group_segments(iter(segments), min_chars=100, max_chars=10_000))
+    edited_groups = list(group_segments(iter(edited), min_chars=100, max_chars=10_000))
+
+    assert "".join(groups) == "".join(segments)
+    assert all(len(group) >= 100 for group in groups[:-1])
+    assert len(groups) > 4
+    assert len(set(groups) - set(edited_groups)) <= 2  # The edited group, and the next one if they merged
+    assert (groups[0], groups[-1]) == (edited_groups[0], edited_groups[-1])
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_parse_returns_sidecar_index(mock_summarizer, incremental):
+    class WordLengthTokenizer(FakeTokenizer):
+        def encode(self, text, add_special_tokens=False):
+            return [len(word) for word in text.split()]
+
+        def decode(self, tokens, skip_special_tokens=True):
+            return " ".join("x" * token for token in tokens)
+
+    slides = ["a bb ", "ccc dddd ", "e"]
+    extractors = ExtractorRegistry()
+    extractors.register("TEST", lambda file_location: iter(slides))
+    parser = DocumentParser(tokenizer=WordLengthTokenizer(), summarizer=mock_summarizer, extractors=extractors,
+                            embedder=FakeEmbedder(), incremental=incremental,
+                            segment_cache=SegmentCache(persistent=False))
+
+    result = parser.parse("any", "TEST")
+
+    assert result["segment_lengths"] == [5, 9, 1]
+    assert result["token_count"] == 5
+    assert result["token_ids"].dtype == np.uint32
+    assert result["token_ids"].tolist() == [1, 2, 3, 4, 1]
+
+
+def test_incremental_parse_only_reprocesses_changed_groups(mock_summarizer, monkeypatch):
+    monkeypatch.setattr("app.core.document_parser.SEGMENT_GROUP_MIN_CHARS", 1)
+    monkeypatch.setattr("app.core.document_parser.SEGMENT_GROUP_MAX_CHARS", 1)  # One group per segment
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_INPUT_MIN_LENGTH", 4)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MODEL_MAX_INPUT", 8)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_LENGTH", 4)
+    monkeypatch.setattr("app.core.document_parser.SUMMARY_MAP_CHUNK_OVERLAP", 0)
+    mock_summarizer.side_effect = lambda texts, **kwargs: [{"summary_text": text.split()[0]} for text in texts]
+    slides = ["a b c ", "d e f ", "g h i ", "j k l"]
+    extractors = ExtractorRegistry()
+    extractors.register("TEST", lambda file_location: iter(slides))
+    tokenizer = FakeFastTokenizer()
+    embedder = MagicMock(side_effect=FakeEmbedder().encode)
+    embedder.encode = embedder
+    segment_cache = SegmentCache(persistent=False)
+    parser = DocumentParser(tokenizer=tokenizer, summarizer=mock_summarizer, extractors=extractors,
+                            embedder=embedder, segment_cache=segment_cache)
+
+    first = parser.parse("any", "TEST")
+    slides[2] = "g h x "
+    mock_summarizer.reset_mock()
+    embedder.reset_mock()
+    # The caller loads the segments of the previous version; the parser never reads the database
+    second = parser.parse("any", "TEST", segments=first["segments"])
+
+    assert len(first["segments"]) == 4
+    assert segment_cache.get(first["segment_keys"][0]) is None  # Stored by the caller, not the parser
+    assert second["segment_keys"][:2] == first["segment_keys"][:2] != second["segment_keys"][2:]
+    assert list(second["segments"].values())[0]["text"] == "g h x "
+    assert len(second["segments"]) == 1
+    assert second["chunks"] == ["a b c ", "d e f ", "g h x ", "j k l"]
+    assert second["token_spans"] == [(0, 3), (3, 6), (6, 9), (9, 12)]
+    assert second["char_spans"] == [(0, 6), (6, 12), (12, 18), (18, 23)]  # Reused groups keep their offsets
+    assert second["embeddings"].tolist() == [[3.0]] * 4
+    assert embedder.call_args.args[0] == ["g h x "]  # Only the edited group is embedded again
+    texts = [text for call in mock_summarizer.call_args_list for text in call.args[0]]
+    assert texts == ["g h x ", "a d g j"]  # One map summary, then the reduce
+    assert second["summary"] == "a"
+    assert second["segment_lengths"] == [6, 6, 6, 5]
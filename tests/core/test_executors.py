@@ -0,0 +1,65 @@
+import contextvars
+import threading
+import time
+
+import anyio
+import pytest
+
+from app.core.executors import Executors
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture
+def executors():
+    executors = Executors(cpu_workers=1, db_workers=2)
+    yield executors
+    executors.shutdown()
+
+
+def test_work_runs_on_separate_pools(executors):
+    async def main():
+        cpu_thread = await executors.cpu(lambda: threading.current_thread().name)
+        db_thread = await executors.db(lambda: threading.current_thread().name)
+        return cpu_thread, db_thread
+
+    cpu_thread, db_thread = anyio.run(main)
+
+    assert cpu_thread.startswith("cpu")
+    assert db_thread.startswith("db")
+
+
+def test_busy_cpu_pool_does_not_delay_db_work(executors):
+    release = threading.Event()
+
+    async def main():
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(executors.cpu, release.wait, 5)
+            await anyio.sleep(0.01)
+            started = time.perf_counter()
+            await executors.db(lambda: None)
+            waited = time.perf_counter() - started
+            release.set()
+        return waited
+
+    assert anyio.run(main) < 1
+
+
+def test_arguments_results_and_errors_pass_through(executors):
+    def divide(a, b=1):
+        return a / b
+
+    async def main():
+        assert await executors.db(divide, 6, b=3) == 2
+        with pytest.raises(ZeroDivisionError):
+            await executors.cpu(divide, 1, b=0)
+
+    anyio.run(main)
+
+
+def test_context_is_carried_into_the_pool(executors):
+    async def main():
+        request_id.set("abc")
+        return await executors.cpu(request_id.get)
+
+    assert anyio.run(main) == "abc"
@@ -0,0 +1,68 @@
+import pytest
+from openpyxl import Workbook
+from pptx import Presentation
+from pptx.util import Inches
+
+from app.core.extractors import ExtractorRegistry, UnsupportedFileTypeError, extract_txt, extractor_registry
+
+
+def test_extract_pdf_yields_pages():
+    assert list(extractor_registry.extract("uploads/dummy.pdf", "PDF")) == ["Dummy PDF file "]
+
+
+def test_extract_docx_segments_join_to_text():
+    assert "".join(extractor_registry.extract("uploads/dummy.docx", "DOCX")) == "Dummy DOCX file"
+
+
+def test_extract_pptx_yields_shapes(tmp_path):
+    presentation = Presentation()
+    for title in ("First slide", "Second slide"):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+        slide.shapes.add_textbox(Inches(1), Inches(1), Inches(4), Inches(1)).text = title
+    file_location = str(tmp_path / "slides.pptx")
+    presentation.save(file_location)
+
+    assert list(extractor_registry.extract(file_location, "PPTX")) == ["First slide", "\nSecond slide"]
+
+
+def test_extract_xlsx_yields_rows(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Totals"
+    sheet.append(["name", "amount"])
+    sheet.append([])
+    sheet.append(["rent", 1200])
+    file_location = str(tmp_path / "totals.xlsx")
+    workbook.save(file_location)
+
+    assert "".join(extractor_registry.extract(file_location, "XLSX")) == "Totals\nname\tamount\nrent\t1200"
+
+
+@pytest.mark.parametrize("segment_chars", [1, 3, 8, 1000])
+def test_extract_txt_never_splits_words(tmp_path, segment_chars):
+    text = "alpha beta\ngamma  delta epsilonzeta "
+    file_location = tmp_path / "notes.txt"
+    file_location.write_text(text, encoding="utf-8")
+
+    segments = list(extract_txt(str(file_location), segment_chars=segment_chars))
+
+    assert "".join(segments) == text
+    if segment_chars > len("epsilonzeta"):
+        assert all(segment[-1].isspace() for segment in segments)
+
+
+def test_unsupported_file_type():
+    with pytest.raises(UnsupportedFileTypeError):
+        extractor_registry.extract("test_file.txt", "txt")
+
+
+def test_register_extractor():
+    registry = ExtractorRegistry()
+
+    @registry.register("CSV")
+    def extract_csv(file_location):
+        yield "a,b"
+
+    assert "CSV" in registry
+    assert registry.file_types == ("CSV",)
+    assert list(registry.extract("any.csv", "CSV")) == ["a,b"]
@@ -0,0 +1,49 @@
+import hashlib
+import io
+import os
+
+import anyio
+import pytest
+from fastapi import UploadFile
+
+from app.core.file_storage import UploadTooLargeError, stream_upload
+
+
+def make_upload(content: bytes, size=None):
+    return UploadFile(file=io.BytesIO(content), filename="test.pdf", size=size)
+
+
+def test_stream_upload_hashes_and_measures(tmp_path):
+    content = b"x" * 10_000
+    destination = str(tmp_path / "test.pdf")
+
+    stored_file = anyio.run(lambda: stream_upload(make_upload(content), destination, chunk_size=1024))
+
+    assert stored_file.path == destination
+    assert stored_file.size == len(content)
+    assert stored_file.sha256 == hashlib.sha256(content).hexdigest()
+    with open(destination, "rb") as f:
+        assert f.read() == content
+
+
+def test_stream_upload_rejects_declared_size(tmp_path):
+    destination = str(tmp_path / "test.pdf")
+
+    with pytest.raises(UploadTooLargeError):
+        anyio.run(lambda: stream_upload(make_upload(b"x" * 100, size=100), destination, max_bytes=10))
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_stream_upload_rejects_while_streaming(tmp_path):
+    destination = str(tmp_path / "test.pdf")
+    with open(destination, "wb") as f:
+        f.write(b"original")
+
+    with pytest.raises(UploadTooLargeError):
+        anyio.run(lambda: stream_upload(make_upload(b"x" * 100), destination, max_bytes=50, chunk_size=16))
+
+    # The partial file is removed and the existing file is left untouched
+    assert os.listdir(tmp_path) == ["test.pdf"]
+    with open(destination, "rb") as f:
+        assert f.read() == b"original"
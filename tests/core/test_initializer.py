@@ -28,3 +28,16 @@ def test_initialize_spy(app_initializer, mock_database):
     app_initializer.initialize()
     assert app_initializer.app.state.db == mock_database
 
+
+def test_initialize_adds_new_columns(app_initializer, mock_database):
+    app_initializer.initialize()
+    executed = [call.args[0] for call in mock_database.execute_sql.call_args_list]
+    assert "ALTER TABLE IF EXISTS documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)" in executed
+    assert "ALTER TABLE IF EXISTS documents ADD COLUMN IF NOT EXISTS token_count INTEGER" in executed
+    mock_database.create_tables.assert_called_once()
+
+
+def test_initialize_creates_search_index(app_initializer, mock_database):
+    app_initializer.initialize()
+    executed = [call.args[0] for call in mock_database.execute_sql.call_args_list]
+    assert "CREATE INDEX IF NOT EXISTS document_search_vector ON documents USING GIN (search_vector)" in executed
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from app.core.metrics import Histogram, MetricsRegistry, StageTimer, STAGE_LATENCY, span
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_histogram_renders_cumulative_buckets(registry):
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), label_names=("stage",))
+
+    histogram.observe(0.05, stage="parse")
+    histogram.observe(0.5, stage="parse")
+    histogram.observe(5, stage="parse")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="parse"} 5.55' in lines
+    assert 'latency_seconds_count{stage="parse"} 3' in lines
+
+
+def test_histogram_keeps_a_series_per_label_value(registry):
+    histogram = registry.histogram("batch_size", "Batch size.", buckets=(1, 8), label_names=("model",))
+
+    histogram.observe(4, model="summarizer")
+    histogram.observe(1, model="embedder")
+    histogram.observe(8, model="embedder")
+
+    assert histogram.snapshot(model="summarizer") == {"count": 1, "sum": 4.0}
+    assert histogram.snapshot(model="embedder") == {"count": 2, "sum": 9.0}
+    assert histogram.snapshot(model="missing") == {"count": 0, "sum": 0.0}
+
+
+def test_label_values_are_escaped():
+    histogram = Histogram("h", "H.", buckets=(1,), label_names=("route",))
+
+    histogram.observe(1, route='say "hi"\\')
+
+    assert 'h_count{route="say \\"hi\\"\\\\"} 1' in histogram.render()
+
+
+def test_registry_returns_existing_metric(registry):
+    first = registry.histogram("h", "H.")
+
+    assert registry.histogram("h", "H.") is first
+
+
+def test_observations_drained_in_one_registry_merge_into_another(registry):
+    worker = MetricsRegistry()  # As in a worker process
+    worker.histogram("h", "H.", buckets=(1, 10), label_names=("stage",)).observe(5, stage="parse")
+    histogram = registry.histogram("h", "H.", buckets=(1, 10), label_names=("stage",))
+    histogram.observe(0.5, stage="parse")
+
+    registry.merge(worker.drain())
+    registry.merge({"unknown": {("x",): [[1, 0, 0], 1.0, 1]}})  # Not registered here, ignored
+
+    assert histogram.snapshot(stage="parse") == {"count": 2, "sum": 5.5}
+    assert 'h_bucket{stage="parse",le="10"} 2' in histogram.render()
+    assert worker.drain() == {}  # Each observation is handed over once
+
+
+def test_span_observes_stage_latency():
+    before = STAGE_LATENCY.snapshot(stage="test.span")["count"]
+
+    with span("test.span"):
+        pass
+
+    assert STAGE_LATENCY.snapshot(stage="test.span")["count"] == before + 1
+
+
+def test_stage_timer_accumulates_interleaved_stages():
+    timer = StageTimer(prefix="test.")
+
+    def slow_items():
+        for item in range(3):
+            time.sleep(0.01)
+            yield item
+
+    items = []
+    for item in timer.iterate("produce", slow_items()):
+        with timer("consume"):
+            items.append(item)
+    before = STAGE_LATENCY.snapshot(stage="test.produce")["count"]
+    timer.record()
+
+    assert items == [0, 1, 2]
+    assert timer.totals["produce"] >= 0.03
+    assert timer.totals["consume"] < timer.totals["produce"]
+    assert STAGE_LATENCY.snapshot(stage="test.produce")["count"] == before + 1
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.core.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry():
+    return ModelRegistry(idle_ttl=10, warm_up=False)
+
+
+def test_get_loads_once(registry):
+    loader = MagicMock(return_value="model")
+    registry.register("model", loader)
+
+    assert not registry.is_loaded("model")
+    assert registry.get("model") == "model"
+    assert registry.get("model") == "model"
+    loader.assert_called_once()
+
+
+def test_get_unregistered_model(registry):
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_concurrent_get_loads_once(registry):
+    started = threading.Event()
+
+    def slow_loader():
+        started.wait(1)
+        return object()
+
+    loader = MagicMock(side_effect=slow_loader)
+    registry.register("model", loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("model"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+
+    loader.assert_called_once()
+    assert len({id(result) for result in results}) == 1
+
+
+def test_unload_idle(registry):
+    loader = MagicMock(side_effect=["first", "second"])
+    registry.register("model", loader)
+    registry.get("model")
+    last_used = registry._last_used["model"]
+
+    assert registry.unload_idle(now=last_used + 5) == []
+    assert registry.unload_idle(now=last_used + 11) == ["model"]
+    assert not registry.is_loaded("model")
+    assert registry.get("model") == "second"
+
+
+def test_unload_idle_disabled():
+    registry = ModelRegistry(idle_ttl=0, warm_up=False)
+    registry.register("model", MagicMock(return_value="model"))
+    registry.get("model")
+
+    assert registry.unload_idle(now=float("inf")) == []
+
+
+def test_start_warms_up_models():
+    registry = ModelRegistry(idle_ttl=0, warm_up=True)
+    loader = MagicMock(return_value="model")
+    registry.register("model", loader)
+
+    registry.start()
+
+    loader.assert_called_once()
+    assert registry.is_loaded("model")
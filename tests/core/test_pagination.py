@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(datetime(2022, 1, 1, 12, 30, 15, 123456), 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (datetime(2022, 1, 1, 12, 30, 15, 123456), 42)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "", encode_cursor(datetime(2022, 1, 1), 1)[:-3]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_cursor_remembers_its_sort_order():
+    cursor = encode_cursor(1200, 42, sort="-token_count")
+
+    assert decode_cursor(cursor, sort="-token_count") == (1200, 42)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)  # The default order, by upload timestamp
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(datetime(2022, 1, 1), 1), sort="token_count")
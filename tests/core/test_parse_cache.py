@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.core.parse_cache import LRUCache, ParseCache
+
+
+@pytest.fixture
+def memory_cache():
+    return ParseCache(max_entries=2, max_bytes=1024, persistent=False)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, max_bytes=100)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # "b" is now the least recently used entry
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_lru_evicts_by_size():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+    assert cache.total_bytes == 6
+
+
+def test_lru_skips_oversized_values():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "x" * 5)
+    cache.set("b", "y" * 11)
+
+    assert cache.get("a") == "x" * 5
+    assert cache.get("b") is None
+
+
+def test_make_key_depends_on_params():
+    key = ParseCache.make_key("abc", chunk_max_length=128)
+
+    assert key == ParseCache.make_key("abc", chunk_max_length=128)
+    assert key != ParseCache.make_key("abc", chunk_max_length=256)
+    assert key != ParseCache.make_key("abd", chunk_max_length=128)
+
+
+def test_hash_file(tmp_path):
+    file_location = tmp_path / "file.txt"
+    file_location.write_bytes(b"Hello, World!")
+
+    assert ParseCache.hash_file(str(file_location), block_size=4) == (
+        "dffd6021bb2bd5b0af676290809ec3a53191dd81c7f70a4b28688a362182986f"
+    )
+
+
+def test_memory_hit_and_miss_counters(memory_cache):
+    assert memory_cache.get("key") is None
+    memory_cache.set("key", "abc", {"summary": "", "chunks": ["chunk"]})
+
+    assert memory_cache.get("key") == {"summary": "", "chunks": ["chunk"]}
+    stats = memory_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["entries"] == 1
+
+
+def test_persistent_hit_populates_memory():
+    cache = ParseCache(max_entries=2, max_bytes=1024)
+    row = MagicMock(summary="summary", chunks=json.dumps(["chunk"]))
+    with patch('app.core.parse_cache.ParseResult') as mock_parse_result:
+        mock_parse_result.get_or_none.return_value = row
+
+        assert cache.get("key") == {"summary": "summary", "chunks": ["chunk"]}
+        assert cache.get("key") == {"summary": "summary", "chunks": ["chunk"]}
+
+        mock_parse_result.get_or_none.assert_called_once()
+        assert cache.stats()["persistent_hits"] == 1
+        assert cache.stats()["memory_hits"] == 1
+
+
+def test_persistent_failure_is_a_miss():
+    cache = ParseCache(max_entries=2, max_bytes=1024)
+    with patch('app.core.parse_cache.ParseResult') as mock_parse_result:
+        mock_parse_result.get_or_none.side_effect = Exception("Simulated error")
+
+        assert cache.get("key") is None
+        assert cache.stats()["misses"] == 1
+
+
+def test_set_writes_persistent_tier():
+    cache = ParseCache(max_entries=2, max_bytes=1024)
+    with patch('app.core.parse_cache.ParseResult') as mock_parse_result:
+        cache.set("key", "abc", {"summary": "summary", "chunks": ["chunk"]})
+
+        mock_parse_result.insert.assert_called_once_with(
+            cache_key="key", content_hash="abc", summary="summary", chunks=json.dumps(["chunk"])
+        )
+
+
+def test_delete_content_forgets_both_tiers():
+    cache = ParseCache(max_entries=2, max_bytes=1024)
+    cache.memory.set("key", {"summary": "summary", "chunks": ["chunk"]})
+    with patch('app.core.parse_cache.ParseResult') as mock_parse_result:
+        mock_parse_result.select.return_value.where.return_value.tuples.return_value = [("key",)]
+        cache.delete_content("abc")
+
+        mock_parse_result.delete.return_value.where.return_value.execute.assert_called_once()
+    assert cache.memory.get("key") is None
@@ -0,0 +1,196 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.core.parse_jobs import ParseJobQueue, ParseQueueFullError
+from app.models.parse_job_models import ParseJob
+
+
+@pytest.fixture
+def mock_parse_cache():
+    parse_cache = MagicMock()
+    parse_cache.hash_file.return_value = "abc"
+    parse_cache.make_key.return_value = "key"
+    parse_cache.get.return_value = None
+    return parse_cache
+
+
+@pytest.fixture
+def parse_job_queue(mock_parse_cache):
+    queue = ParseJobQueue(
+        parse_cache=mock_parse_cache,
+        job_crud=MagicMock(),
+        document_crud=MagicMock(),
+        chunk_crud=MagicMock(),
+        segment_cache=MagicMock(),
+        sidecar_store=MagicMock(),
+        dependency=MagicMock(),
+        max_workers=1,
+        max_queue_depth=1,
+    )
+    queue._executor = MagicMock()  # Pretend the pool is running
+    return queue
+
+
+@pytest.fixture
+def document():
+    return MagicMock(id=1, file_name="dummy.pdf", file_type="PDF")
+
+
+def test_submit_dispatches_job(parse_job_queue, document):
+    parse_job_queue.job_crud.create_job.return_value = MagicMock(id=7)
+
+    job = parse_job_queue.submit(document)
+
+    assert job.id == 7
+    parse_job_queue._executor.submit.assert_called_once()
+    assert parse_job_queue.in_flight() == 1
+
+
+def test_submit_rejects_when_queue_is_full(parse_job_queue, document):
+    parse_job_queue.job_crud.create_job.return_value = MagicMock(id=7)
+    parse_job_queue.submit(document)
+
+    with pytest.raises(ParseQueueFullError):
+        parse_job_queue.submit(document)
+
+
+def test_submit_completes_cached_result_immediately(parse_job_queue, mock_parse_cache, document):
+    mock_parse_cache.get.return_value = {"summary": "", "chunks": ["chunk"]}
+
+    parse_job_queue.submit(document)
+
+    parse_job_queue._executor.submit.assert_not_called()
+    assert parse_job_queue.chunk_crud.copy_chunks.call_args.args[0] == 1  # Chunks of a sibling document
+    assert parse_job_queue.document_crud.copy_parsed_text.call_args.args[0] == 1  # And its text
+    parse_job_queue.job_crud.create_job.assert_called_once_with(
+        1, status=ParseJob.DONE, progress=1.0, result=json.dumps({"summary": "", "chunks": ["chunk"]})
+    )
+
+
+def test_on_done_persists_result(parse_job_queue, mock_parse_cache):
+    future = MagicMock()
+    future.result.return_value = result = {
+        "text": "text", "chunks": ["chunk"], "token_spans": [(0, 1)], "summary": "", "segments": {"k": {}},
+        "token_count": 1, "page_count": None,
+    }
+
+    parse_job_queue._on_done(7, 1, "abc", future)
+
+    parse_job_queue.dependency.connection.assert_called_once()  # One checkout for all the writes
+    parse_job_queue.document_crud.update_parsed_text.assert_called_once_with(1, "text", "abc")
+    parse_job_queue.document_crud.update_stats.assert_called_once_with(
+        1, "abc", {"page_count": None, "char_count": 4, "token_count": 1, "chunk_count": 1}
+    )
+    parse_job_queue.chunk_crud.replace_chunks.assert_called_once_with(1, ["chunk"], [(0, 1)], None)
+    parse_job_queue.segment_cache.set_many.assert_called_once_with({"k": {}})
+    parse_job_queue.sidecar_store.write.assert_called_once_with("abc", "key", result)
+    mock_parse_cache.set.assert_called_once_with("key", "abc", {"chunks": ["chunk"], "summary": ""})
+    parse_job_queue.job_crud.update_job.assert_called_once_with(
+        7, status=ParseJob.DONE, progress=1.0, result=json.dumps({"chunks": ["chunk"], "summary": ""})
+    )
+
+
+def test_on_done_records_metrics_observed_in_the_worker(parse_job_queue):
+    from app.core.metrics import STAGE_LATENCY
+    before = STAGE_LATENCY.snapshot(stage="test.worker")
+    future = MagicMock()
+    future.result.return_value = result = {
+        "text": "text", "chunks": ["chunk"], "token_spans": [(0, 1)], "summary": "", "token_count": 1,
+        "page_count": None, "metrics": {"stage_duration_seconds": {("test.worker",): [[0] * 15 + [1], 90.0, 1]}},
+    }
+
+    parse_job_queue._on_done(7, 1, "abc", future)
+
+    assert STAGE_LATENCY.snapshot(stage="test.worker") == {"count": before["count"] + 1, "sum": before["sum"] + 90.0}
+    assert "metrics" not in result  # Not part of what is stored
+
+
+def test_worker_returns_the_metrics_it_observed():
+    from app.core import parse_worker
+    from app.core.metrics import STAGE_LATENCY, span
+
+    def parse(*args, **kwargs):
+        with span("test.worker_parse"):
+            return {"chunks": []}
+
+    parse_worker._init_worker(MagicMock())
+    with patch.object(parse_worker, "_worker_parser", MagicMock(parse=MagicMock(side_effect=parse))):
+        result = parse_worker._run_parse_job(7, "any", "TXT")
+
+    assert result["metrics"]["stage_duration_seconds"][("test.worker_parse",)][2] == 1
+    assert STAGE_LATENCY.snapshot(stage="test.worker_parse")["count"] == 0  # Handed over, not kept
+
+
+def test_on_done_does_not_cache_partial_summaries(parse_job_queue, mock_parse_cache):
+    future = MagicMock()
+    future.result.return_value = {
+        "text": "text", "chunks": ["chunk"], "token_spans": [(0, 1)], "summary": "cut short",
+        "summary_partial": True, "token_count": 1, "page_count": None,
+    }
+
+    parse_job_queue._on_done(7, 1, "abc", future)
+
+    mock_parse_cache.set.assert_not_called()
+    parse_job_queue.job_crud.update_job.assert_called_once_with(
+        7, status=ParseJob.DONE, progress=1.0, result=json.dumps({"chunks": ["chunk"], "summary": "cut short"})
+    )
+
+
+def test_on_done_records_failure(parse_job_queue, caplog):
+    future = MagicMock()
+    future.result.side_effect = Exception("Simulated error")
+
+    parse_job_queue._on_done(7, 1, "abc", future)
+
+    parse_job_queue.document_crud.update_parsed_text.assert_not_called()
+    parse_job_queue.job_crud.update_job.assert_called_once_with(7, status=ParseJob.FAILED, error="Simulated error")
+    assert caplog.records[-1].getMessage() == "Parse job 7 failed"
+    assert caplog.records[-1].exc_info is not None  # With the traceback
+
+
+def test_on_done_logs_storage_errors(parse_job_queue, caplog):
+    future = MagicMock()
+    future.result.return_value = {"text": "text", "chunks": ["chunk"], "token_spans": [(0, 1)], "summary": ""}
+    parse_job_queue.document_crud.update_parsed_text.side_effect = Exception("Simulated error")
+
+    parse_job_queue._on_done(7, 1, "abc", future)
+
+    assert caplog.records[-1].getMessage() == "Failed to store result of parse job 7"
+    assert caplog.records[-1].exc_info is not None
+
+
+def test_recover_resubmits_unfinished_jobs(parse_job_queue, document):
+    parse_job_queue.job_crud.get_unfinished_jobs.return_value = [MagicMock(id=7, document_id=1)]
+    parse_job_queue.document_crud.get_document.return_value = document
+
+    parse_job_queue.recover()
+
+    parse_job_queue.job_crud.update_job.assert_called_once_with(7, status=ParseJob.QUEUED, progress=0.0)
+    parse_job_queue._executor.submit.assert_called_once()
+    parse_job_queue.dependency.connection.assert_called_once()
+
+
+def test_starting_the_pool_does_not_recover_jobs(parse_job_queue, document):
+    parse_job_queue._executor = None
+    parse_job_queue.job_crud.create_job.return_value = MagicMock(id=7)
+
+    with patch("app.core.parse_jobs.ProcessPoolExecutor") as executor, patch("threading.Thread"):
+        parse_job_queue.submit(document)  # Starts the pool on first use
+        parse_job_queue.start()
+
+    executor.assert_called_once()
+    executor.return_value.submit.assert_called_once()  # Only the new job, not again as an unfinished one
+    parse_job_queue.job_crud.get_unfinished_jobs.assert_not_called()
+
+
+def test_worker_entry_points_do_not_import_the_app():
+    # What a spawned worker imports: building the app there would open a database pool and rerun migrations
+    check = ("import sys, app.core.parse_worker; "
+             "assert not {'app.main', 'app.core.initializer', 'app.core.parse_jobs'} & set(sys.modules)")
+
+    subprocess.run([sys.executable, "-c", check], check=True, env={**os.environ, "HF_HUB_OFFLINE": "1"})
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+from unittest.mock import patch
+
+from app.core.parse_cache import LRUCache
+from app.core import pdf_extraction
+from app.core.pdf_extraction import PdfTextExtractor, _extract_page_range, _init_worker, _page_ranges, page_fingerprint
+
+
+@pytest.fixture
+def multi_page_pdf(tmp_path):
+    # Three pages: the dummy page, a blank page and the dummy page again
+    writer = PdfWriter()
+    writer.append("uploads/dummy.pdf")
+    writer.add_blank_page(width=200, height=200)
+    writer.append("uploads/dummy.pdf")
+    file_location = str(tmp_path / "multi.pdf")
+    with open(file_location, "wb") as f:
+        writer.write(f)
+    return file_location
+
+
+def form_xobject_pdf(file_location, text):
+    # The page only draws a form XObject (``q /Fm0 Do Q``), which holds the text and its font
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=200, height=200)
+    font = DictionaryObject({NameObject("/Type"): NameObject("/Font"), NameObject("/Subtype"): NameObject("/Type1"),
+                             NameObject("/BaseFont"): NameObject("/Helvetica")})
+    form = DecodedStreamObject()
+    form.set_data(f"BT /F1 12 Tf 10 100 Td ({text}) Tj ET".encode("latin-1"))
+    form.update({
+        NameObject("/Type"): NameObject("/XObject"), NameObject("/Subtype"): NameObject("/Form"),
+        NameObject("/BBox"): ArrayObject([NumberObject(0), NumberObject(0), NumberObject(200), NumberObject(200)]),
+        NameObject("/Resources"): DictionaryObject({NameObject("/Font"): DictionaryObject(
+            {NameObject("/F1"): writer._add_object(font)}
+        )}),
+    })
+    page[NameObject("/Resources")] = DictionaryObject({NameObject("/XObject"): DictionaryObject(
+        {NameObject("/Fm0"): writer._add_object(form)}
+    )})
+    contents = DecodedStreamObject()
+    contents.set_data(b"q /Fm0 Do Q")
+    page[NameObject("/Contents")] = writer._add_object(contents)
+    with open(file_location, "wb") as f:
+        writer.write(f)
+    return file_location
+
+
+def make_extractor(**kwargs):
+    return PdfTextExtractor(page_cache=LRUCache(max_entries=100, max_bytes=10_000), **kwargs)
+
+
+def test_extract_text_in_process():
+    extractor = make_extractor(max_workers=1)
+
+    assert extractor.extract_text("uploads/dummy.pdf") == "Dummy PDF file "
+
+
+def test_extract_pages_in_parallel_keeps_page_order(multi_page_pdf):
+    extractor = make_extractor(max_workers=2, pages_per_task=1, parallel_min_pages=1,
+                               executor=ThreadPoolExecutor(max_workers=2))
+
+    assert extractor.extract_pages(multi_page_pdf) == ["Dummy PDF file ", "", "Dummy PDF file "]
+
+
+def test_identical_pages_share_a_fingerprint(multi_page_pdf):
+    pages = PdfReader(multi_page_pdf).pages
+
+    assert page_fingerprint(pages[0]) == page_fingerprint(pages[2])
+    assert page_fingerprint(pages[0]) != page_fingerprint(pages[1])
+
+
+def test_pages_drawn_through_form_xobjects_do_not_share_cached_text(tmp_path):
+    first = form_xobject_pdf(str(tmp_path / "a.pdf"), "Alpha document secret")
+    second = form_xobject_pdf(str(tmp_path / "b.pdf"), "Bravo totally different")
+    extractor = make_extractor(max_workers=1)
+
+    assert extractor.extract_text(first).strip() == "Alpha document secret"
+    assert extractor.extract_text(second).strip() == "Bravo totally different"
+    assert page_fingerprint(PdfReader(first).pages[0]) != page_fingerprint(PdfReader(second).pages[0])
+    assert page_fingerprint(PdfReader(first).pages[0]) == page_fingerprint(
+        PdfReader(form_xobject_pdf(str(tmp_path / "copy.pdf"), "Alpha document secret")).pages[0]
+    )
+
+
+def test_cached_pages_are_not_extracted_again(multi_page_pdf):
+    extractor = make_extractor(max_workers=1)
+    extractor.extract_pages(multi_page_pdf)
+
+    with patch('pypdf._page.PageObject.extract_text') as mock_extract_text:
+        assert extractor.extract_pages(multi_page_pdf) == ["Dummy PDF file ", "", "Dummy PDF file "]
+        mock_extract_text.assert_not_called()
+
+
+def test_page_ranges():
+    assert _page_ranges([0, 1, 2, 5, 6], 2) == [[0, 1], [2, 5], [6]]
+
+
+def test_shutdown_releases_executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    extractor = make_extractor(executor=executor)
+
+    extractor.shutdown()
+
+    assert extractor._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+def test_worker_keeps_its_document_open_between_ranges(multi_page_pdf):
+    _init_worker()
+
+    with patch('pypdf.PdfReader', wraps=PdfReader) as reader:
+        assert _extract_page_range(multi_page_pdf, [0, 1]) == ["Dummy PDF file ", ""]
+        assert _extract_page_range(multi_page_pdf, [2]) == ["Dummy PDF file "]
+        assert _extract_page_range("uploads/dummy.pdf", [0]) == ["Dummy PDF file "]
+
+    assert reader.call_count == 2  # Once per document
+    assert pdf_extraction._worker_document[0][0] == "uploads/dummy.pdf"
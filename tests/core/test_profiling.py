@@ -0,0 +1,108 @@
+import os
+import pstats
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import MetricsMiddleware
+from app.core.executors import Executors
+from app.core.metrics import REQUEST_LATENCY
+from app.core.profiling import ProfiledRoute, SlowRequestProfiler
+
+
+def make_client(profiler: SlowRequestProfiler, executors: Executors = None) -> TestClient:
+    router = APIRouter(route_class=ProfiledRoute)
+
+    @router.get("/slow/{item_id}")
+    def slow(item_id: int):
+        time.sleep(0.02)
+        return {"item_id": item_id}
+
+    @router.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @router.get("/offloaded")
+    async def offloaded():
+        await executors.cpu(time.sleep, 0.02)
+        return {"ok": True}
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, profiler=profiler)
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    return str(tmp_path / "profiles")
+
+
+def test_slow_sampled_request_dumps_a_profile(profile_dir):
+    profiler = SlowRequestProfiler(sample_rate=1.0, slow_ms=10, directory=profile_dir)
+    client = make_client(profiler)
+
+    response = client.get("/slow/7")
+
+    assert response.json() == {"item_id": 7}
+    files = os.listdir(profile_dir)
+    assert len(files) == 1
+    assert files[0].endswith("-GET-slow_item_id-" + files[0].split("-")[-1])
+    assert files[0].endswith("ms.prof")
+
+
+def test_work_offloaded_to_executors_is_in_the_profile(profile_dir):
+    profiler = SlowRequestProfiler(sample_rate=1.0, slow_ms=10, directory=profile_dir)
+    executors = Executors(cpu_workers=1, db_workers=1)
+    client = make_client(profiler, executors)
+
+    client.get("/offloaded")
+    executors.shutdown()
+
+    [name] = os.listdir(profile_dir)
+    functions = {function for _, _, function in pstats.Stats(os.path.join(profile_dir, name)).stats}
+    assert "<built-in method time.sleep>" in functions
+
+
+def test_fast_request_is_not_dumped(profile_dir):
+    profiler = SlowRequestProfiler(sample_rate=1.0, slow_ms=60_000, directory=profile_dir)
+    client = make_client(profiler)
+
+    client.get("/fast")
+    client.get("/slow/1")
+
+    assert profiler.dumped == 0
+    assert not os.path.exists(profile_dir)
+
+
+def test_unsampled_request_is_not_profiled(profile_dir):
+    profiler = SlowRequestProfiler(sample_rate=0.0, slow_ms=0, directory=profile_dir)
+    client = make_client(profiler)
+
+    client.get("/slow/1")
+
+    assert profiler.dumped == 0
+
+
+def test_unknown_profiler_does_not_fail_the_request(profile_dir):
+    profiler = SlowRequestProfiler(sample_rate=1.0, slow_ms=0, directory=profile_dir, profiler="missing")
+    client = make_client(profiler)
+
+    response = client.get("/fast")
+
+    assert response.status_code == 200
+    assert profiler.dumped == 0
+
+
+def test_middleware_labels_requests_by_route_template():
+    client = make_client(SlowRequestProfiler(sample_rate=0.0))
+    before = REQUEST_LATENCY.snapshot(method="GET", route="/slow/{item_id}", status=200)["count"]
+
+    client.get("/slow/1")
+    client.get("/slow/2")
+    client.get("/nowhere")
+
+    assert REQUEST_LATENCY.snapshot(method="GET", route="/slow/{item_id}", status=200)["count"] == before + 2
+    assert REQUEST_LATENCY.snapshot(method="GET", route="unmatched", status=404)["count"] >= 1
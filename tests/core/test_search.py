@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+from peewee import SqliteDatabase
+
+from app.core.search import InvertedIndex, PostgresSearchIndex, _snippet
+from app.models.document_models import Document
+
+
+@pytest.fixture
+def db():
+    db = SqliteDatabase(":memory:")
+    with db.bind_ctx([Document]):
+        db.create_tables([Document])
+        yield db
+
+
+@pytest.fixture
+def index(db):
+    texts = {
+        1: "The quarterly report covers revenue and costs.",
+        2: "Revenue grew; revenue is up, revenue everywhere.",
+        3: "Meeting notes about the office move.",
+    }
+    for document_id, text in texts.items():
+        Document.create(id=document_id, file_name=f"{document_id}.txt", file_type="TXT",
+                        upload_timestamp=datetime(2022, 1, 1), parsed_text=text)
+    index = InvertedIndex()
+    index.start()
+    return index
+
+
+def test_inverted_index_ranks_by_term_frequency(index):
+    hits = index.search("revenue", limit=10)
+
+    assert [hit["id"] for hit in hits] == [2, 1]
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert hits[0]["file_name"] == "2.txt"
+    assert "parsed_text" not in hits[0]
+
+
+def test_inverted_index_requires_every_term(index):
+    assert [hit["id"] for hit in index.search("revenue costs", limit=10)] == [1]
+    assert index.search("revenue unicorn", limit=10) == []
+    assert index.search("   ", limit=10) == []
+
+
+def test_inverted_index_paginates(index):
+    assert [hit["id"] for hit in index.search("revenue", limit=1, offset=1)] == [1]
+
+
+def test_inverted_index_reindexes_and_removes(index):
+    index.index_document(3, "Revenue forecast for the office.")
+    assert {hit["id"] for hit in index.search("revenue", limit=10)} == {1, 2, 3}
+    assert index.search("meeting", limit=10) == []
+
+    index.remove_document(2)
+    assert {hit["id"] for hit in index.search("revenue", limit=10)} == {1, 3}
+    assert len(index) == 2
+
+
+def test_inverted_index_skips_deleted_documents(index):
+    Document.delete_by_id(2)
+
+    assert [hit["id"] for hit in index.search("revenue", limit=10)] == [1]
+
+
+def test_snippet_highlights_query_words():
+    assert _snippet("Costs fell while revenue rose.", {"revenue"}) == "Costs fell while <b>revenue</b> rose"
+
+
+def test_postgres_index_writes_vector_with_parsed_text():
+    index = PostgresSearchIndex(config="simple")
+
+    assert index.document_fields(None) == {"search_vector": None}
+    vector = index.document_fields("some text")["search_vector"]
+    assert vector.name == "to_tsvector"
+    assert vector.arguments == ("simple", "some text")
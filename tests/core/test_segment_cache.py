@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from peewee import SqliteDatabase
+
+from app.core.segment_cache import SegmentCache
+from app.models.parse_segment_models import ParseSegment
+
+
+def make_segment(text="a b c", summaries=None, embeddings=None, token_ids=None):
+    return {
+        "text": text, "token_count": 3, "chunks": [text], "token_spans": [(0, 3)], "token_ids": token_ids,
+        "embeddings": embeddings, "summaries": summaries, "char_spans": [(0, len(text))],
+    }
+
+
+@pytest.fixture
+def database():
+    db = SqliteDatabase(":memory:")
+    with db.bind_ctx([ParseSegment]):
+        db.create_tables([ParseSegment])
+        yield db
+
+
+def test_memory_tier():
+    cache = SegmentCache(persistent=False)
+    cache.set_many({"key": make_segment()})
+
+    assert cache.get("key")["chunks"] == ["a b c"]
+    assert cache.get("missing") is None
+
+
+def test_persistent_tier_round_trips(database):
+    embeddings = np.array([[0.5, -1.0]], dtype=np.float32)
+    token_ids = np.array([7, 8, 9], dtype=np.uint32)
+    SegmentCache().set_many({"key": make_segment(embeddings=embeddings, summaries=["abc"], token_ids=token_ids)})
+
+    cache = SegmentCache()  # A fresh memory tier, as in another worker
+    assert cache.get("key") is None  # The in-process tier alone
+
+    segment = cache.get_many(["key", "missing"])["key"]
+
+    assert segment["token_spans"] == [(0, 3)]
+    assert segment["char_spans"] == [(0, 5)]
+    assert segment["token_ids"].tolist() == [7, 8, 9]
+    assert segment["embeddings"].tolist() == [[0.5, -1.0]]
+    assert segment["summaries"] == ["abc"]
+
+
+def test_completed_segments_replace_stored_ones(database):
+    cache = SegmentCache()
+    cache.set_many({"key": make_segment()})
+    cache.set_many({"key": make_segment(summaries=["abc"])})
+    cache.set_many({"key": make_segment()})  # A concurrent parse that did not summarize
+
+    assert ParseSegment.select().count() == 1
+    assert SegmentCache().get_many(["key"])["key"]["summaries"] == ["abc"]
+
+
+def test_delete_many_clears_both_tiers(database):
+    cache = SegmentCache()
+    cache.set_many({"key": make_segment(), "other": make_segment()})
+
+    cache.delete_many(["key", "missing"])
+
+    assert cache.get("key") is None
+    assert list(SegmentCache().get_many(["key", "other"])) == ["other"]
+
+
+def test_read_errors_are_misses():
+    cache = SegmentCache()
+    db = SqliteDatabase(":memory:")  # No table
+    with db.bind_ctx([ParseSegment]):
+        assert cache.get_many(["key"]) == {}
@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.core.sidecar import Sidecar, SidecarFormatError, SidecarStore, locate_chunks, write_sidecar
+
+PAGES = ["Première page, café. ", "Second page — ünïcödé 🙂. ", "Third page."]
+TEXT = "".join(PAGES)
+
+
+@pytest.fixture
+def sidecar_path(tmp_path):
+    chunks = [TEXT[0:30], TEXT[20:50], TEXT[45:]]
+    path = str(tmp_path / "doc.sidecar")
+    write_sidecar(
+        path, TEXT, [len(page) for page in PAGES], locate_chunks(TEXT, chunks), [(0, 6), (4, 10), (9, 14)],
+        np.arange(14), checkpoint_chars=8,  # Several checkpoints even for a short text
+    )
+    return path
+
+
+def test_locate_chunks_handles_overlap_and_decoded_chunks():
+    text = "abc abc def"
+
+    assert locate_chunks(text, ["abc abc", "abc def", "not in text", "def"]) == [(0, 7), (4, 11), (4, 4), (8, 11)]
+
+
+def test_text_slices(sidecar_path):
+    with Sidecar(sidecar_path) as sidecar:
+        assert sidecar.char_count == len(TEXT)
+        assert sidecar.byte_count == len(TEXT.encode("utf-8"))
+        assert sidecar.text() == TEXT
+        for start in range(len(TEXT) + 1):
+            for end in range(start, len(TEXT) + 1, 7):
+                assert sidecar.text(start, end) == TEXT[start:end]
+        assert sidecar.text(40, 10_000) == TEXT[40:]
+
+
+def test_pages_chunks_and_tokens(sidecar_path):
+    with Sidecar(sidecar_path) as sidecar:
+        assert sidecar.page_count == 3
+        assert [sidecar.page(number) for number in range(3)] == PAGES
+        assert sidecar.chunk_count == 3
+        assert sidecar.chunk(1) == TEXT[20:50]
+        assert sidecar.chunks[2].tolist() == [45, len(TEXT), 9, 14]
+        assert sidecar.token_count == 14
+        tokens = sidecar.tokens(3, 6)
+        assert tokens.dtype == np.uint32 and tokens.tolist() == [3, 4, 5]
+        assert not tokens.flags.owndata  # A view over the mapping, not a copy
+
+
+def test_sidecar_without_token_ids(tmp_path):
+    path = str(tmp_path / "doc.sidecar")
+    write_sidecar(path, "a b", [3], [(0, 3)], [(0, 2)], None)
+
+    with Sidecar(path) as sidecar:
+        assert sidecar.token_count == 2  # From the chunk index
+        assert sidecar.token_ids is None
+        with pytest.raises(SidecarFormatError):
+            sidecar.tokens()
+
+
+def test_empty_text(tmp_path):
+    path = str(tmp_path / "doc.sidecar")
+    write_sidecar(path, "", [], [], [], np.empty(0, dtype=np.uint32))
+
+    with Sidecar(path) as sidecar:
+        assert sidecar.text() == ""
+        assert sidecar.page_count == sidecar.chunk_count == sidecar.token_count == 0
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"x" * 100)
+
+    with pytest.raises(SidecarFormatError):
+        Sidecar(str(path))
+
+
+def test_store_writes_parse_results_once(tmp_path):
+    store = SidecarStore(root=str(tmp_path / "sidecars"))
+    result = {"text": "Hello world", "chunks": ["Hello world"], "token_spans": [(0, 2)],
+              "segment_lengths": [6, 5], "token_ids": np.array([1, 2], dtype=np.uint32)}
+
+    store.write("abcdef", "key", result)
+    store.write("abcdef", "key", {**result, "text": "Changed"})
+
+    assert store.path_for("abcdef", "key") == os.path.join(store.root, "ab", "abcdef", "key.sidecar")
+    with store.open("abcdef", "key") as sidecar:
+        assert sidecar.page(1) == "world"
+        assert sidecar.tokens().tolist() == [1, 2]
+    assert store.open("abcdef", "other") is None
+    assert store.open("missing", "key") is None
+
+
+def test_store_writes_the_chunker_offsets(tmp_path):
+    store = SidecarStore(root=str(tmp_path / "sidecars"))
+    text = "Footer. Body. Footer."
+    result = {"text": text, "chunks": ["Footer.", "Footer."], "char_spans": [(0, 7), (14, 21)],
+              "token_spans": [(0, 1), (2, 3)], "segment_lengths": [len(text)]}
+
+    store.write("abcdef", "key", result)
+
+    with store.open("abcdef", "key") as sidecar:
+        assert sidecar.chunks[1].tolist()[:2] == [14, 21]  # Not the first occurrence of the repeated text
+
+
+def test_store_deletes_every_sidecar_of_some_content(tmp_path):
+    store = SidecarStore(root=str(tmp_path / "sidecars"))
+    result = {"text": "x", "chunks": ["x"], "token_spans": [(0, 1)], "segment_lengths": [1]}
+    store.write("abcdef", "key", result)
+    store.write("abcdef", "other", result)
+    store.write("abcxyz", "key", result)
+
+    store.delete_content("abcdef")
+    store.delete_content("abcdef")  # Already gone
+
+    assert not store.exists("abcdef", "key") and not store.exists("abcdef", "other")
+    assert store.exists("abcxyz", "key")
+
+
+def test_store_skips_results_without_an_index_and_reports_errors(tmp_path, capsys):
+    store = SidecarStore(root=str(tmp_path / "sidecars"))
+    store.write("abcdef", "key", {"text": "x", "chunks": ["x"], "token_spans": [(0, 1)]})
+    assert not store.exists("abcdef", "key")
+
+    (tmp_path / "file").write_text("")
+    store = SidecarStore(root=str(tmp_path / "file"))  # Cannot hold directories
+    store.write("abcdef", "key", {"text": "x", "chunks": ["x"], "token_spans": [(0, 1)], "segment_lengths": [1]})
+
+    assert not store.exists("abcdef", "key")
+    assert "Failed to write text sidecar" in capsys.readouterr().out
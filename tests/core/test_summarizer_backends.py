@@ -0,0 +1,18 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.core import summarizer_backends
+from app.core.summarizer_backends import UnknownSummarizerBackendError, load_summarizer
+
+
+def test_load_summarizer_dispatches_on_backend(monkeypatch):
+    int8_loader = MagicMock(return_value="quantized pipeline")
+    monkeypatch.setitem(summarizer_backends.SUMMARIZER_BACKENDS, "int8", int8_loader)
+
+    assert load_summarizer("some/model", "int8") == "quantized pipeline"
+    int8_loader.assert_called_once_with("some/model")
+
+
+def test_load_summarizer_rejects_unknown_backend():
+    with pytest.raises(UnknownSummarizerBackendError, match="pytorch, int8, onnx"):
+        load_summarizer("some/model", "tensorrt")
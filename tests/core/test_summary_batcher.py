@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.core.summary_batcher import SummaryBatcher
+
+
+class FakeSummarizer:
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def __call__(self, texts, batch_size=1, **generate_kwargs):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(1)
+        self.calls.append((list(texts), generate_kwargs))
+        return [{"summary_text": text.upper()} for text in texts]
+
+
+def test_single_request():
+    summarizer = FakeSummarizer()
+    batcher = SummaryBatcher(lambda: summarizer, window_ms=1000, max_batch_size=4)
+
+    assert batcher.summarize("hello", max_length=10) == "HELLO"
+    assert summarizer.calls == [(["hello"], {"max_length": 10})]
+
+
+def test_waiting_requests_share_a_batch():
+    gate = threading.Event()
+    summarizer = FakeSummarizer(gate=gate)
+    batcher = SummaryBatcher(lambda: summarizer, window_ms=50, max_batch_size=4)
+
+    first = batcher.submit("first")  # Occupies the dispatcher until the gate opens
+    summarizer.entered.wait(1)
+    rest = [batcher.submit(text) for text in ("a", "b", "c")]
+    gate.set()
+
+    assert first.result() == "FIRST"
+    assert [future.result() for future in rest] == ["A", "B", "C"]
+    assert summarizer.calls[-1][0] == ["a", "b", "c"]
+    assert batcher.batch_sizes[-1] == 3
+
+
+def test_batches_never_mix_generation_settings():
+    gate = threading.Event()
+    summarizer = FakeSummarizer(gate=gate)
+    batcher = SummaryBatcher(lambda: summarizer, window_ms=50, max_batch_size=4)
+
+    blocker = batcher.submit("blocker")
+    summarizer.entered.wait(1)
+    short = batcher.submit("a", max_length=10)
+    long = batcher.submit("b", max_length=20)
+    gate.set()
+
+    assert (blocker.result(), short.result(), long.result()) == ("BLOCKER", "A", "B")
+    assert (["a"], {"max_length": 10}) in summarizer.calls
+    assert (["b"], {"max_length": 20}) in summarizer.calls
+
+
+def test_summarize_many_respects_max_batch_size():
+    summarizer = FakeSummarizer()
+    batcher = SummaryBatcher(lambda: summarizer, window_ms=50, max_batch_size=2)
+
+    assert batcher.summarize_many(["a", "b", "c"]) == ["A", "B", "C"]
+    assert all(len(texts) <= 2 for texts, _ in summarizer.calls)
+
+
+def test_errors_reach_every_caller():
+    summarizer = MagicMock(side_effect=Exception("Simulated error"))
+    batcher = SummaryBatcher(lambda: summarizer, window_ms=0, max_batch_size=4)
+
+    with pytest.raises(Exception, match="Simulated error"):
+        batcher.summarize("hello")
+
+
+def test_cancelled_requests_are_skipped():
+    gate = threading.Event()
+    summarizer = FakeSummarizer(gate=gate)
+    batcher = SummaryBatcher(lambda: summarizer, window_ms=50, max_batch_size=4)
+
+    first = batcher.submit("first")
+    summarizer.entered.wait(1)
+    cancelled, kept = batcher.submit("cancelled"), batcher.submit("kept")
+    assert cancelled.cancel()
+    gate.set()
+
+    assert kept.result() == "KEPT"
+    assert first.result() == "FIRST"
+    assert summarizer.calls[-1][0] == ["kept"]
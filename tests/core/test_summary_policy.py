@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from app.core.summary_policy import SummaryBudget, SummaryPlan, extractive_summary, plan_summary
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch):
+    monkeypatch.setattr("app.core.summary_policy.SUMMARY_EXTRACTIVE_MIN_TOKENS", 64)
+    monkeypatch.setattr("app.core.summary_policy.SUMMARY_GREEDY_MAX_TOKENS", 1024)
+    monkeypatch.setattr("app.core.summary_policy.SUMMARY_MAX_BEAMS", 4)
+    monkeypatch.setattr("app.core.summary_policy.SUMMARY_LENGTH_RATIO", 0.15)
+
+
+@pytest.mark.parametrize("token_count, plan", [
+    (10, SummaryPlan("none", 0, 0, 0)),
+    (100, SummaryPlan("extractive", 50, 0, 0)),
+    (512, SummaryPlan("abstractive", 77, 25, 1)),
+    (1024, SummaryPlan("abstractive", 150, 25, 1)),
+    (2048, SummaryPlan("abstractive", 150, 25, 2)),
+    (3000, SummaryPlan("abstractive", 150, 25, 3)),
+    (100_000, SummaryPlan("abstractive", 150, 25, 4)),
+])
+def test_plan_scales_with_input(token_count, plan):
+    assert plan_summary(token_count, 512, 150, 25) == plan
+
+
+def test_extractive_summary_keeps_the_best_sentences_in_order():
+    text = ("Chunks of text are embedded by the parser. Lunch was good today. "
+            "The parser extracts text from documents. The parser splits text into chunks.")
+
+    assert extractive_summary(text, max_length=22) == (
+        "Chunks of text are embedded by the parser. The parser splits text into chunks."
+    )
+    assert extractive_summary(text, max_length=4) == "Chunks of text"  # Even the best sentence is too long
+    assert extractive_summary("", max_length=50) == ""
+
+
+def test_budget_without_limit_waits_for_everything():
+    future = Future()
+    threading.Timer(0.01, future.set_result, ["done"]).start()
+    budget = SummaryBudget(0)
+
+    assert budget.remaining() is None
+    assert budget.collect([future]) == (["done"], True)
+    assert not budget.exhausted
+
+
+def test_budget_cancels_what_does_not_finish_in_time():
+    finished, pending = Future(), Future()
+    finished.set_result("finished")
+    budget = SummaryBudget(0.01)
+
+    assert budget.collect([finished, pending]) == (["finished"], False)
+    assert pending.cancelled()
+    assert budget.exhausted
+    assert budget.remaining() == 0
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from peewee import SqliteDatabase
+
+from app.core.embeddings import to_bytes
+from app.core.vector_index import VectorIndex
+from app.models.document_chunk_models import DocumentChunk
+from app.models.document_models import Document
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_search_returns_most_similar_first():
+    index = VectorIndex(initial_capacity=2)
+    index.add_document(1, np.stack([unit(1, 0), unit(1, 1)]))
+    index.add_document(2, np.stack([unit(0, 1), unit(-1, 0)]))
+
+    matches = index.search(unit(1, 0.1), top_k=3)
+
+    assert [(document_id, ordinal) for document_id, ordinal, _ in matches] == [(1, 0), (1, 1), (2, 0)]
+    assert matches[0][2] == pytest.approx(float(unit(1, 0) @ unit(1, 0.1)))
+    assert len(index.search(unit(1, 0), top_k=10)) == 4
+
+
+def test_replaced_and_removed_documents_are_not_returned():
+    index = VectorIndex(initial_capacity=1)
+    index.add_document(1, np.stack([unit(1, 0)]))
+    index.add_document(2, np.stack([unit(0, 1)]))
+    index.add_document(1, np.stack([unit(-1, 0)]), ordinals=[5])  # Re-parsed
+
+    assert index.search(unit(1, 0), top_k=1) == [(2, 0, pytest.approx(0.0))]
+    assert index.search(unit(-1, 0), top_k=1)[0][:2] == (1, 5)
+
+    index.remove_document(2)  # Dead rows now outnumber live ones: compacted
+    assert len(index) == 1
+    assert [match[:2] for match in index.search(unit(0, 1), top_k=5)] == [(1, 5)]
+    index.remove_document(1)
+    assert index.search(unit(0, 1), top_k=5) == []
+
+
+def test_start_loads_embeddings_from_database():
+    db = SqliteDatabase(":memory:")
+    with db.bind_ctx([Document, DocumentChunk]):
+        db.create_tables([Document, DocumentChunk])
+        Document.create(id=1, file_name="1.txt", file_type="TXT", upload_timestamp=datetime(2022, 1, 1))
+        for ordinal, embedding in enumerate([unit(1, 0), unit(0, 1), None]):
+            DocumentChunk.create(document=1, ordinal=ordinal, token_start=0, token_end=1, text="text",
+                                 embedding=to_bytes(embedding) if embedding is not None else None)
+        index = VectorIndex()
+        index.start()
+
+    assert len(index) == 2
+    assert index.search(unit(0, 1), top_k=1)[0][:2] == (1, 1)
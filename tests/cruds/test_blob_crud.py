@@ -0,0 +1,30 @@
+import pytest
+from peewee import SqliteDatabase
+
+from app.crud.blob_crud import BlobCRUD
+from app.models.blob_models import Blob
+
+
+@pytest.fixture
+def blob_crud():
+    db = SqliteDatabase(":memory:")
+    with db.bind_ctx([Blob]):
+        db.create_tables([Blob])
+        yield BlobCRUD(db)
+
+
+def test_acquire_many_adds_to_existing_counts(blob_crud):
+    blob_crud.acquire("a" * 64, 10)
+
+    blob_crud.acquire_many({"a" * 64: (10, 2), "b" * 64: (20, 3)})
+
+    assert blob_crud.get_blob("a" * 64).ref_count == 3
+    assert blob_crud.get_blob("b" * 64).ref_count == 3
+    assert blob_crud.get_blob("b" * 64).byte_size == 20
+
+
+def test_release_deletes_unreferenced_blob(blob_crud):
+    blob_crud.acquire_many({"a" * 64: (10, 1)})
+
+    assert blob_crud.release("a" * 64) == 0
+    assert blob_crud.get_blob("a" * 64) is None
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+from peewee import SqliteDatabase
+
+from crud.document_chunk_crud import DocumentChunkCRUD
+from app.models.document_chunk_models import DocumentChunk
+from app.models.document_models import Document
+
+
+@pytest.fixture
+def chunk_crud():
+    db = SqliteDatabase(":memory:")
+    with db.bind_ctx([Document, DocumentChunk]):
+        db.create_tables([Document, DocumentChunk])
+        for document_id, content_hash in [(1, "same"), (2, "same"), (3, "other")]:
+            Document.create(id=document_id, file_name=f"{document_id}.txt", file_type="TXT",
+                            upload_timestamp=datetime(2022, 1, 1), content_hash=content_hash)
+        yield DocumentChunkCRUD(db)
+
+
+def test_replace_chunks_in_batches(chunk_crud, monkeypatch):
+    monkeypatch.setattr('crud.document_chunk_crud.CHUNK_INSERT_BATCH_SIZE', 2)
+    chunk_crud.replace_chunks(1, ["old"], [(0, 1)])
+
+    stored = chunk_crud.replace_chunks(1, ["a", "b", "c"], [(0, 3), (2, 5), (4, 6)])
+
+    assert stored == 3
+    assert [(c.ordinal, c.token_start, c.token_end, c.text) for c in chunk_crud.get_chunks(1, limit=10)] == [
+        (0, 0, 3, "a"), (1, 2, 5, "b"), (2, 4, 6, "c")
+    ]
+
+
+def test_get_chunks_ranges(chunk_crud):
+    chunk_crud.replace_chunks(1, ["a", "b", "c", "d"], [(0, 3), (2, 5), (4, 7), (6, 8)])
+
+    assert [c.ordinal for c in chunk_crud.get_chunks(1, limit=10, start=1, end=3)] == [1, 2]
+    assert [c.ordinal for c in chunk_crud.get_chunks(1, limit=1, start=2)] == [2]
+    assert [c.ordinal for c in chunk_crud.get_chunks(1, limit=10, token_start=4, token_end=6)] == [1, 2]
+    assert chunk_crud.get_chunks(2, limit=10) == []
+
+
+def test_copy_chunks_from_same_content(chunk_crud):
+    chunk_crud.replace_chunks(1, ["a", "b"], [(0, 3), (2, 4)])
+
+    assert chunk_crud.copy_chunks(2, "same") == 2
+    assert chunk_crud.copy_chunks(2, "same") == 0  # Already has chunks
+    assert chunk_crud.copy_chunks(3, "other") == 0  # Nothing to copy from
+    assert [(c.ordinal, c.text) for c in chunk_crud.get_chunks(2, limit=10)] == [(0, "a"), (1, "b")]
@@ -114,14 +114,22 @@ def test_update_document_not_found(document_crud):
 def test_delete_document_found(document_crud, mock_document):
     # Arrange
     document_id = 1
+    mock_document.content_hash = "abc"
+    mock_document.segment_keys = None
     with patch('app.models.document_models.Document.get_or_none', return_value=mock_document) as mock_get, \
-         patch.object(mock_document, 'delete_instance') as mock_delete:
+         patch.object(mock_document, 'delete_instance') as mock_delete, \
+         patch('crud.document_crud.blob_store_instance') as mock_blob_store, \
+         patch('crud.document_crud.parse_cache_instance') as mock_parse_cache, \
+         patch('crud.document_crud.sidecar_store_instance') as mock_sidecar_store:
         # Act
         result = document_crud.delete_document(document_id)
 
         # Assert
         mock_get.assert_called_once_with(Document.id == document_id)
         mock_delete.assert_called_once()
+        mock_blob_store.release.assert_called_once_with("abc")
+        mock_parse_cache.delete_content.assert_called_once_with("abc")  # The last reference was released
+        mock_sidecar_store.delete_content.assert_called_once_with("abc")
         assert result is True
 
 def test_delete_document_not_found(document_crud):
@@ -134,3 +142,178 @@ def test_delete_document_not_found(document_crud):
         # Assert
         mock_get.assert_called_once_with(Document.id == document_id)
         assert result is False
+
+
+@pytest.fixture
+def sqlite_documents():
+    from peewee import SqliteDatabase
+    from app.models.document_models import Document as DocumentModel
+
+    db = SqliteDatabase(":memory:")
+    with db.bind_ctx([DocumentModel]):
+        db.create_tables([DocumentModel])
+        for i in range(1, 8):
+            DocumentModel.create(
+                id=i,
+                file_name=f"file_{i}",
+                file_type="PDF" if i % 2 else "DOCX",
+                upload_timestamp=datetime(2022, 1, 1 + i // 2),  # Pairs share a timestamp
+                parsed_text="text " * 100,
+            )
+        yield db
+
+
+def test_list_documents_pages_by_keyset(document_crud, sqlite_documents):
+    first_page = document_crud.list_documents(3)
+    last = first_page[-1]
+    second_page = document_crud.list_documents(3, after=(last.upload_timestamp, last.id))
+    last = second_page[-1]
+    third_page = document_crud.list_documents(3, after=(last.upload_timestamp, last.id))
+
+    assert [d.id for d in first_page] == [7, 6, 5]
+    assert [d.id for d in second_page] == [4, 3, 2]
+    assert [d.id for d in third_page] == [1]
+    assert first_page[0].parsed_text is None  # Only metadata columns are selected
+
+
+def test_list_documents_filters(document_crud, sqlite_documents):
+    documents = document_crud.list_documents(
+        10, file_type="PDF", uploaded_from=datetime(2022, 1, 2), uploaded_to=datetime(2022, 1, 4)
+    )
+
+    assert [d.id for d in documents] == [5, 3]
+
+
+@pytest.fixture
+def sqlite_database():
+    from peewee import SqliteDatabase
+    from app.models.document_models import Document as DocumentModel
+
+    db = SqliteDatabase(":memory:")
+    db.returning_clause = True  # Like Postgres, hand back the ids of multi-row inserts
+    with db.bind_ctx([DocumentModel]):
+        db.create_tables([DocumentModel])
+        yield db
+
+
+def test_create_documents_in_one_transaction(document_crud, sqlite_database):
+    from app.models.document_models import Document as DocumentModel
+
+    documents = [
+        DocumentCreate(
+            file=UploadFile(filename=f"test_{i}.pdf", file=b""),
+            file_name=f"test_{i}.pdf",
+            file_type="application/pdf",
+            upload_timestamp=datetime(2022, 1, 1),
+            content_hash=str(i) * 64,
+            byte_size=i,
+        )
+        for i in range(3)
+    ]
+    with patch('crud.document_crud.DOCUMENT_INSERT_BATCH_SIZE', 2):
+        created = document_crud.create_documents(documents)
+
+    assert [document.file_name for document in created] == ["test_0.pdf", "test_1.pdf", "test_2.pdf"]
+    assert [document.id for document in created] == [1, 2, 3]
+    assert DocumentModel.get_by_id(3).file_type == "PDF"
+
+
+def test_get_parsed_texts_by_hash(document_crud, sqlite_database):
+    from app.models.document_models import Document as DocumentModel
+    DocumentModel.create(file_name="a.pdf", file_type="PDF", content_hash="a" * 64, parsed_text="text")
+    DocumentModel.create(file_name="b.pdf", file_type="PDF", content_hash="b" * 64)
+
+    assert document_crud.get_parsed_texts_by_hash(["a" * 64, "b" * 64, "c" * 64]) == {"a" * 64: "text"}
+    assert document_crud.get_parsed_texts_by_hash([]) == {}
+
+
+def test_list_documents_sorted_and_filtered_by_statistics(document_crud, sqlite_documents):
+    from app.models.document_models import Document as DocumentModel
+    for document_id, token_count in [(1, 300), (2, 100), (3, 200), (4, 200), (5, 50)]:
+        DocumentModel.update(token_count=token_count).where(DocumentModel.id == document_id).execute()
+
+    first_page = document_crud.list_documents(2, sort="-token_count")
+    last = first_page[-1]
+    second_page = document_crud.list_documents(2, after=(last.token_count, last.id), sort="-token_count")
+    ascending = document_crud.list_documents(10, sort="token_count", ranges={"token_count": (100, 200)})
+
+    assert [d.id for d in first_page] == [1, 4]
+    assert [d.id for d in second_page] == [3, 2]
+    assert [d.id for d in ascending] == [2, 3, 4]  # Documents 6 and 7 have no statistics yet
+
+
+def test_document_statistics(document_crud, sqlite_database):
+    from app.models.document_models import Document as DocumentModel
+    first = DocumentModel.create(file_name="a.pdf", file_type="PDF", content_hash="a" * 64, byte_size=10)
+    sibling = DocumentModel.create(file_name="b.pdf", file_type="PDF", content_hash="a" * 64)
+    other = DocumentModel.create(file_name="c.pdf", file_type="PDF", content_hash="c" * 64)
+    stats = {"page_count": 2, "char_count": 40, "token_count": 9, "chunk_count": 1}
+
+    assert document_crud.update_stats(first.id, "a" * 64, stats) == 2
+
+    stored = document_crud.get_document_stats(first.id)
+    assert (stored.byte_size, stored.token_count, stored.page_count) == (10, 9, 2)
+    assert stored.parsed_text is None  # Only the statistics columns are selected
+    assert document_crud.get_document_stats(sibling.id).chunk_count == 1
+    assert document_crud.get_document_stats(other.id).token_count is None
+    assert document_crud.get_stats_by_hash(["a" * 64, "c" * 64]) == {"a" * 64: stats}
+
+
+def test_previous_segment_keys(document_crud, sqlite_database):
+    from app.models.document_models import Document as DocumentModel
+    old = DocumentModel.create(file_name="deck.pptx", file_type="PPTX", upload_timestamp=datetime(2022, 1, 1))
+    new = DocumentModel.create(file_name="deck.pptx", file_type="PPTX", upload_timestamp=datetime(2022, 1, 2))
+    DocumentModel.create(file_name="other.pptx", file_type="PPTX")
+
+    assert document_crud.get_previous_segment_keys("deck.pptx") == []
+    document_crud.update_segment_keys(old.id, None, ["a", "b"])
+    assert document_crud.get_previous_segment_keys("deck.pptx") == ["a", "b"]
+    document_crud.update_segment_keys(new.id, None, ["a", "c"])
+    assert document_crud.get_previous_segment_keys("deck.pptx") == ["a", "c"]  # The latest parsed upload
+
+
+def test_parsed_text_reaches_every_upload_of_the_same_content(document_crud, sqlite_database):
+    from app.models.document_models import Document as DocumentModel
+    first = DocumentModel.create(file_name="a.pdf", file_type="PDF", content_hash="a" * 64)
+    second = DocumentModel.create(file_name="a copy.pdf", file_type="PDF", content_hash="a" * 64)
+    other = DocumentModel.create(file_name="c.pdf", file_type="PDF", content_hash="c" * 64)
+
+    with patch('crud.document_crud.search_index_instance') as search_index:
+        search_index.document_fields.return_value = {}
+        assert document_crud.update_parsed_text(first.id, "shared text", "a" * 64) == 2
+
+        third = DocumentModel.create(file_name="a again.pdf", file_type="PDF", content_hash="a" * 64)
+        assert document_crud.copy_parsed_text(third.id, "a" * 64) == 1  # Answered from the parse cache
+        assert document_crud.copy_parsed_text(other.id, "c" * 64) == 0  # Nothing parsed yet
+
+    assert [DocumentModel.get_by_id(d.id).parsed_text for d in (first, second, third, other)] == [
+        "shared text", "shared text", "shared text", None
+    ]
+    assert sorted(call.args for call in search_index.index_document.call_args_list) == [
+        (first.id, "shared text"), (second.id, "shared text"), (third.id, "shared text")
+    ]
+
+
+def test_delete_document_deletes_segments_nothing_refers_to(document_crud):
+    import json
+    from peewee import SqliteDatabase
+    from app.core.segment_cache import SegmentCache
+    from app.models.document_models import Document as DocumentModel
+    from app.models.parse_segment_models import ParseSegment
+
+    db = SqliteDatabase(":memory:")
+    with db.bind_ctx([DocumentModel, ParseSegment]):
+        db.create_tables([DocumentModel, ParseSegment])
+        old = DocumentModel.create(file_name="deck.pptx", file_type="PPTX", segment_keys=json.dumps(["a", "b"]))
+        DocumentModel.create(file_name="deck.pptx", file_type="PPTX", segment_keys=json.dumps(["a", "c"]))
+        segment_cache = SegmentCache()
+        for key in "abc":
+            ParseSegment.create(cache_key=key, text=key, token_count=1, chunks="[]", token_spans="[]")
+
+        with patch('crud.document_crud.segment_cache_instance', segment_cache), \
+             patch('crud.document_crud.blob_store_instance'), \
+             patch('crud.document_crud.parse_cache_instance'), \
+             patch('crud.document_crud.sidecar_store_instance'):
+            assert document_crud.delete_document(old.id) is True
+
+        assert sorted(row.cache_key for row in ParseSegment.select()) == ["a", "c"]  # "a" is still used
@@ -46,3 +46,14 @@ def test_get_db_closes_connection(dependency_instance):
     # Assert
     assert dependency_instance.db.connect.called
     assert dependency_instance.db.close.called
+
+def test_connection_returns_connection_on_error(dependency_instance):
+    # Act
+    with pytest.raises(ValueError):
+        with dependency_instance.connection() as database:
+            assert database == dependency_instance.db.database
+            raise ValueError
+
+    # Assert
+    assert dependency_instance.db.connect.called
+    assert dependency_instance.db.close.called